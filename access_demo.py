@@ -3,7 +3,8 @@
 Access Control Demo - Shows different data views for vendors vs BLU Maritime
 """
 
-import json
+from redaction import vendor_projection
+from serialization import dump_json
 
 # Sample data with confidential ratings
 sample_vendor_data = {
@@ -60,8 +61,7 @@ def generate_blu_maritime_view():
         }
     }
     
-    with open("BLU_MARITIME_full_access.json", 'w') as f:
-        json.dump(blu_data, f, indent=2)
+    dump_json(blu_data, "BLU_MARITIME_full_access.json")
 
 def generate_vendor_view(vendor_name):
     """Vendor - Restricted to own data only"""
@@ -69,27 +69,12 @@ def generate_vendor_view(vendor_name):
         "access_level": "VENDOR_RESTRICTED",
         "vendor_name": vendor_name,
         "warning": "You can only view your own quotations. Competitor data is confidential.",
-        "your_quotations": {}
+        # Only this vendor's quotes, confidential rating removed
+        "your_quotations": vendor_projection(sample_vendor_data, vendor_name)
     }
     
-    # Filter to show only this vendor's data
-    for city, items in sample_vendor_data.items():
-        vendor_data["your_quotations"][city] = {}
-        for item, vendors in items.items():
-            vendor_quotes = []
-            for vendor in vendors:
-                if vendor["vendor_name"] == vendor_name:
-                    # Remove confidential rating from vendor view
-                    clean_vendor = {k: v for k, v in vendor.items() 
-                                  if k != "confidential_rating"}
-                    vendor_quotes.append(clean_vendor)
-            
-            if vendor_quotes:
-                vendor_data["your_quotations"][city][item] = vendor_quotes
-    
     filename = f"{vendor_name}_restricted_access.json"
-    with open(filename, 'w') as f:
-        json.dump(vendor_data, f, indent=2)
+    dump_json(vendor_data, filename)
     
     return filename
 
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Basket Optimizer - MOQ-aware cheapest sourcing for a demand basket
+Chooses vendor allocations per port city and item that minimize total cost
+while respecting minimum order quantities and capping high-stockout exposure
+"""
+
+import time
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+    from quote_store import QuoteStore
+
+DEFAULT_MAX_HIGH_RISK_SHARE = 0.25
+DEFAULT_MAX_VENDORS_PER_ITEM = 3
+DEFAULT_DEMAND_KG = 100
+
+# Tolerance for kg comparisons after float arithmetic
+_EPSILON = 1e-9
+
+
+def default_basket(cities: List[str], items: List[str], kg: float = DEFAULT_DEMAND_KG) -> Dict:
+    """Basket with the same demand for every item in every city"""
+    return {city: {item: kg for item in items} for city in cities}
+
+
+def _allocate(chosen: List[int], prices: List[float], moqs: List[float], high: List[bool],
+              demand: float, high_cap: float) -> Optional[Tuple[float, Dict[int, float]]]:
+    """Cheapest allocation that buys at least the MOQ from every chosen vendor
+
+    chosen is in ascending price order. Demand beyond the MOQs goes to the
+    cheapest chosen vendors, high-risk ones only up to high_cap. Returns
+    (cost, vendor -> kg), or None if the cap cannot be met.
+    """
+    allocation = {vendor: moqs[vendor] for vendor in chosen}
+    high_used = sum(moqs[vendor] for vendor in chosen if high[vendor])
+    if high_used > high_cap + _EPSILON:
+        return None
+    remaining = demand - sum(allocation.values())
+    for vendor in chosen:
+        if remaining <= _EPSILON:
+            break
+        take = min(remaining, high_cap - high_used) if high[vendor] else remaining
+        if take > 0:
+            allocation[vendor] += take
+            remaining -= take
+            if high[vendor]:
+                high_used += take
+    if remaining > _EPSILON:
+        return None
+    return sum(prices[vendor] * kg for vendor, kg in allocation.items()), allocation
+
+
+def optimize_cell(prices: List[float], moqs: List[float], high: List[bool], demand: float,
+                  max_high_risk_share: float = DEFAULT_MAX_HIGH_RISK_SHARE,
+                  max_vendors: int = DEFAULT_MAX_VENDORS_PER_ITEM,
+                  stats: Optional[Dict[str, int]] = None) -> Optional[Tuple[float, Dict[int, float]]]:
+    """Branch-and-bound over vendor subsets for one city/item demand
+
+    Vendors dominated by a cheaper one with no larger MOQ and no higher
+    risk are dropped first; the rest are explored cheapest first. A
+    partial choice is pruned when its MOQ cost plus the unmet demand at the
+    cheapest price still available already reaches the best complete
+    allocation. Returns (cost, vendor index -> kg) or None if no allocation
+    is feasible.
+    """
+    order = []
+    for vendor in sorted(range(len(prices)), key=prices.__getitem__):
+        if not any(moqs[kept] <= moqs[vendor] and (high[vendor] or not high[kept]) for kept in order):
+            order.append(vendor)
+    high_cap = max_high_risk_share * demand
+    best: List[Any] = [None]
+    counters = stats if stats is not None else {}
+
+    def search(position: int, chosen: List[int], moq_cost: float, moq_kg: float):
+        counters["nodes"] = counters.get("nodes", 0) + 1
+        if chosen:
+            result = _allocate(chosen, prices, moqs, high, demand, high_cap)
+            if result is not None and (best[0] is None or result[0] < best[0][0] - _EPSILON):
+                best[0] = result
+        if position == len(order) or len(chosen) == max_vendors:
+            return
+        for index in range(position, len(order)):
+            vendor = order[index]
+            floor_price = prices[chosen[0]] if chosen else prices[vendor]
+            if best[0] is not None:
+                # Ignoring this vendor's MOQ gives a bound that later vendors cannot beat
+                if moq_cost + max(0.0, demand - moq_kg) * floor_price >= best[0][0] - _EPSILON:
+                    counters["pruned"] = counters.get("pruned", 0) + len(order) - index
+                    break
+                bound = (moq_cost + prices[vendor] * moqs[vendor]
+                         + max(0.0, demand - moq_kg - moqs[vendor]) * floor_price)
+                if bound >= best[0][0] - _EPSILON:
+                    counters["pruned"] = counters.get("pruned", 0) + 1
+                    continue
+            search(index + 1, chosen + [vendor], moq_cost + prices[vendor] * moqs[vendor],
+                   moq_kg + moqs[vendor])
+
+    search(0, [], 0.0, 0.0)
+    return best[0]
+
+
+class BasketOptimizer:
+    """Sourcing plans for demand baskets over one QuoteStore
+
+    Each city's demand is bought from vendors quoting in that city. At most
+    max_high_risk_share of an item's demand may come from vendors with High
+    stockout risk, and at most max_vendors_per_item vendors share an item.
+    """
+
+    def __init__(self, store: "QuoteStore",
+                 max_high_risk_share: float = DEFAULT_MAX_HIGH_RISK_SHARE,
+                 max_vendors_per_item: int = DEFAULT_MAX_VENDORS_PER_ITEM):
+        if not 0 <= max_high_risk_share <= 1:
+            raise ValueError("max_high_risk_share must be between 0 and 1")
+        if max_vendors_per_item < 1:
+            raise ValueError("max_vendors_per_item must be at least 1")
+        self.store = store
+        self.max_high_risk_share = max_high_risk_share
+        self.max_vendors_per_item = max_vendors_per_item
+        self.stats: Dict[str, Any] = {}
+
+    def _lookup_cells(self, cells: List[Tuple[str, str]]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Start/stop offsets into the store's cell index for every (city, item)"""
+        import numpy as np
+        store = self.store
+        sorted_keys, _ = store._cell_index()
+        n_items = max(len(store.items), 1)
+        city_codes = np.array([store.cities.lookup(city) for city, _ in cells], dtype=np.int64)
+        item_codes = np.array([store.items.lookup(item) for _, item in cells], dtype=np.int64)
+        keys = np.where((city_codes >= 0) & (item_codes >= 0), city_codes * n_items + item_codes, -1)
+        starts = np.searchsorted(sorted_keys, keys, side="left")
+        stops = np.searchsorted(sorted_keys, keys, side="right")
+        stops[keys < 0] = starts[keys < 0]
+        return starts, stops
+
+    def optimize(self, basket: Dict[str, Dict[str, float]]) -> List[Dict[str, Any]]:
+        """One recommendation per (city, item) of a city -> item -> kg basket"""
+        import numpy as np
+        started = time.perf_counter()
+        store = self.store
+        cells = [(city, item) for city, items in basket.items() for item in items]
+        starts, stops = self._lookup_cells(cells)
+        _, order = store._cell_index()
+        price = store.column("price_inr")
+        moq = store.column("moq_kg")
+        stockout = store.column("stockout")
+        high = stockout == store.stockout_levels.lookup("High")
+        vendor = store.column("vendor")
+        stats = {"nodes": 0, "pruned": 0}
+
+        recommendations = []
+        for (city, item), start, stop in zip(cells, starts.tolist(), stops.tolist()):
+            demand = float(basket[city][item])
+            entry = {"city": city, "item": item, "demand_kg": demand}
+            recommendations.append(entry)
+            if demand <= 0:
+                entry["status"] = "no_demand"
+                continue
+            if start == stop:
+                entry["status"] = "no_quotes"
+                continue
+            rows = order[start:stop]
+            cell_prices = price[rows].tolist()
+            result = optimize_cell(cell_prices, moq[rows].astype(np.float64).tolist(),
+                                   high[rows].tolist(), demand, self.max_high_risk_share,
+                                   self.max_vendors_per_item, stats)
+            if result is None:
+                entry["status"] = "infeasible"
+                continue
+            cost, allocation = result
+            purchased = sum(allocation.values())
+            high_kg = sum(kg for index, kg in allocation.items() if high[rows[index]])
+            entry.update({
+                "status": "ok",
+                "purchased_kg": round(purchased, 3),
+                "total_cost_inr": round(cost, 2),
+                "total_cost_usd": store.rates.convert(cost, "USD"),
+                "effective_price_inr": round(cost / demand, 2),
+                "high_risk_share": round(high_kg / demand, 4),
+                "allocations": [{
+                    "vendor_name": store.vendors[vendor[rows[index]]],
+                    "kg": round(kg, 3),
+                    "price_inr": cell_prices[index],
+                    "cost_inr": round(cell_prices[index] * kg, 2),
+                    "moq_kg": int(moq[rows[index]]),
+                    "stockout_frequency": store.stockout_levels[stockout[rows[index]]]
+                } for index, kg in sorted(allocation.items(), key=lambda pair: -pair[1])]
+            })
+
+        self.stats = {
+            "cells": len(cells),
+            "fulfilled": sum(entry["status"] == "ok" for entry in recommendations),
+            "nodes_explored": stats["nodes"],
+            "branches_pruned": stats["pruned"],
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+        return recommendations
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - Timing and memory of the analysis, export and portal hot paths
+Runs each dataset scale (cities x items x vendors per cell) in a fresh process,
+writes machine-readable JSON and compares two runs for regressions
+"""
+
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Tuple
+
+import numpy as np
+
+from quote_store import QuoteStore, DICTIONARY_ATTRS, STOCKOUT_LEVELS, RATING_LEVELS
+
+DEFAULT_SCALES = "4x20x3,20x100x5,100x1000x10"
+FULL_SCALES = "4x20x3,20x100x5,100x1000x10,1000x10000x20"
+
+# Stages are skipped above these quote counts unless --no-limits is given
+STAGE_LIMITS = {
+    "_generate_vendor_data": 2_000_000,
+    "generate_analysis_report[python]": 2_000_000,
+    "save_confidential_data": 5_000_000,
+    "optimize_basket": 2_000_000,
+    "VendorPortal.get_vendor_data[cold]": 5_000_000,
+    "QuoteDatabase.upsert_store": 2_000_000,
+    "render_dashboard[cold]": 200_000,
+}
+
+# Startup guard: short CLI runs may not import these, and may take at most the
+# budget on top of a bare interpreter start
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "matplotlib", "seaborn"]
+DEFAULT_STARTUP_BUDGET_MS = 150
+
+
+def parse_scale(text: str) -> Tuple[int, int, int]:
+    """'4x20x3' -> (cities, items, vendors per cell)"""
+    cities, items, vendors = (int(part) for part in text.lower().split("x"))
+    return cities, items, vendors
+
+
+def synthetic_store(cities: int, items: int, vendors: int, seed: int = 0) -> QuoteStore:
+    """Vectorized synthetic quote book of cities x items x vendors-per-cell quotes
+
+    Layout matches _generate_vendor_data: rows ordered by city, item, vendor,
+    vendor names "<city>_Vendor_A", "_B", ... and per-item base prices +/-15%.
+    """
+    rng = np.random.default_rng(seed)
+    total = cities * items * vendors
+    city_names = [f"City_{index:04d}" for index in range(cities)]
+    item_names = [f"Item_{index:05d}" for index in range(items)]
+    vendor_names = [f"{city}_Vendor_{chr(65 + index) if index < 26 else index}"
+                    for city in city_names for index in range(vendors)]
+
+    city = np.repeat(np.arange(cities, dtype=np.int32), items * vendors)
+    item = np.tile(np.repeat(np.arange(items, dtype=np.int32), vendors), cities)
+    vendor = city * vendors + np.tile(np.arange(vendors, dtype=np.int32), cities * items)
+    base_price = rng.uniform(20, 800, size=items)
+    price_inr = np.round(base_price[item] * rng.uniform(0.85, 1.15, size=total), 2)
+    contact_pool = np.array([f"+91-{number}" for number in
+                             rng.integers(7000000000, 9999999999, size=min(total, 100000))],
+                            dtype=object)
+    columns = {
+        "city": city,
+        "item": item,
+        "vendor": vendor,
+        "price_inr": price_inr,
+        "moq_kg": rng.choice(np.array([10, 25, 50, 100], dtype=np.int32), size=total),
+        "stockout": rng.integers(0, len(STOCKOUT_LEVELS), size=total, dtype=np.int8),
+        "rating": rng.integers(0, len(RATING_LEVELS), size=total, dtype=np.int8),
+        "last_updated": np.zeros(total, dtype=np.int32),
+        "contact": contact_pool[rng.integers(0, len(contact_pool), size=total)],
+    }
+    dictionaries = {
+        "city": city_names, "item": item_names, "vendor": vendor_names,
+        "stockout": STOCKOUT_LEVELS, "rating": RATING_LEVELS,
+        "last_updated": [datetime.now().strftime("%Y-%m-%d")],
+    }
+    return QuoteStore.from_columns(columns, dictionaries)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _time(function: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_scale(scale: str, repeat: int = 3, no_limits: bool = False, seed: int = 0) -> Dict[str, Any]:
+    """Benchmark every hot path at one scale (meant to run in a fresh process)"""
+    from procurement_analysis import ProcurementAnalyzer
+    from quote_db import QuoteDatabase
+    from vendor_portal import VendorPortal
+
+    cities, items, vendors = parse_scale(scale)
+    total = cities * items * vendors
+    stages: Dict[str, Dict[str, float]] = {}
+    skipped: List[str] = []
+
+    def record(name: str, function: Callable[[], Any], times: int = repeat):
+        if not no_limits and total > STAGE_LIMITS.get(name, float("inf")):
+            skipped.append(name)
+            return
+        seconds = _time(function, times)
+        # ru_maxrss is the process high-water mark so far, not this stage's own peak:
+        # it only tells which stage first pushed the process to a new maximum
+        stages[name] = {"seconds": round(seconds, 6),
+                        "quotes_per_second": round(total / seconds, 1) if seconds > 0 else None,
+                        "process_peak_rss_mb": peak_rss_mb()}
+
+    workdir = tempfile.mkdtemp(prefix="procurement_bench_")
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        started = time.perf_counter()
+        store = synthetic_store(cities, items, vendors, seed)
+        build_seconds = time.perf_counter() - started
+        analyzer = ProcurementAnalyzer(quotes=store)
+
+        generator = ProcurementAnalyzer(quotes=QuoteStore())
+        generator.cities, generator.food_items = analyzer.cities, analyzer.food_items
+        generator.vendors_per_cell = vendors
+        record("_generate_vendor_data", generator._generate_vendor_data, 1)
+        del generator
+
+        record("generate_analysis_report[vectorized]",
+               lambda: analyzer.generate_analysis_report(engine="vectorized"))
+        record("generate_analysis_report[sharded]",
+               lambda: analyzer.generate_analysis_report(engine="sharded"))
+        record("generate_analysis_report[python]",
+               lambda: analyzer.generate_analysis_report(engine="python"), 1)
+        basket = {city: dict.fromkeys(analyzer.food_items, 120) for city in analyzer.cities}
+        record("optimize_basket", lambda: analyzer.optimize_basket(basket), 1)
+        record("export_to_csv", lambda: analyzer.export_to_csv("bench.csv"), 1)
+        record("save_confidential_data", lambda: analyzer.save_confidential_data("bench_conf.json"), 1)
+
+        database = QuoteDatabase("bench_quotes.db")
+        record("QuoteDatabase.upsert_store", lambda: database.upsert_store(store), 1)
+        if "QuoteDatabase.upsert_store" in stages:
+            record("QuoteDatabase.load", database.load, 1)
+            record("QuoteDatabase.vendor_quotations", lambda: database.vendor_quotations(store.vendors[0]))
+        database.close()
+
+        # Cold: every chart drawn; warm: same report again, every chart unchanged
+        if importlib.util.find_spec("matplotlib") is not None:
+            report = analyzer.generate_analysis_report()
+            record("render_dashboard[cold]", lambda: analyzer.render_dashboard(report, "bench_dashboard"), 1)
+            if "render_dashboard[cold]" in stages:
+                record("render_dashboard[warm]", lambda: analyzer.render_dashboard(report, "bench_dashboard"))
+                shutil.rmtree("bench_dashboard")
+
+        vendor_id = store.vendors[0]
+        record("generate_vendor_portal_data", lambda: analyzer.generate_vendor_portal_data(vendor_id))
+        portal = VendorPortal()
+        auth_info = portal.authenticate_user(vendor_id, "vendor_key")
+        record("VendorPortal.get_vendor_data[cold]",
+               lambda: (portal.engine(store).invalidate(), portal.get_vendor_data(auth_info, analyzer.vendor_data)))
+        record("VendorPortal.get_vendor_data[warm]",
+               lambda: portal.get_vendor_data(auth_info, analyzer.vendor_data))
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir)
+    return {
+        "scale": scale,
+        "cities": cities, "items": items, "vendors_per_cell": vendors, "quotes": total,
+        "dataset_build_seconds": round(build_seconds, 6),
+        "stages": stages,
+        "skipped": skipped,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def _legacy_json_dump(document: Dict, filename: str):
+    """The output path before JSONSerializer: json.dump(indent=2) of a fully built dict"""
+    with open(filename, 'w') as file:
+        json.dump(document, file, indent=2)
+
+
+def _legacy_confidential(analyzer, filename: str):
+    """save_confidential_data before streaming: vendor_ratings built as a dict, then dumped"""
+    import random
+    vendor_ratings = {}
+    for city in analyzer.cities:
+        for item in analyzer.food_items:
+            for vendor in analyzer.vendor_data[city][item]:
+                vendor_ratings[f"{city}_{item}_{vendor['vendor_name']}"] = {
+                    "reliability_score": random.randint(70, 95),
+                    "payment_terms": random.choice(["30 days", "45 days", "60 days"]),
+                    "discount_available": random.choice([True, False]),
+                    "confidential_rating": vendor["confidential_rating"]
+                }
+    _legacy_json_dump({
+        "access_level": "BLU_MARITIME_CONFIDENTIAL",
+        "warning": "RESTRICTED ACCESS - BLU Maritime personnel only",
+        "vendor_ratings": vendor_ratings,
+        "negotiated_prices": {},
+        "contract_terms": {},
+        "competitor_analysis": {}
+    }, filename)
+
+
+def run_serialization(scale: str, repeat: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """Time and size the JSON outputs under every available backend, pretty and compact
+
+    Speedups and size ratios are relative to the legacy path (backend
+    "legacy"): the whole document built as a dict and written with
+    json.dump(indent=2).
+    """
+    from procurement_analysis import ProcurementAnalyzer
+    from serialization import available_backends
+
+    cities, items, vendors = parse_scale(scale)
+    analyzer = ProcurementAnalyzer(quotes=synthetic_store(cities, items, vendors, seed))
+    report = analyzer.generate_analysis_report()
+    workdir = tempfile.mkdtemp(prefix="procurement_bench_")
+    report_path = os.path.join(workdir, "report.json")
+    confidential_path = os.path.join(workdir, "confidential.json")
+    results = [{
+        "backend": "legacy",
+        "mode": "pretty",
+        "report_seconds": round(_time(lambda: _legacy_json_dump(report, report_path), repeat), 6),
+        "report_bytes": os.path.getsize(report_path),
+        "confidential_seconds": round(
+            _time(lambda: _legacy_confidential(analyzer, confidential_path), repeat), 6),
+        "confidential_bytes": os.path.getsize(confidential_path),
+    }]
+    for backend in reversed(available_backends()):
+        for compact in (False, True):
+            analyzer.json_backend, analyzer.json_compact = backend, compact
+            serializer = analyzer.json_serializer()
+            results.append({
+                "backend": backend,
+                "mode": "compact" if compact else "pretty",
+                "report_seconds": round(_time(lambda: serializer.dump(report, report_path), repeat), 6),
+                "report_bytes": os.path.getsize(report_path),
+                "confidential_seconds": round(
+                    _time(lambda: analyzer.save_confidential_data(confidential_path), repeat), 6),
+                "confidential_bytes": os.path.getsize(confidential_path),
+            })
+    for name in os.listdir(workdir):
+        os.remove(os.path.join(workdir, name))
+    os.rmdir(workdir)
+
+    legacy = results[0]
+    for result in results:
+        for output in ("report", "confidential"):
+            seconds = result[f"{output}_seconds"]
+            result[f"{output}_speedup"] = round(legacy[f"{output}_seconds"] / seconds, 2) if seconds else None
+            result[f"{output}_size_ratio"] = round(result[f"{output}_bytes"] / legacy[f"{output}_bytes"], 3)
+    return {"scale": scale, "quotes": len(analyzer.quotes), "results": results}
+
+
+def run_history(scale: str, days: int = 3 * 365, window: int = 30, seed: int = 0) -> Dict[str, Any]:
+    """Write daily price snapshots for years, then time range queries and rolling stats"""
+    from datetime import date, timedelta
+    from price_history import PriceHistory
+
+    cities, items, vendors = parse_scale(scale)
+    store = synthetic_store(cities, items, vendors, seed)
+    rng = np.random.default_rng(seed)
+    root = tempfile.mkdtemp(prefix="procurement_history_")
+    history = PriceHistory(root)
+    first = date(2023, 1, 1)
+    # Each day is a new store sharing every column but a drifted price column
+    columns = {name: store.column(name) for name in QuoteStore.COLUMN_DTYPES}
+    dictionaries = {name: store.dictionary(name).values for name in DICTIONARY_ATTRS}
+    started = time.perf_counter()
+    for day in range(days):
+        columns["price_inr"] = np.round(columns["price_inr"] * rng.uniform(0.98, 1.02, len(store)), 2)
+        snapshot = QuoteStore.from_columns(columns, dictionaries)
+        history.append_snapshot(snapshot, (first + timedelta(days=day)).isoformat())
+    write_seconds = time.perf_counter() - started
+    middle = (first + timedelta(days=days // 2)).isoformat()
+    quarter_end = (first + timedelta(days=days // 2 + 90)).isoformat()
+    city, item, vendor = store.cities[0], store.items[0], store.vendors[0]
+    result = {
+        "scale": scale, "days": days, "rows": days * len(store),
+        "write_seconds": round(write_seconds, 3),
+        "files": history.summary()["files"],
+        "query_quarter_seconds": round(_time(lambda: history.query(middle, quarter_end), 3), 4),
+        "query_series_seconds": round(_time(lambda: history.query(city=city, item=item, vendor=vendor), 3), 4),
+        "rolling_series_seconds": round(_time(
+            lambda: history.rolling_stats(window, city=city, item=item, vendor=vendor), 3), 4),
+        "rolling_all_seconds": round(_time(lambda: history.rolling_stats(window), 1), 4),
+    }
+    for directory, _, names in os.walk(root, topdown=False):
+        for name in names:
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    return result
+
+
+def run_startup(budget_ms: float = DEFAULT_STARTUP_BUDGET_MS, repeat: int = 7,
+                scale: str = "4x20x3") -> Dict[str, Any]:
+    """Time single-purpose commands in fresh interpreters against a startup budget
+
+    Each command's median wall time minus that of `python -c pass` must stay
+    within budget_ms, and none may import a module from HEAVY_MODULES. The
+    vendor portal command reads a quote database written beforehand.
+    """
+    from quote_db import QuoteDatabase
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(here, "procurement_analysis.py")
+    workdir = tempfile.mkdtemp(prefix="procurement_startup_")
+    store = synthetic_store(*parse_scale(scale))
+    database = QuoteDatabase(os.path.join(workdir, "quotes.db"))
+    database.upsert_store(store)
+    database.close()
+    portal_args = ["--quote-db", "quotes.db", "--vendor-portal", store.vendors[0]]
+    commands = {
+        "import procurement_analysis": (["-c", "import procurement_analysis"], "import procurement_analysis"),
+        "vendor portal from --quote-db": ([script] + portal_args,
+                                          f"import procurement_analysis; procurement_analysis.main({portal_args!r})"),
+    }
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])))
+
+    def median_ms(arguments: List[str]) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable] + arguments, cwd=workdir, env=environment,
+                           stdout=subprocess.DEVNULL, check=True)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+    interpreter_ms = median_ms(["-c", "pass"])
+    results = []
+    for name, (arguments, code) in commands.items():
+        probe = subprocess.run(
+            [sys.executable, "-c", f"{code}\nimport json, sys\n"
+                                   f"print(json.dumps(sorted(set({HEAVY_MODULES!r}) & set(sys.modules))))"],
+            cwd=workdir, env=environment, capture_output=True, text=True, check=True)
+        heavy = json.loads(probe.stdout.strip().splitlines()[-1])
+        overhead_ms = median_ms(arguments) - interpreter_ms
+        results.append({
+            "command": name,
+            "overhead_ms": round(overhead_ms, 1),
+            "heavy_imports": heavy,
+            "passed": overhead_ms <= budget_ms and not heavy,
+        })
+
+    for name in os.listdir(workdir):
+        os.remove(os.path.join(workdir, name))
+    os.rmdir(workdir)
+    return {"budget_ms": budget_ms, "interpreter_ms": round(interpreter_ms, 1), "results": results,
+            "failures": sum(not result["passed"] for result in results)}
+
+
+def run_suite(scales: List[str], repeat: int, no_limits: bool, seed: int) -> Dict[str, Any]:
+    """Run every scale in its own process so peak RSS is per scale"""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for scale in scales:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_scale, (scale, repeat, no_limits, seed))
+        results.append(result)
+        print(f"  {scale}: {result['quotes']:,} quotes, peak {result['peak_rss_mb']} MiB",
+              file=sys.stderr)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Per-stage changes between two runs; entries slower than threshold are flagged"""
+    old_results = {result["scale"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = old_results.get(result["scale"])
+        if old is None:
+            continue
+        for stage, stats in result["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if not old_stats or not old_stats["seconds"]:
+                continue
+            ratio = stats["seconds"] / old_stats["seconds"]
+            rows.append({
+                "scale": result["scale"],
+                "stage": stage,
+                "baseline_seconds": old_stats["seconds"],
+                "current_seconds": stats["seconds"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BLU Maritime procurement benchmark suite")
+    subparsers = parser.add_subparsers(dest="command")
+    run_parser = subparsers.add_parser("run", help="run the benchmarks (default)")
+    run_parser.add_argument("--scales", default=DEFAULT_SCALES,
+                            help=f"comma-separated CxIxV scales (default: %(default)s; "
+                                 f"'full' = {FULL_SCALES})")
+    run_parser.add_argument("--repeat", type=int, default=3, help="best-of repeats for fast stages")
+    run_parser.add_argument("--no-limits", action="store_true",
+                            help="also run the slow reference stages at large scales")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    serialization_parser = subparsers.add_parser(
+        "serialization", help="compare JSON backends and compact vs pretty output")
+    serialization_parser.add_argument("--scale", default="20x100x5")
+    serialization_parser.add_argument("--repeat", type=int, default=3)
+    serialization_parser.add_argument("--seed", type=int, default=0)
+    history_parser = subparsers.add_parser(
+        "history", help="time price history range queries and rolling stats over years of snapshots")
+    history_parser.add_argument("--scale", default="4x20x3")
+    history_parser.add_argument("--days", type=int, default=3 * 365)
+    history_parser.add_argument("--window", type=int, default=30)
+    history_parser.add_argument("--seed", type=int, default=0)
+    startup_parser = subparsers.add_parser(
+        "startup", help="check single-purpose commands start fast and without heavy imports")
+    startup_parser.add_argument("--budget-ms", type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                                help="allowed time on top of interpreter start (default: %(default)s)")
+    startup_parser.add_argument("--repeat", type=int, default=7)
+    compare_parser = subparsers.add_parser("compare", help="flag regressions between two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="allowed slowdown before flagging (default: %(default)s)")
+    args = parser.parse_args(argv if argv is not None else (sys.argv[1:] or ["run"]))
+
+    if args.command == "compare":
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        rows = compare(baseline, current, args.threshold)
+        regressions = [row for row in rows if row["regression"]]
+        print(json.dumps({"threshold": args.threshold, "comparisons": rows,
+                          "regressions": len(regressions)}, indent=2))
+        return 1 if regressions else 0
+
+    if args.command == "serialization":
+        print(json.dumps(run_serialization(args.scale, args.repeat, args.seed), indent=2))
+        return 0
+
+    if args.command == "startup":
+        result = run_startup(args.budget_ms, args.repeat)
+        print(json.dumps(result, indent=2))
+        return 1 if result["failures"] else 0
+
+    if args.command == "history":
+        print(json.dumps(run_history(args.scale, args.days, args.window, args.seed), indent=2))
+        return 0
+
+    scales = (FULL_SCALES if args.scales == "full" else args.scales).split(",")
+    print("⏱️ BLU Maritime - Benchmark Suite", file=sys.stderr)
+    results = run_suite(scales, args.repeat, args.no_limits, args.seed)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"📁 Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Shared pytest fixtures for the module test suites"""
+
+import random
+
+import pytest
+
+from procurement_analysis import ProcurementAnalyzer
+
+
+def make_seeded_analyzer(seed: int) -> ProcurementAnalyzer:
+    """Analyzer over generated quotes of a random shape (1-12 cities, 1-20 items, 1-4 vendors)"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    analyzer = ProcurementAnalyzer()
+    analyzer.cities = [f"City{i}" for i in range(rng.randint(1, 12))]
+    analyzer.food_items = [f"Item{i}" for i in range(rng.randint(1, 20))]
+    analyzer.vendors_per_cell = rng.randint(1, 4)
+    analyzer.quotes
+    return analyzer
+
+
+@pytest.fixture
+def seeded_analyzer():
+    """Factory for make_seeded_analyzer, so tests can build analyzers per seed"""
+    return make_seeded_analyzer
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Currency Conversion - Versioned exchange rates and vectorized price conversion
+Prices are stored once in INR; other currencies are derived from whole price
+columns on demand and cached per rate version by the QuoteStore
+"""
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+BASE_CURRENCY = "INR"
+
+# INR value of one unit of each currency
+DEFAULT_RATES = {"USD": 83.25}
+
+
+class RateTable:
+    """INR value of one unit of each currency, with a new version per change
+
+    Every call to set_rates creates a version; old versions stay readable
+    so figures can be reproduced at the rates in force when they were made.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, effective: Optional[str] = None):
+        self.version = 0
+        self._history: List[Tuple[str, Dict[str, float]]] = []
+        self._append(dict(DEFAULT_RATES if rates is None else rates), effective)
+
+    def _append(self, rates: Dict[str, float], effective: Optional[str]):
+        for currency, rate in rates.items():
+            if not rate > 0:
+                raise ValueError(f"Exchange rate for {currency} must be positive, got {rate!r}")
+        rates[BASE_CURRENCY] = 1.0
+        self._history.append((effective or datetime.now().isoformat(), rates))
+        self.version = len(self._history) - 1
+
+    def set_rates(self, rates: Dict[str, float], effective: Optional[str] = None) -> int:
+        """Change one or more rates in a single new version and return it"""
+        updated = dict(self._history[-1][1])
+        updated.update(rates)
+        self._append(updated, effective)
+        return self.version
+
+    def set_rate(self, currency: str, rate: float, effective: Optional[str] = None) -> int:
+        """Change one rate and return the new version"""
+        return self.set_rates({currency: rate}, effective)
+
+    def rates(self, version: Optional[int] = None) -> Dict[str, float]:
+        """All rates of a version (default: current)"""
+        return dict(self._history[self.version if version is None else version][1])
+
+    def rate(self, currency: str, version: Optional[int] = None) -> float:
+        """INR value of one unit of currency"""
+        rate = self._history[self.version if version is None else version][1].get(currency)
+        if rate is None:
+            raise KeyError(f"No exchange rate for {currency}")
+        return rate
+
+    def version_at(self, timestamp: str) -> int:
+        """Latest version effective at an ISO timestamp (0 if none was yet)"""
+        version = 0
+        for index, (effective, _) in enumerate(self._history):
+            if effective <= timestamp:
+                version = index
+        return version
+
+    def history(self) -> List[Dict[str, Any]]:
+        """Every version with its effective time and rates"""
+        return [{"version": index, "effective": effective, "rates": dict(rates)}
+                for index, (effective, rates) in enumerate(self._history)]
+
+    def convert(self, amount_inr: float, currency: str, version: Optional[int] = None) -> float:
+        """One INR amount in currency, rounded to 2 decimals"""
+        return round(amount_inr / self.rate(currency, version), 2)
+
+    def convert_column(self, amounts_inr: "np.ndarray", currency: str,
+                       version: Optional[int] = None) -> "np.ndarray":
+        """A whole column of INR amounts in currency, rounded to 2 decimals"""
+        import numpy as np
+        return np.round(np.asarray(amounts_inr, dtype=np.float64) / self.rate(currency, version), 2)
+
+    def convert_values(self, amounts_inr: List[float], currency: str,
+                       version: Optional[int] = None) -> List[float]:
+        """INR amounts in currency without NumPy, rounded exactly like convert_column"""
+        rate = self.rate(currency, version)
+        # np.round(x, 2) is rint(x * 100) / 100; round() also rounds half to even
+        return [round(amount / rate * 100) / 100 for amount in amounts_inr]
+
+    def to_base(self, amounts: "np.ndarray", currencies: List[str],
+                version: Optional[int] = None) -> "np.ndarray":
+        """INR values of amounts quoted in per-row currencies, rounded to 2 decimals"""
+        import numpy as np
+        amounts = np.asarray(amounts, dtype=np.float64)
+        currencies = np.asarray(currencies, dtype=object)
+        result = np.empty(len(amounts), dtype=np.float64)
+        for currency in set(currencies.tolist()):
+            mask = currencies == currency
+            result[mask] = amounts[mask] * self.rate(currency, version)
+        return np.round(result, 2)
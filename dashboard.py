@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Dashboard - Cached, parallel chart rendering for the analysis report
+Draws city cost and per-item price-spread charts from city_analysis and
+item_comparison on the headless Agg canvas in worker processes, skips every
+chart whose content hash is already on disk and writes a static HTML index
+"""
+
+import hashlib
+import html
+import json
+import os
+import time
+from typing import Dict, List, Any, Optional
+
+# Bump when the drawing code changes so every cached chart is redrawn
+RENDER_VERSION = 1
+DEFAULT_DPI = 100
+DEFAULT_CHARTS_PER_TASK = 16
+# The city cost chart shows at most this many cities (the most expensive ones)
+MAX_CITY_BARS = 40
+CHART_DIR = "charts"
+INDEX_FILE = "index.html"
+
+
+def _require_matplotlib():
+    """Import matplotlib, which is only needed to draw charts"""
+    try:
+        import matplotlib
+    except ImportError:
+        raise ImportError("Dashboard rendering requires the 'matplotlib' package") from None
+    return matplotlib
+
+
+def dashboard_charts(report: Dict) -> List[Dict[str, Any]]:
+    """Chart specs (kind, title, data) for a report, city costs first
+
+    data holds exactly what is drawn, so two specs with equal data render
+    to the same image.
+    """
+    charts = []
+    city_analysis = report.get("city_analysis", {})
+    if city_analysis:
+        ranked = sorted(city_analysis.items(), key=lambda pair: -pair[1]["total_procurement_cost_inr"])
+        shown = ranked[:MAX_CITY_BARS]
+        title = "Procurement cost per city"
+        if len(ranked) > len(shown):
+            title += f" (top {len(shown)} of {len(ranked)})"
+        charts.append({
+            "kind": "city_costs",
+            "title": title,
+            "data": {
+                "cities": [city for city, _ in shown],
+                "cost_inr": [stats["total_procurement_cost_inr"] for _, stats in shown],
+                "high_risk": [stats["high_risk_items"] for _, stats in shown],
+            }
+        })
+    for item, stats in report.get("item_comparison", {}).items():
+        charts.append({
+            "kind": "price_spread",
+            "title": item,
+            "data": {
+                "min": stats["min_price_inr"],
+                "avg": stats["avg_price_inr"],
+                "max": stats["max_price_inr"],
+            }
+        })
+    return charts
+
+
+def chart_digest(chart: Dict[str, Any], dpi: int = DEFAULT_DPI) -> str:
+    """Content hash of everything a chart's image depends on"""
+    key = json.dumps([RENDER_VERSION, dpi, chart["kind"], chart["title"], chart["data"]],
+                     sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def chart_filename(chart: Dict[str, Any], dpi: int = DEFAULT_DPI) -> str:
+    """Content-addressed file name of a chart, relative to the dashboard directory"""
+    return f"{CHART_DIR}/{chart['kind']}-{chart_digest(chart, dpi)[:20]}.png"
+
+
+def _draw_city_costs(figure, data: Dict[str, Any]):
+    axes = figure.subplots()
+    positions = range(len(data["cities"]))
+    bars = axes.bar(positions, data["cost_inr"], color="#2b6cb0")
+    rotate = len(data["cities"]) > 6
+    axes.set_xticks(list(positions))
+    axes.set_xticklabels(data["cities"], rotation=45 if rotate else 0, ha="right" if rotate else "center")
+    axes.set_ylabel("Cheapest basket (INR)")
+    axes.bar_label(bars, labels=[f"{risk} high-risk" if risk else "" for risk in data["high_risk"]],
+                   fontsize=7)
+
+
+def _draw_price_spread(figure, data: Dict[str, Any]):
+    axes = figure.subplots()
+    axes.barh([0], [data["max"] - data["min"]], left=[data["min"]], height=0.4, color="#90cdf4")
+    axes.plot([data["avg"]], [0], marker="D", color="#2c5282")
+    for value, label in ((data["min"], "min"), (data["avg"], "avg"), (data["max"], "max")):
+        axes.annotate(f"{label} ₹{value:,.2f}", (value, 0), xytext=(0, 14 if label == "avg" else -18),
+                      textcoords="offset points", ha="center", fontsize=8)
+    margin = max(data["max"] - data["min"], data["max"] * 0.05, 1.0) * 0.25
+    axes.set_xlim(data["min"] - margin, data["max"] + margin)
+    axes.set_ylim(-1, 1)
+    axes.set_yticks([])
+    axes.set_xlabel("Price per kg (INR)")
+
+
+_DRAW = {"city_costs": (_draw_city_costs, (8, 4.5)), "price_spread": (_draw_price_spread, (6, 2))}
+
+
+def _render_batch(charts: List[Dict[str, Any]], paths: List[str], dpi: int) -> Dict[str, Any]:
+    """Draw a batch of charts on the Agg canvas (no display needed)"""
+    started = time.perf_counter()
+    _require_matplotlib()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    written = 0
+    for chart, path in zip(charts, paths):
+        draw, size = _DRAW[chart["kind"]]
+        figure = Figure(figsize=size, layout="constrained")
+        FigureCanvasAgg(figure)
+        draw(figure, chart["data"])
+        figure.suptitle(chart["title"], fontsize=10)
+        # Write then rename: a cached file is always a complete image
+        temporary = f"{path}.{os.getpid()}.tmp"
+        figure.savefig(temporary, dpi=dpi, format="png")
+        os.replace(temporary, path)
+        written += os.path.getsize(path)
+    return {"pid": os.getpid(), "charts": len(charts), "bytes": written,
+            "seconds": time.perf_counter() - started}
+
+
+def write_dashboard_index(report: Dict, charts: List[Dict[str, Any]], output_dir: str = "dashboard",
+                          dpi: int = DEFAULT_DPI) -> str:
+    """Write the static HTML page that lays out the charts; returns its path"""
+    metadata = report.get("report_metadata", {})
+    escape = html.escape
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8">',
+        "<title>BLU Maritime - Procurement Dashboard</title>",
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}th:first-child,td:first-child"
+        "{text-align:left}.grid{display:flex;flex-wrap:wrap;gap:12px}figure{margin:0}"
+        "figcaption{font-size:0.85em}</style>",
+        "</head><body>",
+        "<h1>BLU Maritime - Procurement Dashboard</h1>",
+        f"<p>{escape(str(metadata.get('report_type', 'Vendor Price & Stock Analysis')))}, "
+        f"generated {escape(str(metadata.get('generated_on', '')))}</p>",
+    ]
+
+    city_analysis = report.get("city_analysis", {})
+    if city_analysis:
+        parts.append("<h2>City procurement cost</h2>")
+        parts.append("<table><tr><th>City</th><th>Cost (INR)</th><th>Cost (USD)</th>"
+                     "<th>High-risk items</th></tr>")
+        for city, stats in city_analysis.items():
+            parts.append(f"<tr><td>{escape(city)}</td><td>{stats['total_procurement_cost_inr']:,.2f}</td>"
+                         f"<td>{stats['total_procurement_cost_usd']:,.2f}</td>"
+                         f"<td>{stats['high_risk_items']}</td></tr>")
+        parts.append("</table>")
+
+    city_charts = [chart for chart in charts if chart["kind"] == "city_costs"]
+    item_charts = [chart for chart in charts if chart["kind"] == "price_spread"]
+    for chart in city_charts:
+        parts.append(f'<p><img src="{chart_filename(chart, dpi)}" alt="{escape(chart["title"])}"></p>')
+    if item_charts:
+        parts.append("<h2>Item price spread across cities</h2>")
+        parts.append('<div class="grid">')
+        for chart in item_charts:
+            data = chart["data"]
+            parts.append(
+                f'<figure><img loading="lazy" src="{chart_filename(chart, dpi)}" '
+                f'alt="{escape(chart["title"])}" width="{6 * dpi}" height="{2 * dpi}">'
+                f"<figcaption>{escape(chart['title'])}: ₹{data['min']:,.2f} - ₹{data['max']:,.2f}, "
+                f"avg ₹{data['avg']:,.2f}</figcaption></figure>")
+        parts.append("</div>")
+    parts.append("</body></html>")
+
+    path = os.path.join(output_dir, INDEX_FILE)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("\n".join(parts) + "\n")
+    return path
+
+
+def render_dashboard(report: Dict, output_dir: str = "dashboard", workers: Optional[int] = None,
+                     dpi: int = DEFAULT_DPI,
+                     charts_per_task: int = DEFAULT_CHARTS_PER_TASK) -> Dict[str, Any]:
+    """Render a report's charts and HTML index into output_dir
+
+    Chart files are named by the hash of their input data, so a chart
+    whose data did not change since the last run is already on disk and
+    is skipped; only new or changed charts are drawn, in batches of
+    charts_per_task by workers processes (workers=1 draws in-process).
+    Chart files no longer referenced are removed. Returns chart counts and
+    per-worker timing statistics.
+    """
+    started = time.perf_counter()
+    chart_dir = os.path.join(output_dir, CHART_DIR)
+    os.makedirs(chart_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    charts = dashboard_charts(report)
+    paths = [os.path.join(output_dir, chart_filename(chart, dpi)) for chart in charts]
+    pending = [index for index, path in enumerate(paths) if not os.path.exists(path)]
+    tasks = [pending[start:start + charts_per_task] for start in range(0, len(pending), charts_per_task)]
+
+    if tasks:
+        _require_matplotlib()
+    if workers == 1 or len(tasks) <= 1:
+        results = [_render_batch([charts[index] for index in task], [paths[index] for index in task], dpi)
+                   for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_batch, [charts[index] for index in task],
+                                   [paths[index] for index in task], dpi) for task in tasks]
+            results = [future.result() for future in futures]
+
+    referenced = {os.path.basename(path) for path in paths}
+    removed = 0
+    for name in os.listdir(chart_dir):
+        if name.endswith(".png") and name not in referenced:
+            os.remove(os.path.join(chart_dir, name))
+            removed += 1
+    index = write_dashboard_index(report, charts, output_dir, dpi)
+
+    elapsed = time.perf_counter() - started
+    per_worker: Dict[int, Dict[str, float]] = {}
+    for result in results:
+        stats = per_worker.setdefault(result["pid"], {"batches": 0, "charts": 0, "busy_seconds": 0.0})
+        stats["batches"] += 1
+        stats["charts"] += result["charts"]
+        stats["busy_seconds"] += result["seconds"]
+    return {
+        "output_dir": output_dir,
+        "index": index,
+        "charts": len(charts),
+        "rendered": len(pending),
+        "cached": len(charts) - len(pending),
+        "removed": removed,
+        "bytes": sum(result["bytes"] for result in results),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 4),
+        "per_worker": per_worker
+    }
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Incremental Report - Running aggregates for intraday quote updates
+Keeps the analysis report current without rescanning the full dataset
+"""
+
+import heapq
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from quote_store import QuoteStore
+
+
+class IncrementalReport:
+    """Analysis report maintained under single-quote updates
+
+    State kept per city/item cell (cheapest price, number of high-risk
+    vendors), per city (sum of cell best prices, high-risk item count) and
+    per item (sum, count and lazy-deletion min/max heaps over all quotes).
+    ``apply_quote_update`` and ``withdraw_quote`` touch one cell, one city
+    and one item, so their cost does not depend on the size of the dataset:
+    quotes are found through the per-cell row lists kept here, never
+    through the store's cell index. Heap entries carry the stamp their row
+    had when pushed; a row's stamp changes whenever its price or its quote
+    does, which marks the older entries stale.
+
+    Totals and averages are running float sums, so after many updates they
+    can differ from a full generate_analysis_report in the last cent;
+    ``rebuild()`` resynchronizes.
+    """
+
+    # Rebuild an item's heaps once stale entries outnumber live ones this much
+    HEAP_COMPACT_FACTOR = 4
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.rebuild()
+
+    @property
+    def store(self) -> QuoteStore:
+        return self.analyzer.quotes
+
+    def rebuild(self):
+        """Recompute every aggregate from the quote store"""
+        store = self.store
+        self._high_code = store.stockout_levels.lookup("High")
+        self._city_codes = {store.cities.lookup(name) for name in self.analyzer.cities}
+        self._item_codes = {store.items.lookup(name) for name in self.analyzer.food_items}
+        city = store.column("city").astype(np.int64)
+        item = store.column("item").astype(np.int64)
+        price = store.column("price_inr")
+        high = store.column("stockout") == self._high_code
+
+        keys = city * max(len(store.items), 1) + item
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.r_[True, keys[order][1:] != keys[order][:-1]]) if len(order) else []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._item_cells: Dict[int, List[Tuple[int, int]]] = {}
+        self._cell_best: Dict[Tuple[int, int], float] = {}
+        self._cell_high: Dict[Tuple[int, int], int] = {}
+        self._city_total: Dict[int, float] = {code: 0 for code in self._city_codes}
+        self._city_high: Dict[int, int] = {code: 0 for code in self._city_codes}
+        for rows in np.split(order, starts[1:]) if len(order) else []:
+            key = (int(city[rows[0]]), int(item[rows[0]]))
+            self._cells[key] = rows.tolist()
+            self._cell_best[key] = float(price[rows].min())
+            self._cell_high[key] = int(high[rows].sum())
+            self._item_cells.setdefault(key[1], []).append(key)
+            if key[0] in self._city_total:
+                self._city_total[key[0]] += self._cell_best[key]
+                self._city_high[key[0]] += self._cell_high[key] > 0
+
+        self._stamps: Dict[int, int] = {}
+        self._next_stamp = 1
+        self._item_sum: Dict[int, float] = {}
+        self._item_count: Dict[int, int] = {}
+        self._item_min: Dict[int, list] = {}
+        self._item_max: Dict[int, list] = {}
+        for code in self._item_codes:
+            self._rebuild_item(code)
+
+    def _rebuild_item(self, item_code: int):
+        """Recompute one item's sum, count and heaps from its cells"""
+        price = self.store.column("price_inr")
+        rows = [row for key in self._item_cells.get(item_code, [])
+                if key[0] in self._city_codes for row in self._cells[key]]
+        values = price[rows].tolist()
+        stamps = [self._stamps.get(row, 0) for row in rows]
+        self._item_sum[item_code] = sum(values)
+        self._item_count[item_code] = len(values)
+        self._item_min[item_code] = list(zip(values, rows, stamps))
+        self._item_max[item_code] = [(-value, row, stamp) for value, row, stamp in zip(values, rows, stamps)]
+        heapq.heapify(self._item_min[item_code])
+        heapq.heapify(self._item_max[item_code])
+
+    def _heap_top(self, heap: list, sign: float) -> float:
+        """Current extreme of a lazy-deletion heap, discarding stale entries"""
+        while heap:
+            value, row, stamp = heap[0]
+            if self._stamps.get(row, 0) == stamp:
+                return sign * value
+            heapq.heappop(heap)
+        raise ValueError("no quotes for item")
+
+    def _restamp(self, row: int) -> int:
+        """Give a row a new stamp, making its existing heap entries stale"""
+        stamp = self._stamps[row] = self._next_stamp
+        self._next_stamp += 1
+        return stamp
+
+    def _push(self, item_code: int, row: int, price: float):
+        """Enter a row's current price in its item's heaps under a new stamp"""
+        stamp = self._restamp(row)
+        heapq.heappush(self._item_min[item_code], (price, row, stamp))
+        heapq.heappush(self._item_max[item_code], (-price, row, stamp))
+        if len(self._item_min[item_code]) > self.HEAP_COMPACT_FACTOR * self._item_count[item_code]:
+            self._rebuild_item(item_code)
+
+    def _tracked(self, key: Tuple[int, int]) -> bool:
+        """Whether a cell's city and item are in the report"""
+        return key[0] in self._city_codes and key[1] in self._item_codes
+
+    def _find_row(self, key: Tuple[int, int], vendor: str) -> int:
+        """Row of a vendor's quote in a cell, from the cell's row list, or -1"""
+        store = self.store
+        vendor_code = store.vendors.lookup(vendor)
+        if vendor_code < 0 or key not in self._cells:
+            return -1
+        vendors = store.column("vendor")
+        for row in self._cells[key]:
+            if vendors[row] == vendor_code:
+                return row
+        return -1
+
+    def apply_quote_update(self, city: str, item: str, vendor: str, fields: Dict[str, Any]) -> int:
+        """Apply one vendor's new quote fields and refresh the affected aggregates
+
+        Updates the quote in the store (adding it if the vendor has no quote
+        in that cell yet, in which case fields must be a complete quote) and
+        returns its row number.
+        """
+        store = self.store
+        key = (store.cities.lookup(city), store.items.lookup(item))
+        row = self._find_row(key, vendor)
+        if row < 0:
+            row = store.append(city, item, dict(fields, vendor_name=vendor))
+            key = (store.cities.lookup(city), store.items.lookup(item))
+            old_price = None
+        else:
+            old_price = float(store.column("price_inr")[row])
+            store.update(row, fields)
+        new_price = float(store.column("price_inr")[row])
+
+        if key not in self._cells:
+            self._cells[key] = []
+            self._item_cells.setdefault(key[1], []).append(key)
+        if old_price is None:
+            self._cells[key].append(row)
+        self._refresh_cell(key)
+
+        item_code = key[1]
+        if self._tracked(key):
+            if item_code not in self._item_sum:
+                self._item_sum[item_code], self._item_count[item_code] = 0, 0
+                self._item_min[item_code], self._item_max[item_code] = [], []
+            if old_price is None:
+                self._item_count[item_code] += 1
+                self._item_sum[item_code] += new_price
+            else:
+                self._item_sum[item_code] += new_price - old_price
+            if new_price != old_price:
+                self._push(item_code, row, new_price)
+        return row
+
+    def withdraw_quote(self, city: str, item: str, vendor: str) -> int:
+        """Remove a vendor's quote from the store and the aggregates; returns its former row
+
+        The store moves its last quote into the freed row; that quote's
+        cell list and heap entries follow it. A cell's only quote cannot be
+        withdrawn (every reported cell has a best price).
+        """
+        store = self.store
+        key = (store.cities.lookup(city), store.items.lookup(item))
+        row = self._find_row(key, vendor)
+        if row < 0:
+            raise KeyError(f"No quote from {vendor} for {item} in {city}")
+        if len(self._cells[key]) == 1:
+            raise ValueError(f"Cannot withdraw the only quote for {item} in {city}")
+        price = float(store.column("price_inr")[row])
+
+        self._cells[key].remove(row)
+        self._restamp(row)
+        if self._tracked(key):
+            self._item_count[key[1]] -= 1
+            self._item_sum[key[1]] -= price
+
+        moved = store.remove(row)
+        if moved >= 0:
+            moved_key = (int(store.column("city")[row]), int(store.column("item")[row]))
+            moved_rows = self._cells[moved_key]
+            moved_rows[moved_rows.index(moved)] = row
+            # Entries under the moved quote's old row number are now stale
+            self._restamp(moved)
+            if self._tracked(moved_key):
+                self._push(moved_key[1], row, float(store.column("price_inr")[row]))
+        self._refresh_cell(key)
+        return row
+
+    def _refresh_cell(self, key: Tuple[int, int]):
+        """Recompute a cell's best price and risk, and roll the change into its city"""
+        store = self.store
+        rows = self._cells[key]
+        best = float(store.column("price_inr")[rows].min())
+        high = int((store.column("stockout")[rows] == self._high_code).sum())
+        old_best = self._cell_best.get(key)
+        old_high = self._cell_high.get(key, 0)
+        self._cell_best[key], self._cell_high[key] = best, high
+
+        city_code = key[0]
+        if city_code in self._city_total:
+            self._city_total[city_code] += best - (old_best or 0)
+            self._city_high[city_code] += (high > 0) - (old_high > 0)
+
+    def sections(self) -> Dict:
+        """Current city_analysis and item_comparison sections"""
+        analyzer = self.analyzer
+        store = self.store
+        city_analysis = {}
+        for name in analyzer.cities:
+            code = store.cities.lookup(name)
+            total_cost = self._city_total.get(code, 0)
+            city_analysis[name] = {
+                "total_procurement_cost_inr": round(total_cost, 2),
+                "total_procurement_cost_usd": analyzer.rates.convert(total_cost, "USD"),
+                "high_risk_items": self._city_high.get(code, 0),
+                "vendor_count": len(analyzer.food_items) * 3
+            }
+
+        item_comparison = {}
+        for name in analyzer.food_items:
+            code = store.items.lookup(name)
+            low = self._heap_top(self._item_min[code], 1.0)
+            high = self._heap_top(self._item_max[code], -1.0)
+            item_comparison[name] = {
+                "min_price_inr": low,
+                "max_price_inr": high,
+                "avg_price_inr": round(self._item_sum[code] / self._item_count[code], 2),
+                "price_variance": round(high - low, 2)
+            }
+        return {"city_analysis": city_analysis, "item_comparison": item_comparison}
+
+    def report(self) -> Dict:
+        """Full analysis report in the generate_analysis_report layout"""
+        report = {
+            "report_metadata": self.analyzer._report_metadata(),
+            "city_analysis": {},
+            "item_comparison": {},
+            "procurement_recommendations": []
+        }
+        report.update(self.sections())
+        return report
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Quote Ingestion - Pluggable loaders for real vendor quotation feeds
+Streams CSV (export_to_csv schema), JSON (nested vendor data) and SQLite
+feeds into a QuoteStore in validated, type-converted batches
+"""
+
+import csv
+import gzip
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional
+
+import numpy as np
+
+from currency import RateTable
+from quote_store import QuoteStore, STOCKOUT_LEVELS
+
+DEFAULT_BATCH_SIZE = 50000
+# MOQs are stored as int32 kg
+MAX_MOQ_KG = np.iinfo(np.int32).max
+
+# CSV header written by ProcurementAnalyzer.export_to_csv -> batch field
+CSV_COLUMNS = {
+    "City": "city", "Item": "item", "Vendor": "vendor_name", "Contact": "contact",
+    "Price_INR": "price_inr", "Price_USD": "price_usd", "MOQ_KG": "moq_kg",
+    "Stockout_Risk": "stockout_frequency", "Last_Updated": "last_updated",
+    "Confidential_Rating": "confidential_rating",
+    "Price": "price", "Currency": "currency"
+}
+
+REQUIRED_FIELDS = ["city", "item", "vendor_name", "price_inr", "moq_kg", "stockout_frequency"]
+# price + currency may replace price_inr for quotes in another currency;
+# price_usd is accepted but recomputed from price_inr
+OPTIONAL_FIELDS = ["contact", "price_usd", "last_updated", "confidential_rating", "price", "currency"]
+
+# Keys under which a nested city -> item -> [quote] dict may appear in JSON feeds
+JSON_VENDOR_DATA_KEYS = ["vendor_data", "all_vendor_data", "data"]
+
+
+class QuoteValidationError(ValueError):
+    """A quotation feed does not match the expected schema"""
+
+
+class QuoteSource(ABC):
+    """A feed of vendor quotations
+
+    Subclasses implement iter_batches, yielding dicts of field name -> list
+    of raw values (see REQUIRED_FIELDS / OPTIONAL_FIELDS).
+    """
+
+    name = "quotes"
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, rates: Optional[RateTable] = None):
+        self.batch_size = batch_size
+        self.rates = rates if rates is not None else RateTable()
+
+    @abstractmethod
+    def iter_batches(self) -> Iterator[Dict[str, List[Any]]]:
+        """Yield raw batches of field name -> list of values"""
+
+    def iter_columns(self) -> Iterator[Dict[str, Any]]:
+        """Yield validated, type-converted column batches"""
+        first_row = 0
+        for batch in self.iter_batches():
+            yield convert_batch(batch, self.rates, self.name, first_row)
+            first_row += len(batch["city"])
+
+    def load(self, store: Optional[QuoteStore] = None) -> QuoteStore:
+        """Stream the whole feed into a QuoteStore"""
+        store = store if store is not None else QuoteStore(capacity=self.batch_size, rates=self.rates)
+        for columns in self.iter_columns():
+            store.append_columns(columns)
+        return store
+
+
+def convert_batch(batch: Dict[str, List[Any]], rates: RateTable, where: str,
+                  first_row: int = 0) -> Dict[str, Any]:
+    """Validate a raw batch and convert it to typed columns
+
+    Quotes given as price + currency (price_inr missing or None) are
+    converted to INR at the current rates of the table. Optional values
+    that are None (the quote did not have the field) get the field's
+    default, row by row. A missing required value, a negative or
+    non-finite price, or an MOQ that is not a whole number of kg in int32
+    range is rejected, naming the feed row (first_row is the batch's
+    first row in the feed).
+    """
+    has_local = "price" in batch and "currency" in batch
+    missing = [field for field in REQUIRED_FIELDS
+               if field not in batch and not (field == "price_inr" and has_local)]
+    if missing:
+        raise QuoteValidationError(f"{where}: missing required fields {missing}")
+    count = len(batch["city"])
+    for field, values in batch.items():
+        if len(values) != count:
+            raise QuoteValidationError(f"{where}: field {field} has {len(values)} values, expected {count}")
+
+    columns = {}
+    for field in ("city", "item", "vendor_name"):
+        values = batch[field]
+        for empty in (None, ""):
+            if empty in values:
+                raise _row_error(where, first_row + values.index(empty), field, empty)
+        columns[field] = values
+    columns["price_inr"] = _price_inr(batch, rates, count, where, first_row)
+
+    moq = _to_array(batch["moq_kg"], np.float64, "moq_kg", where, first_row)
+    with np.errstate(invalid="ignore"):
+        bad = ~np.isfinite(moq) | (moq < 0) | (moq > MAX_MOQ_KG) | (moq != np.floor(moq))
+    if bad.any():
+        row = int(np.flatnonzero(bad)[0])
+        raise _row_error(where, first_row + row, "moq_kg", batch["moq_kg"][row])
+    columns["moq_kg"] = moq.astype(np.int32)
+
+    stockout = batch["stockout_frequency"]
+    if not set(stockout).issubset(STOCKOUT_LEVELS):
+        row = next(row for row, value in enumerate(stockout) if value not in STOCKOUT_LEVELS)
+        raise _row_error(where, first_row + row, "stockout_frequency", stockout[row])
+    columns["stockout_frequency"] = stockout
+    columns["contact"] = _with_default(batch.get("contact"), "", count)
+    columns["last_updated"] = _with_default(batch.get("last_updated"),
+                                            datetime.now().strftime("%Y-%m-%d"), count)
+    columns["confidential_rating"] = _with_default(batch.get("confidential_rating"), "", count)
+    return columns
+
+
+def _price_inr(batch: Dict[str, List[Any]], rates: RateTable, count: int, where: str,
+               first_row: int) -> np.ndarray:
+    """INR prices of a batch; rows without price_inr are converted from price + currency"""
+    prices = batch.get("price_inr")
+    if prices is not None and None not in prices:
+        return _valid_prices(prices, "price_inr", where, first_row)
+    if prices is None:
+        local = np.arange(count)
+        result = np.empty(count, dtype=np.float64)
+    else:
+        local = np.flatnonzero(np.fromiter((value is None for value in prices), dtype=bool, count=count))
+        given = np.setdiff1d(np.arange(count), local)
+        result = np.empty(count, dtype=np.float64)
+        result[given] = _valid_prices([prices[row] for row in given], "price_inr", where, first_row, given)
+    if "price" not in batch or "currency" not in batch:
+        raise _row_error(where, first_row + int(local[0]), "price_inr", None)
+    currencies = [batch["currency"][row] for row in local]
+    if None in currencies:
+        raise _row_error(where, first_row + int(local[currencies.index(None)]), "currency", None)
+    amounts = _valid_prices([batch["price"][row] for row in local], "price", where, first_row, local)
+    try:
+        result[local] = rates.to_base(amounts, currencies)
+    except KeyError as exc:
+        raise QuoteValidationError(f"{where}: {exc.args[0]}") from None
+    return result
+
+
+def _valid_prices(values: List[Any], field: str, where: str, first_row: int,
+                  rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """Float prices, rejecting missing, negative and non-finite (nan, inf) values"""
+    prices = _to_array(values, np.float64, field, where, first_row, rows)
+    with np.errstate(invalid="ignore"):
+        bad = ~np.isfinite(prices) | (prices < 0)
+    if bad.any():
+        position = int(np.flatnonzero(bad)[0])
+        row = position if rows is None else int(rows[position])
+        raise _row_error(where, first_row + row, field, values[position])
+    return prices
+
+
+def _row_error(where: str, row: int, field: str, value: Any) -> QuoteValidationError:
+    if value is None or value == "":
+        return QuoteValidationError(f"{where}: row {row} is missing required {field}")
+    return QuoteValidationError(f"{where}: row {row} has invalid {field} {value!r}")
+
+
+def _with_default(values: Optional[List[Any]], default: Any, count: int) -> List[Any]:
+    """An optional column with None (or the whole column) replaced by default"""
+    if values is None:
+        return [default] * count
+    return [default if value is None else value for value in values]
+
+
+def _to_array(values: List[Any], dtype, field: str, where: str, first_row: int = 0,
+              rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert one column, naming the first bad value on failure
+
+    rows gives the batch row of each value when values is a subset of a column.
+    """
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        for position, value in enumerate(values):
+            try:
+                dtype(value)
+            except (TypeError, ValueError):
+                row = position if rows is None else int(rows[position])
+                raise _row_error(where, first_row + row, field, value) from None
+        raise
+
+
+class CSVQuoteSource(QuoteSource):
+    """CSV feed in the export_to_csv schema (plain or .gz)"""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.name = path
+
+    def iter_batches(self) -> Iterator[Dict[str, List[Any]]]:
+        opener = gzip.open if self.path.endswith(".gz") else open
+        with opener(self.path, 'rt', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            unknown = [name for name in header if name not in CSV_COLUMNS]
+            if unknown:
+                raise QuoteValidationError(f"{self.path}: unexpected columns {unknown}")
+            fields = [CSV_COLUMNS[name] for name in header]
+            batch: List[List[str]] = []
+            for row in reader:
+                if len(row) != len(fields):
+                    raise QuoteValidationError(
+                        f"{self.path}:{reader.line_num}: expected {len(fields)} values, got {len(row)}")
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    yield dict(zip(fields, map(list, zip(*batch))))
+                    batch = []
+            if batch:
+                yield dict(zip(fields, map(list, zip(*batch))))
+
+
+class JSONQuoteSource(QuoteSource):
+    """JSON feed holding a nested city -> item -> [quote] dict
+
+    The nested dict may be the document itself or sit under "vendor_data",
+    "all_vendor_data" (the confidential export) or "data", optionally
+    inside a single top-level wrapper object. Analysis reports such as
+    sample_data.json hold aggregates only, no quotes, and are rejected.
+    The document is parsed in one go (the stdlib has no streaming parser);
+    batches are then converted without materializing a second copy.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.name = path
+
+    @staticmethod
+    def _find_vendor_data(document: Any) -> Optional[Dict]:
+        if not isinstance(document, dict):
+            return None
+        for key in JSON_VENDOR_DATA_KEYS:
+            if isinstance(document.get(key), dict):
+                return document[key]
+        if len(document) == 1:
+            found = JSONQuoteSource._find_vendor_data(next(iter(document.values())))
+            if found is not None:
+                return found
+        values = list(document.values())
+        if values and all(isinstance(items, dict) and
+                          all(isinstance(quotes, list) for quotes in items.values())
+                          for items in values):
+            return document
+        return None
+
+    def iter_batches(self) -> Iterator[Dict[str, List[Any]]]:
+        with open(self.path, encoding='utf-8') as file:
+            vendor_data = self._find_vendor_data(json.load(file))
+        if vendor_data is None:
+            raise QuoteValidationError(f"{self.path}: no city -> item -> [quote] data found")
+
+        required = REQUIRED_FIELDS[2:]
+        batch: Dict[str, List[Any]] = {field: [] for field in REQUIRED_FIELDS}
+        row = 0
+        for city, items in vendor_data.items():
+            for item, quotes in items.items():
+                for quote in quotes:
+                    missing = [field for field in required if field not in quote
+                               and not (field == "price_inr" and "price" in quote and "currency" in quote)]
+                    if missing:
+                        raise QuoteValidationError(
+                            f"{self.path}: row {row} ({city} / {item}) is missing required {missing}")
+                    batch["city"].append(city)
+                    batch["item"].append(item)
+                    # price_inr stays None for a quote given as price + currency
+                    for field in required:
+                        batch[field].append(quote.get(field))
+                    for field in OPTIONAL_FIELDS:
+                        if field in batch:
+                            batch[field].append(quote.get(field))
+                        elif field in quote:
+                            # First quote with this field: earlier rows get None
+                            batch[field] = [None] * (len(batch["city"]) - 1) + [quote[field]]
+                    row += 1
+                    if len(batch["city"]) >= self.batch_size:
+                        yield batch
+                        batch = {field: [] for field in REQUIRED_FIELDS}
+        if batch["city"]:
+            yield batch
+
+
+class SQLiteQuoteSource(QuoteSource):
+    """SQLite table with one column per batch field (the portal_server layout)"""
+
+    def __init__(self, path: str, table: str = "quotes", **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.table = table
+        self.name = f"{path}:{table}"
+
+    def iter_batches(self) -> Iterator[Dict[str, List[Any]]]:
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(f"SELECT * FROM {self.table} ORDER BY rowid")
+            fields = [description[0] for description in cursor.description]
+            unknown = [name for name in fields if name not in REQUIRED_FIELDS + OPTIONAL_FIELDS]
+            if unknown:
+                raise QuoteValidationError(f"{self.name}: unexpected columns {unknown}")
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield dict(zip(fields, map(list, zip(*rows))))
+        finally:
+            conn.close()
+
+
+def source_for_path(path: str, **kwargs) -> QuoteSource:
+    """Pick a QuoteSource from a file extension"""
+    lower = path.lower()
+    if lower.endswith((".csv", ".csv.gz")):
+        return CSVQuoteSource(path, **kwargs)
+    if lower.endswith(".json"):
+        return JSONQuoteSource(path, **kwargs)
+    if lower.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteQuoteSource(path, **kwargs)
+    raise ValueError(f"No quote source for file type: {path}")
+
+
+def _load_path(path: str, kwargs: Dict[str, Any]) -> QuoteStore:
+    return source_for_path(path, **kwargs).load()
+
+
+class MultiFileSource(QuoteSource):
+    """Several feed files loaded in parallel worker processes
+
+    Each file becomes its own QuoteStore in a worker, converted with this
+    source's rates; the stores are then merged in path order with their
+    dictionary codes remapped.
+    """
+
+    def __init__(self, paths: List[str], workers: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.paths = list(paths)
+        self.workers = workers
+        self.name = ",".join(self.paths)
+        self._kwargs = kwargs
+
+    def _file_kwargs(self) -> Dict[str, Any]:
+        """Arguments of the per-file sources, with this source's current rates"""
+        return dict(self._kwargs, rates=self.rates)
+
+    def iter_batches(self) -> Iterator[Dict[str, List[Any]]]:
+        for path in self.paths:
+            yield from source_for_path(path, **self._file_kwargs()).iter_batches()
+
+    def load(self, store: Optional[QuoteStore] = None) -> QuoteStore:
+        store = store if store is not None else QuoteStore(capacity=self.batch_size, rates=self.rates)
+        workers = min(self.workers or os.cpu_count() or 1, len(self.paths))
+        kwargs = self._file_kwargs()
+        if workers <= 1:
+            for path in self.paths:
+                store.extend(_load_path(path, kwargs))
+            return store
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_load_path, self.paths, [kwargs] * len(self.paths)):
+                store.extend(part)
+        return store
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Pipeline Instrumentation - Stage timers, counters and optional profiling
+Stage timings and row/byte counters are always collected (two clock reads
+per stage); cProfile and tracemalloc capture only run when switched on via
+PROCUREMENT_PROFILE or the --profile flag
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional
+
+PROFILE_ENV_VAR = "PROCUREMENT_PROFILE"
+PROFILE_MODES = ["cprofile", "tracemalloc", "all"]
+METRICS_FORMATS = ["json", "prometheus"]
+
+
+def profile_mode_from_env() -> Optional[str]:
+    """Profiling mode requested through PROCUREMENT_PROFILE (1/true means all)"""
+    value = os.environ.get(PROFILE_ENV_VAR, "").strip().lower()
+    if value in ("", "0", "false", "off"):
+        return None
+    if value in ("1", "true", "on"):
+        return "all"
+    if value not in PROFILE_MODES:
+        raise ValueError(f"{PROFILE_ENV_VAR} must be one of {PROFILE_MODES}, got {value!r}")
+    return value
+
+
+class PipelineMetrics:
+    """Per-stage wall time, counters and optional cProfile/tracemalloc capture"""
+
+    def __init__(self, profile: Optional[str] = None, output_dir: str = "."):
+        if profile is not None and profile not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {profile}")
+        self.profile = profile
+        self.output_dir = output_dir
+        self.started = datetime.now().isoformat()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._order: List[str] = []
+
+    def _stage_record(self, name: str) -> Dict[str, Any]:
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = {"seconds": 0.0, "calls": 0, "counters": {}}
+            self._order.append(name)
+        return record
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Time a pipeline stage; yields its record so callers can add counters"""
+        record = self._stage_record(name)
+        profiler = None
+        trace_memory = self.profile in ("tracemalloc", "all")
+        # Profilers are imported only when switched on; plain timing needs neither
+        if trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        if self.profile in ("cprofile", "all"):
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] += time.perf_counter() - started
+            record["calls"] += 1
+            if profiler is not None:
+                profiler.disable()
+                path = os.path.join(self.output_dir, f"profile_{name}.prof")
+                profiler.dump_stats(path)
+                record["cprofile_file"] = path
+            if trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record["alloc_peak_bytes"] = peak - memory_before
+                record["alloc_retained_bytes"] = current - memory_before
+
+    def count(self, stage: str, counter: str, value: int = 1):
+        """Add to a counter (e.g. rows_processed, bytes_written) of a stage"""
+        counters = self._stage_record(stage)["counters"]
+        counters[counter] = counters.get(counter, 0) + value
+
+    def add_file_bytes(self, stage: str, *paths: str):
+        """Count the size of files written by a stage as bytes_written"""
+        for path in paths:
+            if os.path.isfile(path):
+                self.count(stage, "bytes_written", os.path.getsize(path))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "profile": self.profile,
+            "total_seconds": round(sum(record["seconds"] for record in self.stages.values()), 6),
+            "stages": {name: dict(self.stages[name], seconds=round(self.stages[name]["seconds"], 6))
+                       for name in self._order}
+        }
+
+    def to_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP procurement_stage_seconds Wall-clock seconds spent in a pipeline stage",
+            "# TYPE procurement_stage_seconds gauge",
+        ]
+        lines += [f'procurement_stage_seconds{{stage="{name}"}} {self.stages[name]["seconds"]:.6f}'
+                  for name in self._order]
+        counters = sorted({counter for record in self.stages.values() for counter in record["counters"]})
+        for counter in counters:
+            metric = f"procurement_{counter}_total"
+            lines.append(f"# HELP {metric} {counter.replace('_', ' ').capitalize()} per pipeline stage")
+            lines.append(f"# TYPE {metric} counter")
+            lines += [f'{metric}{{stage="{name}"}} {self.stages[name]["counters"][counter]}'
+                      for name in self._order if counter in self.stages[name]["counters"]]
+        if any("alloc_peak_bytes" in record for record in self.stages.values()):
+            lines.append("# HELP procurement_stage_alloc_peak_bytes Peak traced allocation in a stage")
+            lines.append("# TYPE procurement_stage_alloc_peak_bytes gauge")
+            lines += [f'procurement_stage_alloc_peak_bytes{{stage="{name}"}} '
+                      f'{self.stages[name]["alloc_peak_bytes"]}'
+                      for name in self._order if "alloc_peak_bytes" in self.stages[name]]
+        return "\n".join(lines) + "\n"
+
+    def write(self, metrics_format: str = "json", filename: Optional[str] = None) -> str:
+        """Write the metrics file next to the reports and return its path"""
+        if metrics_format not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format: {metrics_format}")
+        if filename is None:
+            filename = "pipeline_metrics.json" if metrics_format == "json" else "pipeline_metrics.prom"
+        path = os.path.join(self.output_dir, filename)
+        with open(path, 'w') as file:
+            if metrics_format == "json":
+                json.dump(self.to_dict(), file, indent=2)
+            else:
+                file.write(self.to_prometheus())
+        return path
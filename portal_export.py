@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Portal Export - Bulk generation of restricted vendor portal files
+Partitions the quote store by vendor in one pass and serializes the
+per-vendor JSON files in parallel worker processes
+"""
+
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+
+from serialization import JSONSerializer
+
+if TYPE_CHECKING:
+    import numpy as np
+    from quote_store import QuoteStore
+
+PORTAL_WARNING = "You can only view your own quotations. Competitor data is confidential."
+
+# Quote columns shipped to workers (everything except confidential_rating)
+_PORTAL_COLUMNS = ["city", "item", "contact", "price_inr", "price_usd", "moq_kg",
+                   "stockout", "last_updated"]
+
+
+def vendor_portal_filename(vendor_name: str) -> str:
+    """File name of a vendor's portal file"""
+    return f"{vendor_name.lower().replace(' ', '_')}_portal.json"
+
+
+def vendor_portal_payload(vendor_name: str, quotations: Dict) -> Dict:
+    """Restricted portal document for one vendor"""
+    return {
+        "access_type": "VENDOR_RESTRICTED",
+        "vendor_name": vendor_name,
+        "warning": PORTAL_WARNING,
+        "your_quotations": quotations
+    }
+
+
+# Per-process state set by _init_worker
+_worker_context: Dict[str, Any] = {}
+
+
+def _init_worker(context: Dict[str, Any]):
+    """Receive dictionaries and output settings once per worker process"""
+    _worker_context.clear()
+    _worker_context.update(context)
+
+
+def _write_portal_batch(vendor_codes: List[int], bounds: List[int],
+                        columns: Dict[str, "np.ndarray"]) -> Dict[str, Any]:
+    """Build and write the portal files for a batch of vendors"""
+    started = time.perf_counter()
+    ctx = _worker_context
+    cities, items, vendors = ctx["cities"], ctx["items"], ctx["vendors"]
+    stockout_levels, dates = ctx["stockout_levels"], ctx["dates"]
+    listed_cities = ctx["listed_cities"]
+    serializer = JSONSerializer(compact=ctx["compact"], backend=ctx["backend"])
+    city = columns["city"].tolist()
+    item = columns["item"].tolist()
+    contact = columns["contact"].tolist()
+    price_inr = columns["price_inr"].tolist()
+    price_usd = columns["price_usd"].tolist()
+    moq_kg = columns["moq_kg"].tolist()
+    stockout = columns["stockout"].tolist()
+    last_updated = columns["last_updated"].tolist()
+    bytes_written = 0
+
+    for index, vendor_code in enumerate(vendor_codes):
+        vendor_name = vendors[vendor_code]
+        quotations = {name: {} for name in listed_cities}
+        for row in range(bounds[index], bounds[index + 1]):
+            city_quotes = quotations.get(cities[city[row]])
+            if city_quotes is None:
+                continue
+            city_quotes.setdefault(items[item[row]], []).append({
+                "vendor_name": vendor_name,
+                "contact": contact[row],
+                "price_inr": price_inr[row],
+                "price_usd": price_usd[row],
+                "moq_kg": moq_kg[row],
+                "stockout_frequency": stockout_levels[stockout[row]],
+                "last_updated": dates[last_updated[row]]
+            })
+        data = serializer.dumps(vendor_portal_payload(vendor_name, quotations)).encode('utf-8')
+        path = os.path.join(ctx["output_dir"], vendor_portal_filename(vendor_name))
+        with open(path, 'wb') as file:
+            file.write(data)
+        bytes_written += len(data)
+
+    return {
+        "pid": os.getpid(),
+        "vendors": len(vendor_codes),
+        "quotes": bounds[-1] - bounds[0],
+        "bytes": bytes_written,
+        "seconds": time.perf_counter() - started
+    }
+
+
+def write_all_vendor_portals(store: "QuoteStore", cities: List[str], output_dir: str = ".",
+                             workers: Optional[int] = None,
+                             batch_quotes: int = 50000, compact: bool = False,
+                             backend: str = "auto") -> Dict[str, Any]:
+    """Write one portal file per vendor and return throughput statistics
+
+    The store is partitioned by vendor with a single stable argsort; vendors
+    are then grouped into batches of roughly batch_quotes quotes that a pool
+    of workers builds and serializes. workers=1 runs in-process. compact and
+    backend are passed to the workers' JSONSerializer.
+    """
+    # NumPy and the process pool are only needed here, not for single portal files
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy as np
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    # One pass: rows ordered by vendor, then city/item cell, then insertion
+    vendor = store.column("vendor").astype(np.int64)
+    cell = store.column("city").astype(np.int64) * max(len(store.items), 1) + store.column("item")
+    order = np.lexsort((cell, vendor))
+    counts = np.bincount(vendor, minlength=len(store.vendors))
+    offsets = np.r_[0, np.cumsum(counts)]
+
+    # Batches of whole vendors, biggest vendors first so the pool stays balanced
+    tasks = []
+    batch: List[int] = []
+    batch_size = 0
+    for code in np.argsort(-counts, kind="stable").tolist():
+        if counts[code] == 0:
+            continue
+        batch.append(code)
+        batch_size += int(counts[code])
+        if batch_size >= batch_quotes:
+            tasks.append(batch)
+            batch, batch_size = [], 0
+    if batch:
+        tasks.append(batch)
+
+    def task_args(codes: List[int]):
+        rows = np.concatenate([order[offsets[code]:offsets[code + 1]] for code in codes])
+        bounds = np.r_[0, np.cumsum(counts[codes])].tolist()
+        return codes, bounds, {name: store.column(name)[rows] for name in _PORTAL_COLUMNS}
+
+    context = {
+        "cities": list(store.cities.values),
+        "items": list(store.items.values),
+        "vendors": list(store.vendors.values),
+        "stockout_levels": list(store.stockout_levels.values),
+        "dates": list(store.dates.values),
+        "listed_cities": list(cities),
+        "output_dir": output_dir,
+        "compact": compact,
+        "backend": backend
+    }
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(context)
+        results = [_write_portal_batch(*task_args(codes)) for codes in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(context,)) as pool:
+            futures = [pool.submit(_write_portal_batch, *task_args(codes)) for codes in tasks]
+            results = [future.result() for future in futures]
+
+    elapsed = time.perf_counter() - started
+    per_worker: Dict[int, Dict[str, float]] = {}
+    for result in results:
+        stats = per_worker.setdefault(result["pid"], {"batches": 0, "vendors": 0, "quotes": 0,
+                                                      "bytes": 0, "busy_seconds": 0.0})
+        stats["batches"] += 1
+        stats["vendors"] += result["vendors"]
+        stats["quotes"] += result["quotes"]
+        stats["bytes"] += result["bytes"]
+        stats["busy_seconds"] += result["seconds"]
+    vendor_total = sum(result["vendors"] for result in results)
+    return {
+        "output_dir": output_dir,
+        "vendors": vendor_total,
+        "quotes": sum(result["quotes"] for result in results),
+        "bytes": sum(result["bytes"] for result in results),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 4),
+        "vendors_per_second": round(vendor_total / elapsed, 1) if elapsed > 0 else 0.0,
+        "per_worker": per_worker
+    }
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Portal Load Test - Concurrent keep-alive clients against portal_server.py
+Reports p50/p99 latency and requests per second as JSON
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Tuple
+
+BLU_CREDENTIALS = ("BLU_MARITIME", "BLU_ADMIN_2024")
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, int]:
+    """Read one HTTP response and return (status, body bytes)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        size = 0
+        while True:
+            chunk_size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(chunk_size + 2)
+            if chunk_size == 0:
+                return status, size
+            size += chunk_size
+    length = int(headers.get("content-length", 0))
+    await reader.readexactly(length)
+    return status, length
+
+
+async def _client(host: str, port: int, users: List[Tuple[str, str]], path: str,
+                  deadline: float, budget: List[int], latencies: List[float],
+                  errors: List[int], offset: int):
+    """One keep-alive connection issuing requests until the budget or time runs out"""
+    reader, writer = await asyncio.open_connection(host, port)
+    index = offset
+    try:
+        while budget[0] > 0 and time.perf_counter() < deadline:
+            budget[0] -= 1
+            user_id, access_key = users[index % len(users)]
+            index += 1
+            request = (f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+                       f"X-User-Id: {user_id}\r\nX-Access-Key: {access_key}\r\n\r\n")
+            started = time.perf_counter()
+            writer.write(request.encode())
+            status, _ = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 500:
+                errors[0] += 1
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load_test(host: str, port: int, users: List[Tuple[str, str]],
+                        concurrency: int = 50, requests: int = 5000,
+                        duration: float = 30.0, path: str = "/quotes") -> Dict[str, Any]:
+    """Drive the server with concurrent clients and summarize latency/throughput"""
+    latencies: List[float] = []
+    errors = [0]
+    budget = [requests]
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        _client(host, port, users, path, deadline, budget, latencies, errors, offset)
+        for offset in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0
+        }
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(host: str, port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"portal server did not start on {host}:{port}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the vendor portal HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--spawn", action="store_true",
+                        help="start portal_server.py in a subprocess on a free port")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=30.0, help="time limit in seconds")
+    parser.add_argument("--users", default="Mumbai_Vendor_A,Delhi_Vendor_B,Pune_Vendor_C",
+                        help="comma-separated vendor ids to cycle through")
+    parser.add_argument("--include-blu", action="store_true",
+                        help="mix BLU Maritime full-access requests into the user cycle")
+    parser.add_argument("--output", help="write the JSON summary to this file")
+    args = parser.parse_args(argv)
+
+    users = [(user, "vendor_key") for user in args.users.split(",") if user]
+    if args.include_blu:
+        users.append(BLU_CREDENTIALS)
+
+    server = None
+    if args.spawn:
+        args.port = _free_port()
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "portal_server.py")
+        server = subprocess.Popen([sys.executable, script, "--host", args.host,
+                                   "--port", str(args.port)], stdout=subprocess.DEVNULL)
+    try:
+        if server is not None:
+            _wait_for_port(args.host, args.port)
+        summary = asyncio.run(run_load_test(args.host, args.port, users, args.concurrency,
+                                            args.requests, args.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    text = json.dumps(summary, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Portal Server - Async HTTP front-end for the Vendor Portal
+Serves BLU Maritime and vendor views live from a pluggable quote backend,
+streaming JSON responses from a single asyncio event loop
+"""
+
+import argparse
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+from quote_db import QuoteDatabase
+from quote_store import QuoteStore
+from serialization import iter_json_chunks
+from vendor_portal import VendorPortal
+
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+# Request bodies are read and discarded (every route is a GET) up to this size
+MAX_BODY_BYTES = 1024 * 1024
+# The backend's data version is polled at most this often (seconds)
+VERSION_CHECK_INTERVAL = 1.0
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class QuoteBackend(ABC):
+    """Source of the quote store served by the portal"""
+
+    @abstractmethod
+    def load(self) -> QuoteStore:
+        """Current quotes as a QuoteStore"""
+
+    def version(self) -> Optional[int]:
+        """Data version of the backend, or None if it never changes"""
+        return None
+
+
+class InMemoryBackend(QuoteBackend):
+    """Serve a QuoteStore that already lives in this process"""
+
+    def __init__(self, store: QuoteStore):
+        self.store = store
+
+    def load(self) -> QuoteStore:
+        return self.store
+
+
+class SQLiteBackend(QuoteBackend):
+    """Serve the quotes of a persistent QuoteDatabase, reloading after writes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.database = QuoteDatabase(path)
+
+    @classmethod
+    def write(cls, store: QuoteStore, path: str) -> "SQLiteBackend":
+        """Upsert a QuoteStore into the database at path"""
+        backend = cls(path)
+        backend.database.upsert_store(store)
+        return backend
+
+    def load(self) -> QuoteStore:
+        return self.database.store()
+
+    def version(self) -> Optional[int]:
+        return self.database.version()
+
+
+class PortalService:
+    """HTTP/1.1 keep-alive service around VendorPortal
+
+    Routes:
+      GET /health  - liveness probe
+      GET /quotes  - the caller's view; credentials in X-User-Id / X-Access-Key
+      GET /public  - aggregate prices with no vendor details (no credentials)
+      GET /stats   - materialized view counters (BLU Maritime only)
+
+    Views are materialized once per data version and written from shared
+    pre-encoded bytes, so a request costs no per-quote redaction work.
+    Writes to the backend are picked up in the background: the version is
+    polled at most every VERSION_CHECK_INTERVAL seconds, and a changed
+    store is loaded and its views built in a worker thread while requests
+    keep being served from the previous store.
+    """
+
+    def __init__(self, backend: QuoteBackend, portal: Optional[VendorPortal] = None):
+        self.backend = backend
+        self.portal = portal or VendorPortal()
+        self.store_version = backend.version()
+        self.store = backend.load()
+        self.requests_served = 0
+        self.reloads = 0
+        self._checked_at = time.monotonic()
+        self._refreshing: Optional[asyncio.Task] = None
+
+    def reload(self):
+        """Reload quotes from the backend now (blocking); views are rebuilt for the new store"""
+        self.store_version = self.backend.version()
+        self.store = self.backend.load()
+        self.reloads += 1
+
+    def _load_if_changed(self):
+        """(version, store, engine) if the backend changed since the store was loaded, else None
+
+        Runs in a worker thread; nothing is swapped in here.
+        """
+        version = self.backend.version()
+        if version == self.store_version:
+            return None
+        store = self.backend.load()
+        return version, store, self.portal.prepare_engine(store)
+
+    async def _refresh(self):
+        """Load a changed store off the event loop, then swap it in"""
+        try:
+            loaded = await asyncio.get_running_loop().run_in_executor(None, self._load_if_changed)
+            if loaded is not None:
+                self.store_version, self.store, engine = loaded
+                self.portal.use_engine(engine)
+                self.reloads += 1
+        except Exception as exc:
+            print(f"⚠️ Reload from the quote backend failed, serving the previous data: {exc}")
+        finally:
+            self._refreshing = None
+
+    def _schedule_refresh(self):
+        """Start a background refresh if the version is due for a check"""
+        if self.store_version is None or self._refreshing is not None:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        self._refreshing = asyncio.get_running_loop().create_task(self._refresh())
+
+    def handle(self, method: str, path: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        """Route one request to a status code and JSON payload"""
+        if method != "GET":
+            return 405, {"error": "Method Not Allowed"}
+        route = path.split("?", 1)[0]
+        if route == "/health":
+            return 200, {"status": "ok", "quotes": len(self.store)}
+        if route == "/public":
+            return 200, self.portal.get_public_report(self.store)
+        if route not in ("/quotes", "/stats"):
+            return 404, {"error": "Not Found"}
+
+        auth_info = self.portal.authenticate_user(headers.get("x-user-id", ""),
+                                                  headers.get("x-access-key", ""))
+        if route == "/stats":
+            if auth_info["access_level"] != "FULL_ACCESS":
+                return 403, {"error": "Access Denied"}
+            return 200, {"requests_served": self.requests_served, "reloads": self.reloads,
+                         "views": self.portal.cache_stats()}
+        data = self.portal.get_vendor_response(auth_info, self.store)
+        return (403 if "error" in data else 200), data
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                    keep_alive: bool):
+        """Write a chunked JSON response, draining as the buffer fills"""
+        writer.write((f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                      "Content-Type: application/json\r\n"
+                      "Transfer-Encoding: chunked\r\n"
+                      f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode())
+        pending, pending_size = [], 0
+        for piece in iter_json_chunks(payload):
+            if len(piece) >= STREAM_CHUNK_SIZE:
+                # Large pieces (pre-encoded views) go out as their own chunk, uncopied
+                if pending:
+                    body = b"".join(pending)
+                    writer.write(b"%x\r\n%s\r\n" % (len(body), body))
+                    pending, pending_size = [], 0
+                writer.write(b"%x\r\n" % len(piece))
+                writer.write(piece)
+                writer.write(b"\r\n")
+                await writer.drain()
+                continue
+            pending.append(piece)
+            pending_size += len(piece)
+            if pending_size >= STREAM_CHUNK_SIZE:
+                body = b"".join(pending)
+                writer.write(b"%x\r\n%s\r\n" % (len(body), body))
+                pending, pending_size = [], 0
+                await writer.drain()
+        if pending:
+            body = b"".join(pending)
+            writer.write(b"%x\r\n%s\r\n" % (len(body), body))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 400, {"error": "Header too large"}, False)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Bad Request"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                # Consume the body so its bytes are not read as the next request
+                if "transfer-encoding" in headers:
+                    await self._send(writer, 400, {"error": "Chunked request bodies are not supported"}, False)
+                    break
+                try:
+                    content_length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    content_length = -1
+                if content_length < 0:
+                    await self._send(writer, 400, {"error": "Bad Content-Length"}, False)
+                    break
+                if content_length > MAX_BODY_BYTES:
+                    await self._send(writer, 413, {"error": "Payload Too Large"}, False)
+                    break
+                if content_length:
+                    try:
+                        await reader.readexactly(content_length)
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        break
+                self._schedule_refresh()
+                try:
+                    status, payload = self.handle(method, path, headers)
+                except Exception as exc:
+                    status, payload = 500, {"error": "Internal Server Error", "message": str(exc)}
+                self.requests_served += 1
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """Start listening and return the asyncio server"""
+        return await asyncio.start_server(self.handle_connection, host, port,
+                                          limit=MAX_HEADER_BYTES, backlog=1024)
+
+
+def build_backend(args: argparse.Namespace) -> QuoteBackend:
+    """Backend selected on the command line"""
+    if args.backend == "sqlite":
+        return SQLiteBackend(args.db)
+    if args.arrow:
+        return InMemoryBackend(QuoteStore.read_arrow(args.arrow))
+    from procurement_analysis import ProcurementAnalyzer
+    return InMemoryBackend(ProcurementAnalyzer().quotes)
+
+
+async def run_server(args: argparse.Namespace):
+    service = PortalService(build_backend(args))
+    server = await service.serve(args.host, args.port)
+    print(f"🌐 Vendor Portal serving {len(service.store)} quotations on http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BLU Maritime vendor portal HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory",
+                        help="quote backend (default: %(default)s, generated data)")
+    parser.add_argument("--db", default="vendor_quotes.db", help="SQLite file for --backend sqlite")
+    parser.add_argument("--arrow", help="Arrow IPC file to memory-map for --backend memory")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
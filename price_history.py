@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Price History - Append-only store of daily quote snapshots
+Snapshots are Parquet files partitioned by month; range queries only open
+the months they cover, and rolling price analytics run vectorized in pandas
+"""
+
+import json
+import os
+import uuid
+from datetime import date, datetime
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from quote_store import QuoteStore, _require_pyarrow
+
+HISTORY_COLUMNS = ["date", "city", "item", "vendor_name", "price_inr", "moq_kg", "stockout_frequency"]
+SERIES_KEYS = ["city", "item", "vendor_name"]
+MANIFEST_FILE = "snapshots.log"
+COMPACTED_PREFIX = "compacted"
+
+
+class PriceHistory:
+    """Daily quote snapshots under root/month=YYYY-MM/<date>.parquet
+
+    Snapshots are never modified: each date is written once, and
+    compact() only merges a month's files into one without changing rows.
+    The dates recorded so far are kept in an append-only manifest.
+    """
+
+    def __init__(self, root: str = "price_history"):
+        self.root = root
+        self._dates: Optional[List[str]] = None
+
+    def dates(self) -> List[str]:
+        """Snapshot dates recorded so far, oldest first"""
+        if self._dates is None:
+            path = os.path.join(self.root, MANIFEST_FILE)
+            if os.path.exists(path):
+                with open(path) as file:
+                    self._dates = sorted(line.split(",", 1)[0] for line in file if line.strip())
+            else:
+                self._dates = []
+        return list(self._dates)
+
+    def _month_dir(self, snapshot_date: str) -> str:
+        return os.path.join(self.root, f"month={snapshot_date[:7]}")
+
+    def _months(self) -> List[str]:
+        """Months (YYYY-MM) that have a partition directory"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(self.root)
+                      if name.startswith("month="))
+
+    def _month_listing(self, month: str):
+        """A month's Parquet files split into (live, replaced) paths
+
+        A compacted file lists the files it merged in its schema metadata;
+        those are replaced, even if a crash left them on disk.
+        """
+        import pyarrow.parquet as pq
+        directory = os.path.join(self.root, f"month={month}")
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+        replaced = set()
+        for name in names:
+            if name.startswith(COMPACTED_PREFIX):
+                metadata = pq.read_schema(os.path.join(directory, name)).metadata or {}
+                replaced.update(json.loads(metadata.get(b"replaces", b"[]")))
+        return ([os.path.join(directory, name) for name in names if name not in replaced],
+                [os.path.join(directory, name) for name in names if name in replaced])
+
+    def _month_files(self, month: str) -> List[str]:
+        return self._month_listing(month)[0]
+
+    def append_snapshot(self, store: QuoteStore, snapshot_date: Optional[str] = None) -> str:
+        """Record every quote of a store as the snapshot of one day; returns the file written"""
+        pa = _require_pyarrow()
+        import pyarrow.parquet as pq
+        snapshot_date = snapshot_date or datetime.now().strftime("%Y-%m-%d")
+        day = date.fromisoformat(snapshot_date)
+        if snapshot_date in self.dates():
+            raise ValueError(f"Price history already has a snapshot for {snapshot_date}")
+
+        rows = np.arange(len(store))
+        table = pa.table({
+            "date": pa.array(np.full(len(store), day.toordinal() - date(1970, 1, 1).toordinal(),
+                                     dtype=np.int32), type=pa.date32()),
+            "city": pa.array(store.decode("city", rows), type=pa.string()),
+            "item": pa.array(store.decode("item", rows), type=pa.string()),
+            "vendor_name": pa.array(store.decode("vendor", rows), type=pa.string()),
+            "price_inr": pa.array(store.column("price_inr")),
+            "moq_kg": pa.array(store.column("moq_kg")),
+            "stockout_frequency": pa.array(store.decode("stockout", rows), type=pa.string()),
+        })
+        directory = self._month_dir(snapshot_date)
+        new_month = not os.path.isdir(directory)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{snapshot_date}.parquet")
+        pq.write_table(table, path, compression="zstd")
+        with open(os.path.join(self.root, MANIFEST_FILE), 'a') as file:
+            file.write(f"{snapshot_date},{len(store)}\n")
+        self._dates.append(snapshot_date)
+        self._dates.sort()
+        if new_month:
+            # A month was started: merge the daily files of the ones before it
+            self.compact()
+        return path
+
+    def compact(self, month: Optional[str] = None) -> int:
+        """Merge each month's snapshot files into one file; returns months compacted
+
+        Without month, every month except the latest one is compacted (this
+        happens automatically when a snapshot starts a new month). Fewer,
+        larger files keep long range queries fast.
+        """
+        pa = _require_pyarrow()
+        import pyarrow.parquet as pq
+        months = self._months()
+        compacted = 0
+        for month_name in months:
+            if (month is not None and month_name != month) or (month is None and month_name == months[-1]):
+                continue
+            files, stale = self._month_listing(month_name)
+            for path in stale:
+                os.remove(path)
+            if len(files) <= 1:
+                continue
+            merged = pa.concat_tables([pq.read_table(path) for path in files]).sort_by("date")
+            merged = merged.replace_schema_metadata(
+                {"replaces": json.dumps([os.path.basename(path) for path in files])})
+            directory = os.path.dirname(files[0])
+            # Put the merged file in place under a new name before deleting
+            # anything: until the old files are gone it supersedes them
+            target = os.path.join(directory, f"{COMPACTED_PREFIX}-{uuid.uuid4().hex[:12]}.parquet")
+            temporary = target + ".tmp"
+            pq.write_table(merged, temporary, compression="zstd", row_group_size=1 << 20)
+            os.replace(temporary, target)
+            for path in files:
+                os.remove(path)
+            compacted += 1
+        return compacted
+
+    def query(self, start: Optional[str] = None, end: Optional[str] = None,
+              city: Optional[str] = None, item: Optional[str] = None,
+              vendor: Optional[str] = None, columns: Optional[List[str]] = None):
+        """Snapshot rows between two dates (inclusive) as a pandas DataFrame
+
+        Only the files of month partitions overlapping [start, end] are
+        opened; date and city/item/vendor filters are pushed down to the
+        Parquet reader.
+        """
+        pa = _require_pyarrow()
+        import pyarrow.dataset as ds
+        import pandas as pd
+        columns = columns or HISTORY_COLUMNS
+        files = [path for month in self._months()
+                 if (not start or month >= start[:7]) and (not end or month <= end[:7])
+                 for path in self._month_files(month)]
+        if not files:
+            return pd.DataFrame({name: [] for name in columns})
+
+        dataset = ds.dataset(files, format="parquet")
+        condition = None
+        filters = []
+        if start:
+            filters.append(ds.field("date") >= pa.scalar(date.fromisoformat(start), pa.date32()))
+        if end:
+            filters.append(ds.field("date") <= pa.scalar(date.fromisoformat(end), pa.date32()))
+        for field, value in (("city", city), ("item", item), ("vendor_name", vendor)):
+            if value is not None:
+                filters.append(ds.field(field) == value)
+        for expression in filters:
+            condition = expression if condition is None else condition & expression
+        table = dataset.to_table(columns=columns, filter=condition)
+        return table.to_pandas(date_as_object=False)
+
+    def rolling_stats(self, window: int = 7, start: Optional[str] = None, end: Optional[str] = None,
+                      city: Optional[str] = None, item: Optional[str] = None,
+                      vendor: Optional[str] = None):
+        """Rolling price statistics per city/item/vendor over the last window snapshots
+
+        Adds rolling_mean, rolling_min, rolling_std (INR) and
+        rolling_volatility (std of day-to-day relative price changes).
+        The first rows of a series use the snapshots available so far.
+        """
+        frame = self.query(start, end, city, item, vendor,
+                           ["date"] + SERIES_KEYS + ["price_inr"])
+        if frame.empty:
+            for name in ("rolling_mean", "rolling_min", "rolling_std", "rolling_volatility"):
+                frame[name] = []
+            return frame
+        # One integer id per series, then a stable sort so every series is contiguous
+        series = frame.groupby(SERIES_KEYS, sort=False, observed=True).ngroup().to_numpy()
+        order = np.lexsort((frame["date"].to_numpy(), series))
+        frame = frame.iloc[order].reset_index(drop=True)
+        series = series[order]
+
+        price = frame["price_inr"]
+        grouped = price.groupby(series, sort=False)
+        changes = grouped.pct_change()
+        rolling = grouped.rolling(window, min_periods=1)
+        frame["rolling_mean"] = rolling.mean().reset_index(level=0, drop=True).round(2)
+        frame["rolling_min"] = rolling.min().reset_index(level=0, drop=True)
+        frame["rolling_std"] = (grouped.rolling(window, min_periods=2).std()
+                                .reset_index(level=0, drop=True).round(4))
+        frame["rolling_volatility"] = (changes.groupby(series, sort=False)
+                                       .rolling(window, min_periods=2).std()
+                                       .reset_index(level=0, drop=True).round(6))
+        return frame
+
+    def summary(self) -> Dict[str, Any]:
+        """Snapshot count, date range and files on disk"""
+        dates = self.dates()
+        files = 0
+        for directory, _, names in os.walk(self.root):
+            files += sum(name.endswith(".parquet") for name in names)
+        return {"snapshots": len(dates), "first": dates[0] if dates else None,
+                "last": dates[-1] if dates else None, "files": files}
@@ -4,16 +4,113 @@ Comprehensive Vendor Price & Stock Analysis Report - BLU Maritime
 Procurement analysis for 20 essential food items across 4 Indian cities
 """
 
+import argparse
+import gzip
+import io
 import json
 import csv
+import math
+import time
 from datetime import datetime, timedelta
 import random
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, List, Any, Callable, Iterator, Optional, TextIO
 import os
-from vendor_portal import VendorPortal
+from currency import RateTable
+from instrumentation import PipelineMetrics, PROFILE_MODES, METRICS_FORMATS, profile_mode_from_env
+from portal_export import vendor_portal_filename, vendor_portal_payload, write_all_vendor_portals
+from serialization import JSONSerializer, StreamedObject, BACKENDS
+from quote_db import QuoteDatabase, DatabaseQuoteView
+from basket_optimizer import (BasketOptimizer, default_basket, DEFAULT_DEMAND_KG,
+                              DEFAULT_MAX_HIGH_RISK_SHARE)
+
+# NumPy-backed modules (quote store, report engines, redaction, ingestion, price
+# history) are imported where they are used, so single-purpose runs such as
+# writing one vendor's portal from a quote database start without them
+if TYPE_CHECKING:
+    from quote_store import QuoteStore, NestedQuoteView
+    from ingestion import QuoteSource
+    from redaction import RedactionEngine
+
+REPORT_ENGINES = ["vectorized", "sharded", "python"]
+
+CSV_HEADER = [
+    "City", "Item", "Vendor", "Contact", "Price_INR", "Price_USD",
+    "MOQ_KG", "Stockout_Risk", "Last_Updated", "Confidential_Rating"
+]
+
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+def open_text_output(filename: str, compression: Optional[str] = None) -> TextIO:
+    """Open a buffered UTF-8 text file for writing, optionally gzip/zstd compressed"""
+    if compression is None:
+        return open(filename, 'w', newline='', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE)
+    if compression == "gzip":
+        return io.TextIOWrapper(io.BufferedWriter(gzip.open(filename, 'wb'), OUTPUT_BUFFER_SIZE),
+                                encoding='utf-8', newline='')
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression requires the 'zstandard' package") from None
+        raw = open(filename, 'wb')
+        stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(io.BufferedWriter(stream, OUTPUT_BUFFER_SIZE),
+                                encoding='utf-8', newline='')
+    raise ValueError(f"Unknown compression: {compression}")
 
 class ProcurementAnalyzer:
-    def __init__(self):
+    report_engine = "vectorized"
+    vendors_per_cell = 3
+    # JSON output: compact drops the indentation; backend "auto" picks orjson/msgspec if installed
+    json_compact = False
+    json_backend = "auto"
+    # city -> item -> kg; when set, the report's procurement_recommendations are filled
+    # (they name vendors and their prices, so such a report is not for public access)
+    demand_basket = None
+    max_high_risk_share = DEFAULT_MAX_HIGH_RISK_SHARE
+    _redaction: "Optional[RedactionEngine]" = None
+    # Worker processes and shard key of the "sharded" report engine (default: CPU count, item)
+    analysis_workers: Optional[int] = None
+    shard_by = "item"
+    # Shard and worker statistics of this analyzer's last sharded report
+    shard_stats: Optional[Dict[str, Any]] = None
+    
+    def __init__(self, quotes: "Optional[QuoteStore]" = None, source: "Optional[QuoteSource]" = None,
+                 lazy: bool = True, rates: Optional[RateTable] = None):
+        """Analyzer over given quotes, a quotation feed, or generated sample data
+        
+        With a source and lazy=True the feed is only read when the quotes,
+        cities or items are first accessed; sample data is generated when
+        the quotes are first accessed. A QuoteDatabase source answers
+        cities, items, vendor_data and single vendor portals with indexed
+        queries, without loading every quote. rates (default: the given
+        store's or source's, else the default table) is shared with the
+        quote store and the source, which converts foreign-currency quotes
+        with it as they are read.
+        """
+        if rates is None:
+            if quotes is not None:
+                rates = quotes.rates
+            elif source is not None:
+                rates = source.rates
+            else:
+                rates = RateTable()
+        elif source is not None:
+            source.rates = rates
+        self.rates = rates
+        self._source = source
+        self._quotes: Optional[QuoteStore] = None
+        self._cities: Optional[List[str]] = None
+        self._food_items: Optional[List[str]] = None
+        self._database_view: Optional[DatabaseQuoteView] = None
+        if quotes is not None:
+            self._set_quotes(quotes)
+            return
+        if source is not None:
+            if not lazy:
+                self._set_quotes(source.load())
+            return
+        
         self.cities = ["Mumbai", "Delhi", "Pune", "Kolkata"]
         self.food_items = [
             "Rice (Basmati)", "Wheat Flour", "Lentils (Dal)", "Cooking Oil",
@@ -22,20 +119,128 @@ class ProcurementAnalyzer:
             "Coriander Seeds", "Cumin Seeds", "Tea Leaves", "Coffee Beans",
             "Milk Powder", "Ghee"
         ]
-        self.usd_to_inr = 83.25
-        self.vendor_data = self._generate_vendor_data()
     
-    def _generate_vendor_data(self) -> Dict:
+    def _set_quotes(self, quotes: "QuoteStore"):
+        """Adopt a quote store, taking cities and items from its dictionaries"""
+        quotes.rates = self.rates
+        self._quotes = quotes
+        self._database_view = None
+        self._cities = list(quotes.cities.values)
+        self._food_items = list(quotes.items.values)
+    
+    @property
+    def usd_to_inr(self) -> float:
+        """Current USD rate (INR per USD)"""
+        return self.rates.rate("USD")
+    
+    @usd_to_inr.setter
+    def usd_to_inr(self, rate: float):
+        self.rates.set_rate("USD", rate)
+    
+    @property
+    def quotes(self) -> "QuoteStore":
+        """Quote store, loaded from the source (or generated) on first access"""
+        if self._quotes is None:
+            if self._source is not None:
+                self._set_quotes(self._source.load())
+            else:
+                self._quotes = self._generate_vendor_data()
+        return self._quotes
+    
+    @quotes.setter
+    def quotes(self, quotes: "QuoteStore"):
+        self._set_quotes(quotes)
+    
+    @property
+    def _database(self) -> Optional[QuoteDatabase]:
+        """The QuoteDatabase source while its quotes have not been loaded"""
+        if self._quotes is None and isinstance(self._source, QuoteDatabase):
+            return self._source
+        return None
+    
+    @property
+    def cities(self) -> List[str]:
+        if self._cities is None:
+            if self._database is not None:
+                self._cities = self._database.cities()
+            else:
+                self.quotes
+        return self._cities
+    
+    @cities.setter
+    def cities(self, cities: List[str]):
+        self._cities = cities
+    
+    @property
+    def food_items(self) -> List[str]:
+        if self._food_items is None:
+            if self._database is not None:
+                self._food_items = self._database.items()
+            else:
+                self.quotes
+        return self._food_items
+    
+    @food_items.setter
+    def food_items(self, food_items: List[str]):
+        self._food_items = food_items
+    
+    @classmethod
+    def from_files(cls, paths: List[str], workers: Optional[int] = None,
+                   lazy: bool = True, rates: Optional[RateTable] = None) -> "ProcurementAnalyzer":
+        """Analyzer over CSV / JSON / SQLite quotation feeds, loaded in parallel
+        
+        Foreign-currency quotes are converted to INR with rates (default:
+        a new default table), which the analyzer then uses.
+        """
+        from ingestion import MultiFileSource, source_for_path
+        rates = rates if rates is not None else RateTable()
+        source = (source_for_path(paths[0], rates=rates) if len(paths) == 1
+                  else MultiFileSource(paths, workers, rates=rates))
+        return cls(source=source, lazy=lazy, rates=rates)
+    
+    @classmethod
+    def from_database(cls, path: str = "vendor_quotes.db") -> "ProcurementAnalyzer":
+        """Analyzer over the quotes persisted in a QuoteDatabase, read as they are used"""
+        database = QuoteDatabase(path)
+        return cls(source=database, rates=database.rates)
+    
+    @classmethod
+    def from_arrow(cls, filename: str = "vendor_quotations.arrow") -> "ProcurementAnalyzer":
+        """Load an analyzer from an Arrow IPC file without copying the price columns"""
+        from quote_store import QuoteStore
+        return cls(QuoteStore.read_arrow(filename))
+    
+    @classmethod
+    def from_parquet(cls, filename: str = "vendor_quotations.parquet") -> "ProcurementAnalyzer":
+        """Load an analyzer from a Parquet file"""
+        from quote_store import QuoteStore
+        return cls(QuoteStore.read_parquet(filename))
+    
+    @property
+    def vendor_data(self) -> "NestedQuoteView":
+        """Legacy city -> item -> [quote dict] view over the quote store
+        
+        Over a QuoteDatabase source each city is queried on first access,
+        and the queried cities are kept until the quotes are loaded.
+        """
+        if self._database is not None:
+            if self._database_view is None:
+                self._database_view = DatabaseQuoteView(self._database)
+            return self._database_view
+        from quote_store import NestedQuoteView
+        return NestedQuoteView(self.quotes)
+    
+    def _generate_vendor_data(self) -> "QuoteStore":
         """Generate realistic vendor data for all cities and items"""
-        data = {}
+        from quote_store import QuoteStore
+        data = QuoteStore(capacity=len(self.cities) * len(self.food_items) * self.vendors_per_cell,
+                          rates=self.rates)
         
         for city in self.cities:
-            data[city] = {}
             for item in self.food_items:
-                vendors = []
                 base_price = self._get_base_price(item)
                 
-                for i in range(3):  # 3 vendors per city
+                for i in range(self.vendors_per_cell):  # 3 vendors per city by default
                     vendor_name = f"{city}_Vendor_{chr(65+i)}"
                     price_variation = random.uniform(0.85, 1.15)
                     inr_price = round(base_price * price_variation, 2)
@@ -44,15 +249,12 @@ class ProcurementAnalyzer:
                         "vendor_name": vendor_name,
                         "contact": f"+91-{random.randint(7000000000, 9999999999)}",
                         "price_inr": inr_price,
-                        "price_usd": round(inr_price / self.usd_to_inr, 2),
                         "moq_kg": random.choice([10, 25, 50, 100]),
                         "stockout_frequency": random.choice(["Low", "Medium", "High"]),
                         "last_updated": datetime.now().strftime("%Y-%m-%d"),
                         "confidential_rating": random.choice(["A", "B", "C"])
                     }
-                    vendors.append(vendor)
-                
-                data[city][item] = vendors
+                    data.append(city, item, vendor)
         
         return data
     
@@ -68,22 +270,55 @@ class ProcurementAnalyzer:
         }
         return prices.get(item, 100)
     
-    def generate_analysis_report(self) -> Dict:
-        """Generate comprehensive analysis report"""
+    def _report_metadata(self) -> Dict:
+        """Metadata block shared by every analysis report"""
+        return {
+            "company": "BLU Maritime",
+            "report_type": "Comprehensive Vendor Price & Stock Analysis",
+            "generated_on": datetime.now().isoformat(),
+            "cities_covered": len(self.cities),
+            "items_analyzed": len(self.food_items),
+            "total_vendors": len(self.cities) * len(self.food_items) * 3
+        }
+    
+    def optimize_basket(self, basket: Dict[str, Dict[str, float]]) -> List[Dict]:
+        """MOQ- and risk-aware vendor allocations for a city -> item -> kg basket"""
+        return BasketOptimizer(self.quotes, self.max_high_risk_share).optimize(basket)
+    
+    def generate_analysis_report(self, engine: str = None, basket: Optional[Dict] = None) -> Dict:
+        """Generate comprehensive analysis report
+        
+        engine selects "vectorized" (NumPy group-by, the default), "sharded"
+        (the same aggregates over item or city shards, see shard_by, in
+        analysis_workers processes) or "python" (reference loops); all
+        produce identical reports. Only when
+        the caller passes a demand basket (or sets demand_basket) does
+        procurement_recommendations hold the optimized sourcing plan, which
+        lists vendors and prices: keep such reports BLU Maritime internal.
+        """
+        engine = engine or self.report_engine
+        if engine not in REPORT_ENGINES:
+            raise ValueError(f"Unknown report engine: {engine}")
+        basket = basket if basket is not None else self.demand_basket
+        
         report = {
-            "report_metadata": {
-                "company": "BLU Maritime",
-                "report_type": "Comprehensive Vendor Price & Stock Analysis",
-                "generated_on": datetime.now().isoformat(),
-                "cities_covered": len(self.cities),
-                "items_analyzed": len(self.food_items),
-                "total_vendors": len(self.cities) * len(self.food_items) * 3
-            },
+            "report_metadata": self._report_metadata(),
             "city_analysis": {},
             "item_comparison": {},
-            "procurement_recommendations": []
+            "procurement_recommendations": self.optimize_basket(basket) if basket else []
         }
         
+        if engine == "vectorized":
+            from report_engine import build_report_sections
+            report.update(build_report_sections(self.quotes, self.cities, self.food_items))
+            return report
+        if engine == "sharded":
+            from sharded_analysis import ShardedAnalysis
+            sharded = ShardedAnalysis(self.quotes, self.analysis_workers, self.shard_by)
+            report.update(sharded.run(self.cities, self.food_items))
+            self.shard_stats = sharded.stats
+            return report
+        
         # City-wise analysis
         for city in self.cities:
             city_data = self.vendor_data[city]
@@ -99,7 +334,7 @@ class ProcurementAnalyzer:
             
             report["city_analysis"][city] = {
                 "total_procurement_cost_inr": round(total_cost, 2),
-                "total_procurement_cost_usd": round(total_cost / self.usd_to_inr, 2),
+                "total_procurement_cost_usd": self.rates.convert(total_cost, "USD"),
                 "high_risk_items": low_stock_items,
                 "vendor_count": len(self.food_items) * 3
             }
@@ -114,107 +349,322 @@ class ProcurementAnalyzer:
             report["item_comparison"][item] = {
                 "min_price_inr": min(prices),
                 "max_price_inr": max(prices),
-                "avg_price_inr": round(sum(prices) / len(prices), 2),
+                "avg_price_inr": round(math.fsum(prices) / len(prices), 2),
                 "price_variance": round(max(prices) - min(prices), 2)
             }
         
         return report
     
-    def export_to_csv(self, filename: str = "vendor_analysis.csv"):
-        """Export vendor data to CSV"""
-        with open(filename, 'w', newline='', encoding='utf-8') as file:
+    def render_dashboard(self, report: Dict, output_dir: str = "dashboard",
+                         workers: Optional[int] = None) -> Dict:
+        """Chart dashboard (PNG charts + index.html) for an analysis report (needs matplotlib)
+        
+        Charts whose data did not change since the last run are kept, not
+        redrawn. Returns chart counts and per-worker timing statistics.
+        """
+        from dashboard import render_dashboard
+        return render_dashboard(report, output_dir, workers)
+    
+    def iter_csv_rows(self, chunk_size: int = 50000) -> Iterator[List[tuple]]:
+        """Yield CSV rows in batches straight from the quote store"""
+        store = self.quotes
+        rows = store.ordered_rows(self.cities, self.food_items)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            yield list(zip(
+                store.decode("city", chunk), store.decode("item", chunk),
+                store.decode("vendor", chunk), store.decode("contact", chunk),
+                store.decode("price_inr", chunk), store.decode("price_usd", chunk),
+                store.decode("moq_kg", chunk), store.decode("stockout", chunk),
+                store.decode("last_updated", chunk), store.decode("rating", chunk)
+            ))
+    
+    def export_to_csv(self, filename: str = "vendor_analysis.csv", chunk_size: int = 50000,
+                      compression: Optional[str] = None,
+                      progress: Optional[Callable[[int, float], None]] = None) -> int:
+        """Export vendor data to CSV
+        
+        Rows are streamed from the quote store and written in batches of
+        chunk_size, so memory use does not grow with the row count.
+        compression may be None, "gzip" or "zstd" (needs the zstandard
+        package). progress is called after each batch with the rows written
+        so far and the rows per second. Returns the number of rows written.
+        """
+        rows_written = 0
+        started = time.perf_counter()
+        with open_text_output(filename, compression) as file:
             writer = csv.writer(file)
-            writer.writerow([
-                "City", "Item", "Vendor", "Contact", "Price_INR", "Price_USD",
-                "MOQ_KG", "Stockout_Risk", "Last_Updated", "Confidential_Rating"
-            ])
+            writer.writerow(CSV_HEADER)
             
-            for city in self.cities:
-                for item in self.food_items:
-                    for vendor in self.vendor_data[city][item]:
-                        writer.writerow([
-                            city, item, vendor["vendor_name"], vendor["contact"],
-                            vendor["price_inr"], vendor["price_usd"], vendor["moq_kg"],
-                            vendor["stockout_frequency"], vendor["last_updated"],
-                            vendor["confidential_rating"]
-                        ])
-    
-    def save_confidential_data(self, filename: str = "blu_maritime_confidential.json"):
-        """Save confidential vendor data (BLU Maritime access only)"""
+            for batch in self.iter_csv_rows(chunk_size):
+                writer.writerows(batch)
+                rows_written += len(batch)
+                if progress is not None:
+                    elapsed = time.perf_counter() - started
+                    progress(rows_written, rows_written / elapsed if elapsed > 0 else 0.0)
+        
+        return rows_written
+    
+    def export_to_arrow(self, filename: str = "vendor_quotations.arrow") -> str:
+        """Export vendor quotations as a memory-mappable Arrow IPC file (needs pyarrow)"""
+        self.quotes.write_arrow(filename)
+        return filename
+    
+    def save_to_database(self, path: str = "vendor_quotes.db") -> int:
+        """Upsert every quote into a QuoteDatabase; returns rows written"""
+        database = QuoteDatabase(path)
+        try:
+            return database.upsert_store(self.quotes)
+        finally:
+            database.close()
+    
+    def export_to_parquet(self, filename: str = "vendor_quotations.parquet",
+                          compression: str = "zstd") -> str:
+        """Export vendor quotations as a Parquet file (needs pyarrow)"""
+        self.quotes.write_parquet(filename, compression=compression)
+        return filename
+    
+    def json_serializer(self) -> JSONSerializer:
+        """Serializer for this analyzer's JSON outputs"""
+        return JSONSerializer(compact=self.json_compact, backend=self.json_backend)
+    
+    def redaction_engine(self) -> "RedactionEngine":
+        """Role-based views of the current quotes, rebuilt when they change"""
+        from redaction import RedactionEngine
+        if self._redaction is None or self._redaction.store is not self.quotes:
+            self._redaction = RedactionEngine(self.quotes)
+        return self._redaction
+    
+    def _iter_vendor_ratings(self, chunk_size: int = 50000) -> Iterator[tuple]:
+        """(key, rating) pairs of the confidential vendor_ratings section, in report order"""
+        store = self.quotes
+        rows = store.ordered_rows(self.cities, self.food_items)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            for city, item, vendor, rating in zip(store.decode("city", chunk), store.decode("item", chunk),
+                                                  store.decode("vendor", chunk), store.decode("rating", chunk)):
+                yield f"{city}_{item}_{vendor}", {
+                    "reliability_score": random.randint(70, 95),
+                    "payment_terms": random.choice(["30 days", "45 days", "60 days"]),
+                    "discount_available": random.choice([True, False]),
+                    "confidential_rating": rating
+                }
+    
+    def save_confidential_data(self, filename: str = "blu_maritime_confidential.json",
+                               sourcing_plan: Optional[List[Dict]] = None) -> int:
+        """Save confidential vendor data (BLU Maritime access only)
+        
+        vendor_ratings is streamed to the file quote by quote rather than
+        built as a dict first. A sourcing plan from optimize_basket (vendor
+        allocations and prices) is stored as procurement_recommendations.
+        Returns the number of bytes written.
+        """
         confidential_data = {
             "access_level": "BLU_MARITIME_CONFIDENTIAL",
             "warning": "RESTRICTED ACCESS - BLU Maritime personnel only",
-            "vendor_ratings": {},
+            "vendor_ratings": StreamedObject(self._iter_vendor_ratings()),
             "negotiated_prices": {},
             "contract_terms": {},
             "competitor_analysis": {}
         }
-        
-        for city in self.cities:
-            for item in self.food_items:
-                for vendor in self.vendor_data[city][item]:
-                    key = f"{city}_{item}_{vendor['vendor_name']}"
-                    confidential_data["vendor_ratings"][key] = {
-                        "reliability_score": random.randint(70, 95),
-                        "payment_terms": random.choice(["30 days", "45 days", "60 days"]),
-                        "discount_available": random.choice([True, False]),
-                        "confidential_rating": vendor["confidential_rating"]
-                    }
-        
-        with open(filename, 'w') as file:
-            json.dump(confidential_data, file, indent=2)
+        if sourcing_plan is not None:
+            confidential_data["procurement_recommendations"] = sourcing_plan
+        return self.json_serializer().dump(confidential_data, filename)
+    
+    def record_price_history(self, root: str = "price_history",
+                             snapshot_date: Optional[str] = None) -> str:
+        """Append the current quotes as a daily price history snapshot (needs pyarrow)"""
+        from price_history import PriceHistory
+        return PriceHistory(root).append_snapshot(self.quotes, snapshot_date)
     
     def generate_vendor_portal_data(self, vendor_name: str):
         """Generate restricted data for specific vendor (no competitor info)"""
-        vendor_data = {
-            "access_type": "VENDOR_RESTRICTED",
-            "vendor_name": vendor_name,
-            "warning": "You can only view your own quotations. Competitor data is confidential.",
-            "your_quotations": {}
-        }
+        # Own quotes only, confidential fields redacted: one indexed query while
+        # a database's quotes are not loaded, else this vendor's materialized view
+        if self._database is not None:
+            quotations = self._database.vendor_quotations(vendor_name)
+        else:
+            quotations = self.redaction_engine().vendor_view(vendor_name).data
+        vendor_data = vendor_portal_payload(vendor_name, quotations)
         
-        for city in self.cities:
-            vendor_data["your_quotations"][city] = {}
-            for item in self.food_items:
-                # Only include this vendor's data
-                vendor_quotes = [v for v in self.vendor_data[city][item] if v["vendor_name"] == vendor_name]
-                if vendor_quotes:
-                    # Remove confidential rating from vendor view
-                    clean_quotes = []
-                    for quote in vendor_quotes:
-                        clean_quote = {k: v for k, v in quote.items() if k != "confidential_rating"}
-                        clean_quotes.append(clean_quote)
-                    vendor_data["your_quotations"][city][item] = clean_quotes
-        
-        filename = f"{vendor_name.lower().replace(' ', '_')}_portal.json"
-        with open(filename, 'w') as file:
-            json.dump(vendor_data, file, indent=2)
+        filename = vendor_portal_filename(vendor_name)
+        self.json_serializer().dump(vendor_data, filename)
         
         return filename
+    
+    def generate_all_vendor_portals(self, output_dir: str = "vendor_portals",
+                                    workers: Optional[int] = None) -> Dict:
+        """Generate portal files for every vendor in parallel
+        
+        Returns throughput and per-worker timing statistics.
+        """
+        return write_all_vendor_portals(self.quotes, self.cities, output_dir, workers,
+                                        compact=self.json_compact, backend=self.json_backend)
 
-def main():
+def print_metrics(metrics: PipelineMetrics, metrics_format: Optional[str]):
+    """Write the pipeline metrics (when a format is given) and print the stage timings"""
+    if metrics_format:
+        metrics_file = metrics.write(metrics_format)
+        print("\n⏱️ Stage Timings:")
+        for stage, record in metrics.stages.items():
+            print(f"  {stage}: {record['seconds']:.3f}s")
+        print(f"  Metrics written to {metrics_file}")
+
+def main(argv: List[str] = None):
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="BLU Maritime procurement analysis")
+    parser.add_argument("--engine", choices=REPORT_ENGINES, default=ProcurementAnalyzer.report_engine,
+                        help="analysis report engine (default: %(default)s)")
+    parser.add_argument("--all-vendor-portals", action="store_true",
+                        help="write portal files for every vendor instead of the samples")
+    parser.add_argument("--vendor-portal", nargs="+", metavar="VENDOR",
+                        help="only write these vendors' portal files (fast with a populated --quote-db)")
+    parser.add_argument("--portal-dir", default="vendor_portals",
+                        help="output directory for --all-vendor-portals (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --all-vendor-portals, --engine sharded and --dashboard "
+                             "(default: CPU count)")
+    # sharded_analysis.SHARD_KEYS, listed here so parsing arguments does not import NumPy
+    parser.add_argument("--shard-by", choices=["item", "city"], default=ProcurementAnalyzer.shard_by,
+                        help="shard key for --engine sharded (default: %(default)s)")
+    parser.add_argument("--input", nargs="+", metavar="PATH",
+                        help="quotation feeds (CSV, JSON or SQLite) instead of generated sample data")
+    parser.add_argument("--quote-db", metavar="PATH",
+                        help="SQLite quote database: start from its quotes when it has any, "
+                             "otherwise save the generated or --input quotes to it")
+    parser.add_argument("--load-workers", type=int, default=None,
+                        help="processes used to load several --input files (default: CPU count)")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=None,
+                        help="capture cProfile and/or tracemalloc data per stage "
+                             "(also set by PROCUREMENT_PROFILE)")
+    parser.add_argument("--metrics", choices=METRICS_FORMATS, default=None,
+                        help="write stage timings and counters as pipeline_metrics.json/.prom")
+    parser.add_argument("--basket", metavar="PATH",
+                        help="demand basket JSON (city -> item -> kg): its sourcing plan is saved "
+                             "with the confidential data")
+    parser.add_argument("--demand-kg", type=float, default=None,
+                        help=f"plan a basket of this many kg of every item per city instead of a --basket "
+                             f"(e.g. {DEFAULT_DEMAND_KG})")
+    parser.add_argument("--max-high-risk-share", type=float, default=DEFAULT_MAX_HIGH_RISK_SHARE,
+                        help="largest share of an item's demand bought from High stockout-risk vendors "
+                             "(default: %(default)s)")
+    parser.add_argument("--dashboard", metavar="DIR",
+                        help="render report charts and an HTML index into DIR (needs matplotlib)")
+    parser.add_argument("--history-dir", metavar="DIR",
+                        help="append today's quotes to the price history kept in DIR")
+    parser.add_argument("--compact-json", action="store_true",
+                        help="write JSON outputs without indentation")
+    parser.add_argument("--json-backend", choices=["auto"] + BACKENDS, default="auto",
+                        help="JSON encoder (default: %(default)s, orjson/msgspec when installed)")
+    args = parser.parse_args(argv)
+    
+    profile = args.profile or profile_mode_from_env()
+    metrics = PipelineMetrics(profile=profile)
+    
     print("🚢 BLU Maritime - Procurement Analysis System")
     print("=" * 50)
     
-    analyzer = ProcurementAnalyzer()
+    # The analyzer reads or generates its quotes on first access
+    database = QuoteDatabase(args.quote_db) if args.quote_db else None
+    loaded_from_db = not args.input and database is not None and not database.is_empty()
+    if args.input:
+        analyzer = ProcurementAnalyzer.from_files(args.input, args.load_workers)
+    elif loaded_from_db:
+        analyzer = ProcurementAnalyzer(source=database, rates=database.rates)
+    else:
+        analyzer = ProcurementAnalyzer()
+    analyzer.json_compact = args.compact_json
+    analyzer.json_backend = args.json_backend
+    
+    if args.vendor_portal:
+        # Single-purpose run: just these portal files
+        with metrics.stage("portals"):
+            vendor_files = [analyzer.generate_vendor_portal_data(vendor) for vendor in args.vendor_portal]
+        metrics.count("portals", "files_written", len(vendor_files))
+        metrics.add_file_bytes("portals", *vendor_files)
+        if database is not None:
+            database.close()
+        print("🏪 VENDOR PORTALS (Restricted):")
+        for vf in vendor_files:
+            print(f"    - {vf}")
+        print_metrics(metrics, args.metrics or ("json" if profile else None))
+        return
+    
+    with metrics.stage("generation"):
+        quote_count = len(analyzer.quotes)
+    if database is not None:
+        if not loaded_from_db:
+            with metrics.stage("database"):
+                metrics.count("database", "rows_processed", database.upsert_store(analyzer.quotes))
+        database.close()
+    analyzer.max_high_risk_share = args.max_high_risk_share
+    analyzer.analysis_workers = args.workers
+    analyzer.shard_by = args.shard_by
+    basket = None
+    if args.basket:
+        with open(args.basket) as file:
+            basket = json.load(file)
+    elif args.demand_kg is not None:
+        basket = default_basket(analyzer.cities, analyzer.food_items, args.demand_kg)
+    metrics.count("generation", "rows_processed", quote_count)
     
     # Generate analysis report
-    report = analyzer.generate_analysis_report()
+    with metrics.stage("report"):
+        report = analyzer.generate_analysis_report(engine=args.engine)
+        
+        # Save reports
+        analyzer.json_serializer().dump(report, "procurement_analysis_report.json")
+    metrics.count("report", "rows_processed", quote_count)
+    if args.engine == "sharded":
+        metrics.count("report", "shards", analyzer.shard_stats["shards"])
+    metrics.add_file_bytes("report", "procurement_analysis_report.json")
+    
+    with metrics.stage("csv"):
+        metrics.count("csv", "rows_processed", analyzer.export_to_csv())
+    metrics.add_file_bytes("csv", "vendor_analysis.csv")
+    
+    # The sourcing plan names vendors and prices: confidential output only, never the public report
+    recommendations = []
+    with metrics.stage("confidential"):
+        if basket:
+            recommendations = analyzer.optimize_basket(basket)
+        analyzer.save_confidential_data(sourcing_plan=recommendations if basket else None)
+    metrics.count("confidential", "rows_processed", quote_count)
+    metrics.add_file_bytes("confidential", "blu_maritime_confidential.json")
     
-    # Save reports
-    with open("procurement_analysis_report.json", 'w') as file:
-        json.dump(report, file, indent=2)
+    dashboard_stats = None
+    if args.dashboard:
+        with metrics.stage("dashboard"):
+            dashboard_stats = analyzer.render_dashboard(report, args.dashboard, args.workers)
+        metrics.count("dashboard", "files_written", dashboard_stats["rendered"])
+        metrics.count("dashboard", "bytes_written", dashboard_stats["bytes"])
     
-    analyzer.export_to_csv()
-    analyzer.save_confidential_data()
+    history_file = None
+    if args.history_dir:
+        with metrics.stage("history"):
+            from price_history import PriceHistory
+            if datetime.now().strftime("%Y-%m-%d") not in PriceHistory(args.history_dir).dates():
+                history_file = analyzer.record_price_history(args.history_dir)
+        metrics.add_file_bytes("history", *([history_file] if history_file else []))
     
-    # Generate sample vendor portals (restricted access)
-    sample_vendors = ["Mumbai_Vendor_A", "Delhi_Vendor_B", "Pune_Vendor_C"]
+    # Generate vendor portals (restricted access)
     vendor_files = []
-    for vendor in sample_vendors:
-        filename = analyzer.generate_vendor_portal_data(vendor)
-        vendor_files.append(filename)
+    portal_stats = None
+    with metrics.stage("portals"):
+        if args.all_vendor_portals:
+            portal_stats = analyzer.generate_all_vendor_portals(args.portal_dir, args.workers)
+        else:
+            sample_vendors = ["Mumbai_Vendor_A", "Delhi_Vendor_B", "Pune_Vendor_C"]
+            for vendor in sample_vendors:
+                filename = analyzer.generate_vendor_portal_data(vendor)
+                vendor_files.append(filename)
+    if portal_stats:
+        metrics.count("portals", "rows_processed", portal_stats["quotes"])
+        metrics.count("portals", "bytes_written", portal_stats["bytes"])
+        metrics.count("portals", "files_written", portal_stats["vendors"])
+    else:
+        metrics.count("portals", "files_written", len(vendor_files))
+        metrics.add_file_bytes("portals", *vendor_files)
     
     # Display summary
     print(f"✅ Analysis completed for {len(analyzer.cities)} cities")
@@ -226,18 +676,42 @@ def main():
     print("    - vendor_analysis.csv")
     print("  🔒 BLU MARITIME ONLY:")
     print("    - blu_maritime_confidential.json")
+    if dashboard_stats:
+        print("  📊 DASHBOARD:")
+        print(f"    - {dashboard_stats['index']} ({dashboard_stats['charts']} charts: "
+              f"{dashboard_stats['rendered']} rendered, {dashboard_stats['cached']} unchanged)")
+    if args.history_dir:
+        print("  📈 PRICE HISTORY:")
+        print(f"    - {history_file or args.history_dir + ' (snapshot for today already recorded)'}")
+    if args.quote_db:
+        print("  🗄️ QUOTE DATABASE:")
+        print(f"    - {args.quote_db} ({'quotes loaded' if loaded_from_db else 'quotes saved'})")
     print("  🏪 VENDOR PORTALS (Restricted):")
     for vf in vendor_files:
         print(f"    - {vf}")
+    if portal_stats:
+        print(f"    - {portal_stats['output_dir']}/ ({portal_stats['vendors']} vendors, "
+              f"{portal_stats['vendors_per_second']:,.0f} files/s on {portal_stats['workers']} workers)")
+        for pid, stats in portal_stats["per_worker"].items():
+            print(f"      worker {pid}: {stats['vendors']} vendors, {stats['busy_seconds']:.3f}s busy")
     
     # Show city comparison
     print("\n🏙️ City-wise Procurement Cost Summary:")
     for city, data in report["city_analysis"].items():
         print(f"  {city}: ₹{data['total_procurement_cost_inr']:,.2f} (${data['total_procurement_cost_usd']:,.2f})")
-    
+
+    if recommendations:
+        planned = [entry for entry in recommendations if entry["status"] == "ok"]
+        basket_cost = sum(entry["total_cost_inr"] for entry in planned)
+        print("\n🧺 Basket Sourcing Plan (in blu_maritime_confidential.json):")
+        print(f"  {len(planned)}/{len(recommendations)} city/item demands sourced for ₹{basket_cost:,.2f} "
+              f"(≤{analyzer.max_high_risk_share:.0%} from high stockout-risk vendors)")
+
     print("\n🔐 ACCESS CONTROL:")
     print("  - Vendors: Can only see their own quotations")
     print("  - BLU Maritime: Full access to all data + confidential ratings")
+    
+    print_metrics(metrics, args.metrics or ("json" if profile else None))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Quote Database - Persistent SQLite quote book with indexed queries
+WAL-mode database with pooled connections, batched upserts and lookups by
+city, item and vendor, so the analyzer and portal start from stored quotes
+instead of regenerating them
+"""
+
+import queue
+import sqlite3
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Any, Iterator, Optional, Tuple
+
+from currency import RateTable
+
+if TYPE_CHECKING:
+    from quote_store import QuoteStore
+
+DEFAULT_POOL_SIZE = 4
+# Rows per executemany / load batch (ingestion.DEFAULT_BATCH_SIZE)
+DEFAULT_BATCH_SIZE = 50000
+
+# Stored quote columns, in QuoteStore.row_dict order after city and item
+QUOTE_COLUMNS = ["city", "item", "vendor_name", "contact", "price_inr", "moq_kg",
+                 "stockout_frequency", "last_updated", "confidential_rating"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    city TEXT NOT NULL,
+    item TEXT NOT NULL,
+    vendor_name TEXT NOT NULL,
+    contact TEXT,
+    price_inr REAL NOT NULL,
+    moq_kg INTEGER NOT NULL,
+    stockout_frequency TEXT NOT NULL,
+    last_updated TEXT,
+    confidential_rating TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS quotes_cell_vendor ON quotes (city, item, vendor_name);
+CREATE INDEX IF NOT EXISTS quotes_cell_price ON quotes (city, item, price_inr);
+CREATE INDEX IF NOT EXISTS quotes_item ON quotes (item);
+CREATE INDEX IF NOT EXISTS quotes_vendor ON quotes (vendor_name);
+CREATE TABLE IF NOT EXISTS cities (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('version', 0);
+"""
+
+UPSERT = (f"INSERT INTO quotes ({', '.join(QUOTE_COLUMNS)}) "
+          f"VALUES ({', '.join('?' * len(QUOTE_COLUMNS))}) "
+          "ON CONFLICT (city, item, vendor_name) DO UPDATE SET "
+          + ", ".join(f"{name} = excluded.{name}" for name in QUOTE_COLUMNS[3:]))
+
+# Quotes in QuoteStore order: city and item by first appearance, then insertion
+ORDERED_SELECT = (f"SELECT {', '.join('q.' + name for name in QUOTE_COLUMNS)} FROM quotes q "
+                  "JOIN cities c ON c.name = q.city JOIN items i ON i.name = q.item")
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared between threads"""
+
+    def __init__(self, path: str, size: int = DEFAULT_POOL_SIZE, timeout: float = 30.0):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, opening one while fewer than size exist"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._opened < self.size
+                if create:
+                    self._opened += 1
+            conn = self._open() if create else self._idle.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
+
+
+class QuoteDatabase:
+    """Vendor quotations persisted in one SQLite file
+
+    One row per (city, item, vendor); writing a quote that already exists
+    updates it in place. Every write transaction bumps a version counter,
+    so readers can tell when a cached QuoteStore is stale. The quotes table
+    uses the ingestion column names and loads with SQLiteQuoteSource.
+    Queries need neither NumPy nor a loaded QuoteStore.
+    """
+
+    def __init__(self, path: str = "vendor_quotes.db", pool_size: int = DEFAULT_POOL_SIZE,
+                 rates: Optional[RateTable] = None):
+        self.path = path
+        self.rates = rates if rates is not None else RateTable()
+        self.pool = ConnectionPool(path, pool_size)
+        self._store: Optional[QuoteStore] = None
+        self._store_version: Optional[int] = None
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def close(self):
+        self.pool.close()
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+    def is_empty(self) -> bool:
+        """True while no quote has been stored"""
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM quotes LIMIT 1").fetchone() is None
+
+    def version(self) -> int:
+        """Number of write transactions committed so far"""
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def upsert_rows(self, rows: List[Tuple]) -> int:
+        """Insert or update quote tuples in QUOTE_COLUMNS order in one transaction"""
+        with self.pool.connection() as conn, conn:
+            self._write(conn, rows)
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        return len(rows)
+
+    def _write(self, conn: sqlite3.Connection, rows: List[Tuple]):
+        # Dictionary tables first, so new cities/items get ids in order of appearance
+        conn.executemany("INSERT OR IGNORE INTO cities (name) VALUES (?)",
+                         dict.fromkeys((row[0],) for row in rows))
+        conn.executemany("INSERT OR IGNORE INTO items (name) VALUES (?)",
+                         dict.fromkeys((row[1],) for row in rows))
+        conn.executemany(UPSERT, rows)
+
+    def upsert_store(self, store: "QuoteStore", batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Write every quote of a QuoteStore in one transaction; returns rows written"""
+        import numpy as np
+        with self.pool.connection() as conn, conn:
+            for start in range(0, len(store), batch_size):
+                rows = np.arange(start, min(start + batch_size, len(store)))
+                self._write(conn, list(zip(
+                    store.decode("city", rows), store.decode("item", rows),
+                    store.decode("vendor", rows), store.decode("contact", rows),
+                    store.decode("price_inr", rows), store.decode("moq_kg", rows),
+                    store.decode("stockout", rows), store.decode("last_updated", rows),
+                    store.decode("rating", rows))))
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        return len(store)
+
+    def load(self, batch_size: int = DEFAULT_BATCH_SIZE) -> "QuoteStore":
+        """Read every quote into a new QuoteStore, in insertion order"""
+        from ingestion import SQLiteQuoteSource
+        return SQLiteQuoteSource(self.path, batch_size=batch_size, rates=self.rates).load()
+
+    def store(self) -> "QuoteStore":
+        """QuoteStore of the current quotes, reloaded only after a write"""
+        version = self.version()
+        if self._store is None or version != self._store_version:
+            self._store = self.load()
+            self._store_version = version
+        return self._store
+
+    def cities(self) -> List[str]:
+        """Cities in order of first appearance"""
+        with self.pool.connection() as conn:
+            return [name for name, in conn.execute("SELECT name FROM cities ORDER BY id")]
+
+    def items(self) -> List[str]:
+        """Items in order of first appearance"""
+        with self.pool.connection() as conn:
+            return [name for name, in conn.execute("SELECT name FROM items ORDER BY id")]
+
+    def _quote_dicts(self, rows: List[Tuple]) -> List[Dict[str, Any]]:
+        """Legacy quote dicts (with city and item) for selected QUOTE_COLUMNS tuples"""
+        usd = self.rates.convert_values([row[4] for row in rows], "USD")
+        return [{
+            "city": row[0],
+            "item": row[1],
+            "vendor_name": row[2],
+            "contact": row[3],
+            "price_inr": row[4],
+            "price_usd": price_usd,
+            "moq_kg": row[5],
+            "stockout_frequency": row[6],
+            "last_updated": row[7],
+            "confidential_rating": row[8],
+        } for row, price_usd in zip(rows, usd)]
+
+    def cheapest_vendors(self, city: str, item: str, n: int = 3) -> List[Dict[str, Any]]:
+        """The n cheapest quotes for an item in a city, cheapest first"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"SELECT {', '.join(QUOTE_COLUMNS)} FROM quotes "
+                                "WHERE city = ? AND item = ? ORDER BY price_inr, rowid LIMIT ?",
+                                (city, item, n)).fetchall()
+        return self._quote_dicts(rows)
+
+    def vendor_quotes(self, vendor_name: str) -> List[Dict[str, Any]]:
+        """All quotes of one vendor, in QuoteStore order"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"{ORDERED_SELECT} WHERE q.vendor_name = ? "
+                                "ORDER BY c.id, i.id, q.rowid", (vendor_name,)).fetchall()
+        return self._quote_dicts(rows)
+
+    def city_quotations(self, city: str) -> Dict[str, List[Dict[str, Any]]]:
+        """One city's quotes as item -> [quote dict], items in order of first appearance"""
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"{ORDERED_SELECT} WHERE q.city = ? ORDER BY i.id, q.rowid",
+                                (city,)).fetchall()
+        for quote in self._quote_dicts(rows):
+            del quote["city"]
+            result.setdefault(quote.pop("item"), []).append(quote)
+        return result
+
+    def vendor_quotations(self, vendor_name: str, exclude: tuple = ("confidential_rating",)) -> Dict:
+        """One vendor's quotes as city -> item -> [quote dict], like QuoteStore.vendor_quotations"""
+        result = {city: {} for city in self.cities()}
+        for quote in self.vendor_quotes(vendor_name):
+            city, item = quote.pop("city"), quote.pop("item")
+            for field in exclude:
+                quote.pop(field, None)
+            result[city].setdefault(item, []).append(quote)
+        return result
+
+
+class DatabaseQuoteView(Mapping):
+    """Lazy city -> item -> [quote dict] view over a QuoteDatabase
+
+    The NestedQuoteView layout, with each city read by one indexed query on
+    first access and kept afterwards.
+    """
+
+    def __init__(self, database: QuoteDatabase):
+        self.database = database
+        self._cities: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
+    def __getitem__(self, city: str) -> Dict[str, List[Dict[str, Any]]]:
+        quotes = self._cities.get(city)
+        if quotes is None:
+            quotes = self.database.city_quotations(city)
+            if not quotes:
+                raise KeyError(city)
+            self._cities[city] = quotes
+        return quotes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.database.cities())
+
+    def __len__(self) -> int:
+        return len(self.database.cities())
@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Quote Store - Columnar storage for vendor quotations
+Prices, MOQ, stockout level and rating live in contiguous NumPy columns;
+city, item and vendor are dictionary-encoded as int codes; prices in other
+currencies are derived from price_inr
+"""
+
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterator, Optional
+
+import numpy as np
+
+from currency import RateTable
+
+STOCKOUT_LEVELS = ["Low", "Medium", "High"]
+RATING_LEVELS = ["A", "B", "C"]
+
+# Order of keys in the legacy per-quote dicts
+QUOTE_FIELDS = [
+    "vendor_name", "contact", "price_inr", "price_usd", "moq_kg",
+    "stockout_frequency", "last_updated", "confidential_rating"
+]
+
+# Dictionary-encoded columns and the QuoteStore attribute holding each dictionary
+DICTIONARY_ATTRS = {
+    "city": "cities", "item": "items", "vendor": "vendors",
+    "stockout": "stockout_levels", "rating": "ratings", "last_updated": "dates",
+}
+
+# Columns computed from price_inr at the store's current exchange rates
+DERIVED_COLUMNS = {"price_usd": "USD"}
+
+# Store column -> field name in Arrow/Parquet files
+ARROW_FIELDS = {
+    "city": "city", "item": "item", "vendor": "vendor_name", "contact": "contact",
+    "price_inr": "price_inr", "price_usd": "price_usd", "moq_kg": "moq_kg",
+    "stockout": "stockout_frequency", "last_updated": "last_updated",
+    "rating": "confidential_rating",
+}
+
+# Legacy quote field -> store column
+FIELD_COLUMNS = {field: name for name, field in ARROW_FIELDS.items()}
+
+
+def _require_pyarrow():
+    """Import pyarrow, which is only needed for Arrow/Parquet I/O"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow/Parquet support requires the 'pyarrow' package") from None
+    return pyarrow
+
+
+class Dictionary:
+    """Bidirectional string <-> int code mapping in first-seen order"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in values or []:
+            self.encode(value)
+
+    def encode(self, value: str) -> int:
+        """Return the code for value, adding it if unseen"""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Return the code for value, or -1 if it is not in the dictionary"""
+        return self._codes.get(value, -1)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._codes
+
+
+class _ColumnSet(dict):
+    """Column arrays by name; deferred columns are loaded on first access"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.deferred = {}
+
+    def __missing__(self, name: str) -> np.ndarray:
+        column = self.deferred.pop(name)()
+        self[name] = column
+        return column
+
+    def load_all(self):
+        for name in list(self.deferred):
+            self[name]
+
+
+class VendorIndex:
+    """Inverted index from vendor code to the row numbers of its quotes
+
+    Built once with a stable argsort of the vendor column; rows appended
+    afterwards are added to small per-vendor tails.
+    """
+
+    def __init__(self, vendor_codes: np.ndarray, vendor_count: int):
+        counts = np.bincount(vendor_codes, minlength=vendor_count)
+        self._order = np.argsort(vendor_codes, kind="stable")
+        self._offsets = np.r_[0, np.cumsum(counts)]
+        self._appended: Dict[int, List[int]] = {}
+
+    def add(self, vendor_code: int, row: int):
+        self._appended.setdefault(vendor_code, []).append(row)
+
+    def rows(self, vendor_code: int) -> np.ndarray:
+        """Row numbers for one vendor in insertion order"""
+        if vendor_code + 1 < len(self._offsets):
+            rows = self._order[self._offsets[vendor_code]:self._offsets[vendor_code + 1]]
+        else:
+            rows = self._order[:0]
+        appended = self._appended.get(vendor_code)
+        if appended:
+            rows = np.concatenate([rows, np.asarray(appended, dtype=rows.dtype)])
+        return rows
+
+
+class QuoteStore:
+    """Column-oriented vendor quotation table"""
+
+    COLUMN_DTYPES = {
+        "city": np.int32,
+        "item": np.int32,
+        "vendor": np.int32,
+        "price_inr": np.float64,
+        "moq_kg": np.int32,
+        "stockout": np.int8,
+        "rating": np.int8,
+        "last_updated": np.int32,
+        "contact": object,
+    }
+
+    def __init__(self, capacity: int = 1024, rates: Optional[RateTable] = None):
+        self.rates = rates if rates is not None else RateTable()
+        self.cities = Dictionary()
+        self.items = Dictionary()
+        self.vendors = Dictionary()
+        self.stockout_levels = Dictionary(STOCKOUT_LEVELS)
+        self.ratings = Dictionary(RATING_LEVELS)
+        self.dates = Dictionary()
+        self._columns = _ColumnSet(
+            (name, np.empty(max(capacity, 1), dtype=dtype))
+            for name, dtype in self.COLUMN_DTYPES.items()
+        )
+        self._size = 0
+        self.version = 0
+        self._cell_cache = None
+        self._cells_cache: Optional[np.ndarray] = None
+        self._vendor_index: Optional[VendorIndex] = None
+        self._converted: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a view of the populated part of a column"""
+        if name in DERIVED_COLUMNS:
+            return self.price_column(DERIVED_COLUMNS[name])
+        return self._columns[name][:self._size]
+
+    def price_column(self, currency: str) -> np.ndarray:
+        """Every quote's price in currency, converted in one vectorized pass
+
+        The result is cached until the rates or the quotes change, so
+        repeated reads are free and a rate change costs a single division
+        over the price column.
+        """
+        key = (id(self.rates), self.rates.version, self.version)
+        cached = self._converted.get(currency)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        prices = self.rates.convert_column(self._columns["price_inr"][:self._size], currency)
+        prices.flags.writeable = False
+        self._converted[currency] = (key, prices)
+        return prices
+
+    def _reserve(self, extra: int):
+        """Grow every column so that extra more rows fit"""
+        needed = self._size + extra
+        capacity = len(self._columns["city"])
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        self._columns.load_all()
+        for name, column in self._columns.items():
+            grown = np.empty(new_capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _touch(self):
+        """Record that the stored quotes changed"""
+        self.version += 1
+        self._cell_cache = None
+        self._cells_cache = None
+
+    def _writable(self, name: str) -> np.ndarray:
+        """Column array that may be modified in place (copies memory-mapped columns)"""
+        column = self._columns[name]
+        if not column.flags.writeable:
+            column = column.copy()
+            self._columns[name] = column
+        return column
+
+    def find_row(self, city: str, item: str, vendor_name: str) -> int:
+        """Row number of a vendor's quote in a city/item cell, or -1"""
+        vendor_code = self.vendors.lookup(vendor_name)
+        if vendor_code < 0:
+            return -1
+        for row in self.cell_rows(city, item):
+            if self._columns["vendor"][row] == vendor_code:
+                return int(row)
+        return -1
+
+    def update(self, row: int, fields: Dict[str, Any]):
+        """Change fields of an existing quote in place
+
+        Fields use the legacy quote names (price_inr, moq_kg, ...). City,
+        item and vendor identify the quote and cannot be changed, so the
+        cell and vendor indexes stay valid; converted prices such as
+        price_usd follow price_inr.
+        """
+        if not 0 <= row < self._size:
+            raise IndexError(f"Quote row out of range: {row}")
+        for field, value in fields.items():
+            name = FIELD_COLUMNS.get(field)
+            if name is None or name in ("city", "item", "vendor") or name in DERIVED_COLUMNS:
+                raise KeyError(f"Quote field cannot be updated: {field}")
+            if name in DICTIONARY_ATTRS:
+                value = self.dictionary(name).encode(value)
+            self._writable(name)[row] = value
+        self.version += 1
+
+    def append(self, city: str, item: str, quote: Dict[str, Any]) -> int:
+        """Add one quote in the legacy dict shape and return its row number"""
+        self._reserve(1)
+        row = self._size
+        columns = self._columns
+        columns["city"][row] = self.cities.encode(city)
+        columns["item"][row] = self.items.encode(item)
+        columns["vendor"][row] = self.vendors.encode(quote["vendor_name"])
+        columns["price_inr"][row] = quote["price_inr"]
+        columns["moq_kg"][row] = quote["moq_kg"]
+        columns["stockout"][row] = self.stockout_levels.encode(quote["stockout_frequency"])
+        columns["rating"][row] = self.ratings.encode(quote["confidential_rating"])
+        columns["last_updated"][row] = self.dates.encode(quote["last_updated"])
+        columns["contact"][row] = quote["contact"]
+        self._size += 1
+        if self._vendor_index is not None:
+            self._vendor_index.add(int(columns["vendor"][row]), row)
+        self._touch()
+        return row
+
+    def remove(self, row: int) -> int:
+        """Delete one quote; the last quote moves into its row
+
+        Returns the former row number of the moved quote, or -1 when the
+        removed quote was the last one. Other row numbers do not change.
+        """
+        if not 0 <= row < self._size:
+            raise IndexError(f"Quote row out of range: {row}")
+        last = self._size - 1
+        if row != last:
+            for name in self.COLUMN_DTYPES:
+                self._writable(name)[row] = self._columns[name][last]
+        self._size = last
+        self._vendor_index = None
+        self._touch()
+        return last if row != last else -1
+
+    def append_columns(self, columns: Dict[str, Any]) -> int:
+        """Append a batch of quotes given as legacy field name -> sequence
+
+        Keys are "city", "item" and the legacy quote fields (converted
+        prices such as price_usd are not needed and are ignored); values
+        must already have the right types. Returns the number of rows added.
+        """
+        count = len(columns["city"])
+        self._reserve(count)
+        start, stop = self._size, self._size + count
+        for field, name in FIELD_COLUMNS.items():
+            if name in DERIVED_COLUMNS:
+                continue
+            target = self._columns[name]
+            if name in DICTIONARY_ATTRS:
+                encode = self.dictionary(name).encode
+                target[start:stop] = np.fromiter((encode(value) for value in columns[field]),
+                                                 dtype=target.dtype, count=count)
+            else:
+                target[start:stop] = columns[field]
+        self._size = stop
+        if self._vendor_index is not None:
+            for row, vendor_code in enumerate(self._columns["vendor"][start:stop].tolist(), start):
+                self._vendor_index.add(vendor_code, row)
+        self._touch()
+        return count
+
+    def extend(self, other: "QuoteStore") -> int:
+        """Append every quote of another store, remapping its dictionary codes"""
+        count = len(other)
+        self._reserve(count)
+        start, stop = self._size, self._size + count
+        for name in self.COLUMN_DTYPES:
+            values = other.column(name)
+            if name in DICTIONARY_ATTRS:
+                dictionary = self.dictionary(name)
+                remap = np.array([dictionary.encode(value) for value in other.dictionary(name).values]
+                                 or [0], dtype=np.int64)
+                values = remap[values]
+            self._columns[name][start:stop] = values
+        self._size = stop
+        self._vendor_index = None
+        self._touch()
+        return count
+
+    def row_dict(self, row: int) -> Dict[str, Any]:
+        """Materialize one row as a legacy per-quote dict"""
+        columns = self._columns
+        return {
+            "vendor_name": self.vendors[columns["vendor"][row]],
+            "contact": columns["contact"][row],
+            "price_inr": float(columns["price_inr"][row]),
+            "price_usd": float(self.price_column("USD")[row]),
+            "moq_kg": int(columns["moq_kg"][row]),
+            "stockout_frequency": self.stockout_levels[columns["stockout"][row]],
+            "last_updated": self.dates[columns["last_updated"][row]],
+            "confidential_rating": self.ratings[columns["rating"][row]],
+        }
+
+    def _cell_index(self):
+        """Rows sorted by (city, item) cell, keeping insertion order inside a cell"""
+        if self._cell_cache is None:
+            keys = (self.column("city").astype(np.int64) * max(len(self.items), 1)
+                    + self.column("item"))
+            order = np.argsort(keys, kind="stable")
+            self._cell_cache = (keys[order], order)
+        return self._cell_cache
+
+    def _cells(self) -> np.ndarray:
+        """Sorted keys of the non-empty (city, item) cells"""
+        if self._cells_cache is None:
+            sorted_keys, _ = self._cell_index()
+            starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]] if len(sorted_keys) else []
+            self._cells_cache = sorted_keys[starts]
+        return self._cells_cache
+
+    def cell_rows(self, city: str, item: str) -> np.ndarray:
+        """Row numbers of the quotes for one city/item cell"""
+        city_code = self.cities.lookup(city)
+        item_code = self.items.lookup(item)
+        if city_code < 0 or item_code < 0:
+            return np.empty(0, dtype=np.int64)
+        sorted_keys, order = self._cell_index()
+        key = city_code * max(len(self.items), 1) + item_code
+        start = np.searchsorted(sorted_keys, key, side="left")
+        stop = np.searchsorted(sorted_keys, key, side="right")
+        return order[start:stop]
+
+    def vendor_rows(self, vendor_name: str) -> np.ndarray:
+        """Row numbers of one vendor's quotes, via the vendor index"""
+        code = self.vendors.lookup(vendor_name)
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        if self._vendor_index is None:
+            self._vendor_index = VendorIndex(self.column("vendor"), len(self.vendors))
+        return self._vendor_index.rows(code)
+
+    def vendor_quotations(self, vendor_name: str, cities: Optional[List[str]] = None,
+                          exclude: tuple = ("confidential_rating",)) -> Dict:
+        """One vendor's quotes as city -> item -> [quote dict]
+
+        Costs O(that vendor's quotes) plus one empty dict per city; every
+        listed city gets a key, as in the portal files. Fields in exclude
+        are dropped from each quote.
+        """
+        cities = self.cities.values if cities is None else cities
+        result = {city: {} for city in cities}
+        rows = self.vendor_rows(vendor_name)
+        if len(rows) == 0:
+            return result
+        keys = (self._columns["city"][rows].astype(np.int64) * max(len(self.items), 1)
+                + self._columns["item"][rows])
+        rows = rows[np.argsort(keys, kind="stable")]
+        for city, item, row in zip(self.decode("city", rows), self.decode("item", rows), rows):
+            city_quotes = result.get(city)
+            if city_quotes is None:
+                continue
+            quote = self.row_dict(row)
+            for field in exclude:
+                quote.pop(field, None)
+            city_quotes.setdefault(item, []).append(quote)
+        return result
+
+    def city_items(self, city: str) -> List[str]:
+        """Items that have at least one quote in city, in dictionary order"""
+        city_code = self.cities.lookup(city)
+        if city_code < 0:
+            return []
+        n_items = max(len(self.items), 1)
+        cells = self._cells()
+        start, stop = np.searchsorted(cells, [city_code * n_items, (city_code + 1) * n_items])
+        return [self.items[code] for code in (cells[start:stop] % n_items).tolist()]
+
+    def dictionary(self, name: str) -> Dictionary:
+        """Dictionary that decodes a categorical column"""
+        return getattr(self, DICTIONARY_ATTRS[name])
+
+    def decode(self, name: str, rows: np.ndarray) -> List[Any]:
+        """Values of a column for the given rows as Python objects"""
+        values = self.column(name)[rows] if name in DERIVED_COLUMNS else self._columns[name][rows]
+        if name in DICTIONARY_ATTRS:
+            lookup = np.array(self.dictionary(name).values, dtype=object)
+            return lookup[values].tolist()
+        return values.tolist()
+
+    def ordered_rows(self, cities: List[str], items: List[str]) -> np.ndarray:
+        """Row numbers in city order, then item order, then insertion order
+
+        Rows whose city or item is not listed are left out.
+        """
+        city_rank = np.full(len(self.cities) + 1, -1, dtype=np.int64)
+        item_rank = np.full(len(self.items) + 1, -1, dtype=np.int64)
+        for rank, name in enumerate(cities):
+            city_rank[self.cities.lookup(name)] = rank
+        for rank, name in enumerate(items):
+            item_rank[self.items.lookup(name)] = rank
+        city_rank[-1] = item_rank[-1] = -1
+        cities_of_rows = city_rank[self.column("city")]
+        items_of_rows = item_rank[self.column("item")]
+        keys = cities_of_rows * (len(items) + 1) + items_of_rows
+        keep = (cities_of_rows >= 0) & (items_of_rows >= 0)
+        if keep.all() and np.all(keys[1:] >= keys[:-1]):
+            return np.arange(self._size)
+        rows = np.flatnonzero(keep)
+        return rows[np.argsort(keys[rows], kind="stable")]
+
+    @classmethod
+    def from_nested(cls, vendor_data: Dict) -> "QuoteStore":
+        """Build a store from the legacy city -> item -> [quote] dict"""
+        total = sum(len(quotes) for items in vendor_data.values() for quotes in items.values())
+        store = cls(capacity=total)
+        for city, items in vendor_data.items():
+            for item, quotes in items.items():
+                for quote in quotes:
+                    store.append(city, item, quote)
+        return store
+
+    def to_arrow_table(self):
+        """Return the quotes as a pyarrow Table with dictionary-encoded categories"""
+        pa = _require_pyarrow()
+        arrays = []
+        for name, field in ARROW_FIELDS.items():
+            values = self.column(name)
+            if name in DICTIONARY_ATTRS:
+                dictionary = pa.array(self.dictionary(name).values, type=pa.string())
+                arrays.append(pa.DictionaryArray.from_arrays(pa.array(values), dictionary))
+            elif name == "contact":
+                arrays.append(pa.array(values, type=pa.string(), from_pandas=True))
+            else:
+                arrays.append(pa.array(values))
+        return pa.Table.from_arrays(arrays, names=list(ARROW_FIELDS.values()))
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray],
+                     dictionaries: Dict[str, List[str]]) -> "QuoteStore":
+        """Build a store directly from column arrays, without copying when dtypes match
+
+        columns maps every store column name (see COLUMN_DTYPES) to an array
+        of the same length; dictionaries maps the dictionary-encoded column
+        names to their values in code order. Derived columns are ignored.
+        """
+        store = cls(capacity=0)
+        for name, values in dictionaries.items():
+            setattr(store, DICTIONARY_ATTRS[name], Dictionary(values))
+        for name, dtype in cls.COLUMN_DTYPES.items():
+            store._columns[name] = np.asarray(columns[name]).astype(dtype, copy=False)
+        store._size = len(store._columns["city"])
+        return store
+
+    @classmethod
+    def from_arrow_table(cls, table) -> "QuoteStore":
+        """Build a store over a pyarrow Table without copying numeric columns
+
+        Price, MOQ and code columns become NumPy views of the Arrow buffers
+        (read-only; they are copied on the first append). The contact strings
+        are only decoded when first used.
+        """
+        if any(column.num_chunks > 1 for column in table.columns):
+            table = table.unify_dictionaries().combine_chunks()
+        store = cls(capacity=0)
+        for name, field in ARROW_FIELDS.items():
+            if name in DERIVED_COLUMNS:
+                continue
+            chunks = table.column(field).chunks
+            array = chunks[0] if chunks else table.column(field).combine_chunks()
+            dtype = cls.COLUMN_DTYPES[name]
+            if name in DICTIONARY_ATTRS:
+                setattr(store, DICTIONARY_ATTRS[name], Dictionary(array.dictionary.to_pylist()))
+                codes = array.indices.to_numpy(zero_copy_only=False)
+                store._columns[name] = codes if codes.dtype == dtype else codes.astype(dtype)
+            elif name == "contact":
+                del store._columns[name]
+                store._columns.deferred[name] = (
+                    lambda array=array: np.array(array.to_pylist(), dtype=object))
+            else:
+                values = array.to_numpy(zero_copy_only=False)
+                store._columns[name] = values if values.dtype == dtype else values.astype(dtype)
+        store._size = table.num_rows
+        return store
+
+    def write_arrow(self, filename: str):
+        """Write the quotes as an uncompressed Arrow IPC file (memory-mappable)"""
+        pa = _require_pyarrow()
+        table = self.to_arrow_table()
+        with pa.OSFile(filename, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=max(len(self), 1))
+
+    @classmethod
+    def read_arrow(cls, filename: str) -> "QuoteStore":
+        """Memory-map an Arrow IPC file written by write_arrow"""
+        pa = _require_pyarrow()
+        source = pa.memory_map(filename, 'r')
+        return cls.from_arrow_table(pa.ipc.open_file(source).read_all())
+
+    def write_parquet(self, filename: str, compression: str = "zstd"):
+        """Write the quotes as a Parquet file"""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow_table(), filename, compression=compression)
+
+    @classmethod
+    def read_parquet(cls, filename: str) -> "QuoteStore":
+        """Load a Parquet file written by write_parquet"""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        return cls.from_arrow_table(pq.read_table(filename, memory_map=True))
+
+    def to_nested(self) -> Dict:
+        """Materialize the full legacy city -> item -> [quote] dict"""
+        return {city: dict(items) for city, items in NestedQuoteView(self).items()}
+
+
+class CityQuoteView(Mapping):
+    """Read-only item -> [quote dict] mapping for one city, built on access"""
+
+    def __init__(self, store: QuoteStore, city: str):
+        self.store = store
+        self.city = city
+
+    def __getitem__(self, item: str) -> List[Dict[str, Any]]:
+        rows = self.store.cell_rows(self.city, item)
+        if len(rows) == 0:
+            raise KeyError(item)
+        return [self.store.row_dict(row) for row in rows]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.city_items(self.city))
+
+    def __len__(self) -> int:
+        return len(self.store.city_items(self.city))
+
+
+class NestedQuoteView(Mapping):
+    """Lazy city -> item -> [quote dict] adapter over a QuoteStore
+
+    Mirrors the legacy ``vendor_data`` layout so existing callers keep
+    working; quote dicts are materialized only when a cell is read.
+    """
+
+    def __init__(self, store: QuoteStore):
+        self.store = store
+
+    def __getitem__(self, city: str) -> CityQuoteView:
+        if city not in self.store.cities:
+            raise KeyError(city)
+        return CityQuoteView(self.store, city)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.store.cities.values))
+
+    def __len__(self) -> int:
+        return len(self.store.cities)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Redaction Engine - Role-based projections of the quote book
+BLU Maritime, vendor and public views are materialized once per data version
+and shared read-only (with pre-encoded JSON) until the quotes or rates change;
+vendor views are kept in a size-limited LRU cache with TTL expiry
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from quote_store import QuoteStore
+from report_engine import build_report_sections
+from serialization import JSONSerializer
+from view_cache import TTLCache
+
+ROLE_FULL = "blu_full"
+ROLE_VENDOR = "vendor"
+ROLE_PUBLIC = "public"
+ROLES = [ROLE_FULL, ROLE_VENDOR, ROLE_PUBLIC]
+
+# Field-level rules per role: field -> "drop" (remove) or "mask" (replace with MASK).
+# The public view holds aggregates only, so it has no quote fields to redact.
+DEFAULT_RULES = {
+    ROLE_FULL: {},
+    ROLE_VENDOR: {"confidential_rating": "drop"},
+}
+ACTIONS = ["drop", "mask"]
+MASK = "REDACTED"
+
+DEFAULT_MAX_VENDOR_VIEWS = 1024
+DEFAULT_VIEW_TTL = 30.0
+
+# Quote fields in QuoteStore.row_dict order, with the store column behind each
+QUOTE_FIELDS = {
+    "vendor_name": "vendor", "contact": "contact", "price_inr": "price_inr",
+    "price_usd": "price_usd", "moq_kg": "moq_kg", "stockout_frequency": "stockout",
+    "last_updated": "last_updated", "confidential_rating": "rating",
+}
+
+
+def validate_rules(rules: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Check a role -> field -> action mapping and add it on top of the defaults
+
+    Custom rules can only add redactions: every action hides the field, so
+    a role's default rules (e.g. the vendor's confidential_rating) always apply.
+    """
+    merged = {role: dict(fields) for role, fields in DEFAULT_RULES.items()}
+    for role, fields in rules.items():
+        if role not in ROLES:
+            raise ValueError(f"Unknown redaction role: {role}")
+        if role not in DEFAULT_RULES:
+            raise ValueError(f"Role {role} serves aggregates only and takes no field rules")
+        for field, action in fields.items():
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown redaction action for {role}.{field}: {action}")
+        merged[role].update(fields)
+    return merged
+
+
+def redact_quote(quote: Dict[str, Any], rules: Dict[str, str]) -> Dict[str, Any]:
+    """Copy of one quote dict with a role's field rules applied"""
+    if not rules:
+        return dict(quote)
+    return {field: MASK if rules.get(field) == "mask" else value
+            for field, value in quote.items() if rules.get(field) != "drop"}
+
+
+def redact_nested(vendor_data: Dict, rules: Dict[str, str]) -> Dict:
+    """Apply field rules to every quote of a plain city -> item -> [quote] dict"""
+    if not rules:
+        return vendor_data
+    return {city: {item: [redact_quote(quote, rules) for quote in quotes]
+                   for item, quotes in items.items()}
+            for city, items in vendor_data.items()}
+
+
+def vendor_projection(vendor_data: Dict, vendor_name: str,
+                      rules: Optional[Dict[str, str]] = None) -> Dict:
+    """One vendor's quotes from a plain city -> item -> [quote] dict
+
+    Every city gets a key; items appear only where the vendor quotes.
+    """
+    rules = DEFAULT_RULES[ROLE_VENDOR] if rules is None else rules
+    projection = {}
+    for city, items in vendor_data.items():
+        projection[city] = {}
+        for item, quotes in items.items():
+            own = [redact_quote(quote, rules) for quote in quotes if quote["vendor_name"] == vendor_name]
+            if own:
+                projection[city][item] = own
+    return projection
+
+
+class MaterializedView:
+    """One role's projection at one data version
+
+    data is shared between every caller and must not be modified; the
+    compact JSON encoding is produced once, on first use.
+    """
+
+    def __init__(self, role: str, version: Tuple, data: Any):
+        self.role = role
+        self.version = version
+        self.data = data
+        self._json: Optional[bytes] = None
+
+    @property
+    def json_bytes(self) -> bytes:
+        """Compact JSON of data (stdlib encoder, ASCII)"""
+        if self._json is None:
+            self._json = JSONSerializer(compact=True, backend="stdlib").dumps(self.data).encode()
+        return self._json
+
+
+class RedactionEngine:
+    """Per-role materialized views over one QuoteStore
+
+    Views are rebuilt lazily after the store's data version or its exchange
+    rates change; until then every request for a role is served the same
+    objects. Vendor views are built one vendor at a time from the vendor
+    index and held in an LRU cache of at most max_vendor_views entries,
+    each expiring view_ttl seconds after it was built.
+    """
+
+    def __init__(self, store: QuoteStore, rules: Optional[Dict[str, Dict[str, str]]] = None,
+                 max_vendor_views: int = DEFAULT_MAX_VENDOR_VIEWS, view_ttl: float = DEFAULT_VIEW_TTL):
+        self.store = store
+        self.rules = validate_rules(rules or {})
+        self._version: Optional[Tuple] = None
+        self._full: Optional[MaterializedView] = None
+        self._public: Optional[MaterializedView] = None
+        self.vendor_views = TTLCache(maxsize=max_vendor_views, ttl=view_ttl)
+        self.builds = 0
+        self.hits = 0
+        self.invalidations = 0
+
+    def version(self) -> Tuple:
+        """Data version the views depend on: quotes and exchange rates"""
+        store = self.store
+        return (store.version, id(store.rates), store.rates.version)
+
+    def _sync(self):
+        version = self.version()
+        if version != self._version:
+            if self._version is not None:
+                self.invalidations += 1
+            self.invalidate()
+            self._version = version
+
+    def invalidate(self):
+        """Drop every materialized view"""
+        self._full = self._public = None
+        self.vendor_views.clear()
+
+    def _quote_columns(self, rows: np.ndarray, rules: Dict[str, str]) -> List[Tuple[str, List[Any]]]:
+        """(field, values for rows) for the fields a role may see, masks applied"""
+        columns = []
+        for field, column in QUOTE_FIELDS.items():
+            action = rules.get(field)
+            if action == "mask":
+                columns.append((field, [MASK] * len(rows)))
+            elif action != "drop":
+                columns.append((field, self.store.decode(column, rows)))
+        return columns
+
+    def _build_quotes(self, rows: np.ndarray, rules: Dict[str, str]) -> List[Dict[str, Any]]:
+        columns = self._quote_columns(rows, rules)
+        names = [field for field, _ in columns]
+        return [dict(zip(names, values)) for values in zip(*(values for _, values in columns))]
+
+    def full_view(self) -> MaterializedView:
+        """BLU Maritime's city -> item -> [quote] view of every quote"""
+        self._sync()
+        if self._full is not None:
+            self.hits += 1
+            return self._full
+        store = self.store
+        sorted_keys, order = store._cell_index()
+        quotes = self._build_quotes(order, self.rules[ROLE_FULL])
+        data = {city: {} for city in store.cities.values}
+        n_items = max(len(store.items), 1)
+        # Rows are grouped by (city, item) cell, cells in dictionary order
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        bounds = [0] + bounds.tolist() + [len(order)] if len(order) else []
+        for start, stop in zip(bounds, bounds[1:]):
+            key = int(sorted_keys[start])
+            data[store.cities[key // n_items]][store.items[key % n_items]] = quotes[start:stop]
+        self._full = MaterializedView(ROLE_FULL, self._version, data)
+        self.builds += 1
+        return self._full
+
+    def _build_vendor_view(self, vendor_name: str) -> MaterializedView:
+        store = self.store
+        rows = store.vendor_rows(vendor_name)
+        # Vendor rows in cell order, insertion order within a cell
+        keys = store.column("city")[rows].astype(np.int64) * max(len(store.items), 1) + store.column("item")[rows]
+        rows = rows[np.argsort(keys, kind="stable")]
+        quotes = self._build_quotes(rows, self.rules[ROLE_VENDOR])
+        data = {city: {} for city in store.cities.values}
+        for city, item, quote in zip(store.decode("city", rows), store.decode("item", rows), quotes):
+            data[city].setdefault(item, []).append(quote)
+        self.builds += 1
+        return MaterializedView(ROLE_VENDOR, self._version, data)
+
+    def vendor_view(self, vendor_name: str) -> MaterializedView:
+        """One vendor's own quotes; every city is keyed, as in the portal files"""
+        self._sync()
+        return self.vendor_views.get_or_compute(vendor_name, lambda: self._build_vendor_view(vendor_name))
+
+    def public_view(self) -> MaterializedView:
+        """Aggregate city and item figures with no vendor details"""
+        self._sync()
+        if self._public is not None:
+            self.hits += 1
+            return self._public
+        store = self.store
+        data = build_report_sections(store, list(store.cities.values), list(store.items.values))
+        self._public = MaterializedView(ROLE_PUBLIC, self._version, data)
+        self.builds += 1
+        return self._public
+
+    def refresh(self):
+        """Materialize the full and public views now instead of on first request"""
+        self.full_view()
+        self.public_view()
+
+    def stats(self) -> Dict[str, Any]:
+        """Build, hit and invalidation counters; vendor_views has the LRU cache counters"""
+        return {
+            "version": list(self._version) if self._version else None,
+            "builds": self.builds,
+            "hits": self.hits,
+            "invalidations": self.invalidations,
+            "vendor_views": self.vendor_views.stats(),
+        }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Report Engine - Vectorized group-by aggregates for the analysis report
+Computes city totals, high-risk counts and per-item price statistics from
+QuoteStore columns in a few batched NumPy passes
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from quote_store import QuoteStore
+
+# Every float64 is an integer multiple of 2**-EXACT_SUM_SHIFT (53-bit significand,
+# exponents down to -1074), so exact sums are kept as integers in that unit
+EXACT_SUM_SHIFT = 1127
+
+
+def _segment_starts(sorted_keys: np.ndarray) -> np.ndarray:
+    """Start offsets of runs of equal keys in a sorted array"""
+    if len(sorted_keys) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+
+
+def sequential_segment_sums(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Left-to-right sum of each segment of values
+
+    Matches Python's ``sum()`` bit for bit (np.sum uses pairwise summation,
+    which does not). Segments of equal length are stacked into a matrix and
+    accumulated with ``np.cumsum`` so no padding is needed.
+    """
+    counts = np.diff(np.r_[starts, len(values)])
+    sums = np.zeros(len(starts), dtype=np.float64)
+    for length in np.unique(counts):
+        segments = np.flatnonzero(counts == length)
+        block = values[starts[segments, None] + np.arange(length)]
+        sums[segments] = np.cumsum(block, axis=1)[:, -1]
+    return sums
+
+
+def exact_segment_sums(values: np.ndarray, starts: np.ndarray) -> List[int]:
+    """Exact sum of each segment of values, as integers in units of 2**-EXACT_SUM_SHIFT
+
+    Unlike a float sum the result does not depend on summation order, so
+    partial sums of one item from different shards add up to the same
+    total. Values are peeled into limbs that are multiples of a shared power
+    of two, narrow enough that np.add.reduceat sums every limb exactly.
+    """
+    sums = [0] * len(starts)
+    if len(values) == 0:
+        return sums
+    # Limbs stay below 2**bits, so a segment's limb sum stays below 2**53
+    bits = 52 - int(np.diff(np.r_[starts, len(values)]).max()).bit_length()
+    exponent = int(np.frexp(np.abs(values).max())[1])
+    rest = values
+    while rest.any():
+        exponent -= bits
+        if not -1022 <= exponent + 52 <= 1023:
+            # Beyond what the shifter can round to: convert the remainder one by one
+            nonzero = np.flatnonzero(rest)
+            segments = np.searchsorted(starts, nonzero, side="right") - 1
+            for segment, value in zip(segments.tolist(), rest[nonzero].tolist()):
+                numerator, denominator = value.as_integer_ratio()
+                sums[segment] += numerator * ((1 << EXACT_SUM_SHIFT) // denominator)
+            break
+        # Adding 1.5 * 2**(exponent + 52) rounds to a multiple of 2**exponent
+        shifter = math.ldexp(1.5, exponent + 52)
+        limb = (rest + shifter) - shifter
+        rest = rest - limb
+        limb_sums = np.add.reduceat(np.ldexp(limb, -exponent), starts)
+        for segment in np.flatnonzero(limb_sums).tolist():
+            sums[segment] += int(limb_sums[segment]) << (exponent + EXACT_SUM_SHIFT)
+    return sums
+
+
+def exact_sum_to_float(total: int) -> float:
+    """Correctly rounded float of an exact_segment_sums total, the same as math.fsum"""
+    return total / (1 << EXACT_SUM_SHIFT)
+
+
+def build_report_sections(store: QuoteStore, cities: List[str], items: List[str]) -> Dict:
+    """Return the city_analysis and item_comparison report sections
+
+    USD totals use the store's current exchange rates.
+    """
+    city = store.column("city").astype(np.int64)
+    item = store.column("item").astype(np.int64)
+    price = store.column("price_inr")
+    high = store.column("stockout") == store.stockout_levels.lookup("High")
+    n_items = max(len(store.items), 1)
+
+    # Pass 1: per city/item cell cheapest price and high-risk flag
+    cell_keys = city * n_items + item
+    order = np.argsort(cell_keys, kind="stable")
+    sorted_cells = cell_keys[order]
+    starts = _segment_starts(sorted_cells)
+    cell_min = np.minimum.reduceat(price[order], starts) if len(starts) else price[:0]
+    cell_high = (np.logical_or.reduceat(high[order], starts) if len(starts)
+                 else high[:0])
+    cell_city = sorted_cells[starts] // n_items
+
+    # Pass 2: per city totals, summed in item order like the original loop
+    city_starts = _segment_starts(cell_city)
+    city_totals = sequential_segment_sums(cell_min, city_starts)
+    city_high = np.add.reduceat(cell_high.astype(np.int64), city_starts) if len(city_starts) else []
+    city_stats = {
+        int(code): (float(total), int(high_count))
+        for code, total, high_count in zip(cell_city[city_starts], city_totals, city_high)
+    }
+
+    # Pass 3: per item stats over the listed cities; sums are exact (math.fsum)
+    listed = np.zeros(max(len(store.cities), 1), dtype=bool)
+    for name in cities:
+        code = store.cities.lookup(name)
+        if code >= 0:
+            listed[code] = True
+    order = np.argsort(item, kind="stable")
+    order = order[listed[city[order]]]
+    sorted_items = item[order]
+    sorted_prices = price[order]
+    starts = _segment_starts(sorted_items)
+    if len(starts):
+        item_min = np.minimum.reduceat(sorted_prices, starts)
+        item_max = np.maximum.reduceat(sorted_prices, starts)
+        item_sum = exact_segment_sums(sorted_prices, starts)
+        item_count = np.diff(np.r_[starts, len(sorted_prices)])
+    else:
+        item_min = item_max = item_sum = item_count = []
+    item_stats = {
+        int(code): (float(lo), float(hi), exact_sum_to_float(total), int(count))
+        for code, lo, hi, total, count in zip(sorted_items[starts], item_min, item_max,
+                                              item_sum, item_count)
+    }
+
+    return format_report_sections(store, cities, items, city_stats, item_stats)
+
+
+def format_report_sections(store: QuoteStore, cities: List[str], items: List[str],
+                           city_stats: Dict[int, Tuple[float, int]],
+                           item_stats: Dict[int, Tuple[float, float, float, int]]) -> Dict:
+    """Build the report sections from aggregates keyed by dictionary code
+
+    city_stats holds (cheapest-price total, high-risk item count) per city
+    and item_stats (min, max, sum, count) of prices per item.
+    """
+    city_analysis = {}
+    for name in cities:
+        total_cost, high_risk = city_stats.get(store.cities.lookup(name), (0, 0))
+        city_analysis[name] = {
+            "total_procurement_cost_inr": round(total_cost, 2),
+            "total_procurement_cost_usd": store.rates.convert(total_cost, "USD"),
+            "high_risk_items": high_risk,
+            "vendor_count": len(items) * 3
+        }
+
+    item_comparison = {}
+    for name in items:
+        lo, hi, total, count = item_stats[store.items.lookup(name)]
+        item_comparison[name] = {
+            "min_price_inr": lo,
+            "max_price_inr": hi,
+            "avg_price_inr": round(total / count, 2),
+            "price_variance": round(hi - lo, 2)
+        }
+
+    return {"city_analysis": city_analysis, "item_comparison": item_comparison}
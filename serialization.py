@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+JSON Serialization - Fast, compact and streaming JSON output
+Compact or legacy indented encoding, optional orjson/msgspec backends when
+installed, and streaming of large sections so they are never built in memory
+"""
+
+import itertools
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+BACKENDS = ["stdlib", "orjson", "msgspec"]
+WRITE_BATCH_SIZE = 1 << 20
+# StreamedObject entries encoded per encoder call
+ENCODE_BATCH_SIZE = 4096
+
+
+def available_backends() -> List[str]:
+    """Backends that can be imported here, fastest first"""
+    found = []
+    for name in ("orjson", "msgspec"):
+        try:
+            __import__(name)
+            found.append(name)
+        except ImportError:
+            pass
+    return found + ["stdlib"]
+
+
+class StreamedObject:
+    """A JSON object whose (key, value) pairs come from an iterable
+
+    Used as a value in a top-level document passed to
+    JSONSerializer.iter_chunks / dump so a large section is encoded in
+    batches of entries instead of being materialized as a dict first. Keys
+    must be unique strings, as in a dict.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, Any]]):
+        self.items = items
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return iter(self.items)
+
+
+class RawJSON:
+    """Already-encoded JSON bytes embedded as a value in a top-level document
+
+    iter_chunks yields it unchanged (so a byte sink can write the shared
+    buffer without copying); dump and dumps-style consumers decode it.
+    The bytes are inserted verbatim, so they keep their own formatting.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+class JSONSerializer:
+    """JSON encoder with compact/pretty modes and pluggable backends
+
+    pretty (the default) matches ``json.dump(..., indent=2)`` byte for byte
+    with the stdlib backend. orjson and msgspec write UTF-8 instead of
+    ``\\u`` escapes but are otherwise equivalent.
+    """
+
+    def __init__(self, compact: bool = False, backend: str = "auto"):
+        if backend == "auto":
+            backend = available_backends()[0]
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend: {backend}")
+        self.compact = compact
+        self.backend = backend
+        if backend == "orjson":
+            import orjson
+            option = 0 if compact else orjson.OPT_INDENT_2
+            self._dumps = lambda obj: orjson.dumps(obj, option=option).decode()
+        elif backend == "msgspec":
+            import msgspec
+            encoder = msgspec.json.Encoder()
+            if compact:
+                self._dumps = lambda obj: encoder.encode(obj).decode()
+            else:
+                self._dumps = lambda obj: msgspec.json.format(encoder.encode(obj), indent=2).decode()
+        elif compact:
+            self._dumps = json.JSONEncoder(separators=(",", ":")).encode
+        else:
+            self._dumps = json.JSONEncoder(indent=2).encode
+
+    def dumps(self, obj: Any) -> str:
+        """Encode a whole document"""
+        return self._dumps(obj)
+
+    def _nested(self, value: Any, level: int) -> str:
+        """Encode a value that sits level objects deep in the document"""
+        text = self._dumps(value)
+        if self.compact:
+            return text
+        # Raw newlines only occur between tokens (strings escape them)
+        return text.replace("\n", "\n" + "  " * level)
+
+    def _entries(self, pairs: List[Tuple[str, Any]], level: int) -> str:
+        """Encode (key, value) pairs as the members of an object level objects deep
+
+        One encoder call for the whole batch: the pairs are encoded as one
+        object whose braces are then stripped.
+        """
+        text = self._dumps(dict(pairs))
+        if self.compact:
+            return text[1:-1]
+        # Drop "{" and "\n}", then indent by the levels above the batch object
+        return text[1:-2].replace("\n", "\n" + "  " * (level - 1))
+
+    def iter_chunks(self, document: Any) -> Iterator[str]:
+        """Encode a document piece by piece
+
+        Top-level entries are encoded one at a time, and StreamedObject
+        values ENCODE_BATCH_SIZE (key, value) pairs per encoder call. RawJSON
+        values are yielded as the RawJSON object itself; every other chunk
+        is a str.
+        """
+        if not isinstance(document, dict) or not document:
+            yield self._dumps(document)
+            return
+        key_sep = ":" if self.compact else ": "
+        indent_1 = "" if self.compact else "\n  "
+        for index, (key, value) in enumerate(document.items()):
+            yield ("{" if index == 0 else ",") + indent_1 + self._dumps(key) + key_sep
+            if isinstance(value, StreamedObject):
+                empty = True
+                pairs = iter(value)
+                while True:
+                    batch = list(itertools.islice(pairs, ENCODE_BATCH_SIZE))
+                    if not batch:
+                        break
+                    yield ("{" if empty else ",") + self._entries(batch, 2)
+                    empty = False
+                yield "{}" if empty else indent_1 + "}"
+            elif isinstance(value, RawJSON):
+                yield value
+            else:
+                yield self._nested(value, 1)
+        yield ("" if self.compact else "\n") + "}"
+
+    def dump(self, document: Any, filename: str) -> int:
+        """Write a document (which may contain StreamedObject sections); returns bytes written"""
+        written = 0
+        with open(filename, 'w', encoding='utf-8', buffering=WRITE_BATCH_SIZE) as file:
+            pending: List[str] = []
+            pending_size = 0
+            for chunk in self.iter_chunks(document):
+                if isinstance(chunk, RawJSON):
+                    chunk = chunk.data.decode('utf-8')
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= WRITE_BATCH_SIZE:
+                    text = "".join(pending)
+                    written += len(text.encode('utf-8'))
+                    file.write(text)
+                    pending, pending_size = [], 0
+            text = "".join(pending)
+            written += len(text.encode('utf-8'))
+            file.write(text)
+        return written
+
+
+def dump_json(document: Any, filename: str, compact: bool = False,
+              backend: Optional[str] = "auto") -> int:
+    """Write JSON with the given settings; returns bytes written"""
+    return JSONSerializer(compact=compact, backend=backend).dump(document, filename)
+
+
+def iter_json_chunks(payload: Dict[str, Any]) -> Iterator[bytes]:
+    """Encode a dict as compact UTF-8 JSON, one nested entry at a time (stdlib backend)
+
+    Nested dicts (e.g. the per-city "data" section of a portal response)
+    are emitted entry by entry with the C encoder, so a large response never
+    has to be built as a single string. RawJSON values are passed through
+    as their own bytes object.
+    """
+    serializer = JSONSerializer(compact=True, backend="stdlib")
+    document = {key: StreamedObject(value.items()) if isinstance(value, dict) and value else value
+                for key, value in payload.items()}
+    for chunk in serializer.iter_chunks(document):
+        yield chunk.data if isinstance(chunk, RawJSON) else chunk.encode()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Sharded Analysis - Multi-process report aggregates for large deployments
+Splits the quote store into item (or city) shards balanced by size, computes
+partial aggregates in worker processes over shared-memory price columns and
+merges them into the same report sections as the single-process engine
+"""
+
+import heapq
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from quote_store import QuoteStore
+from report_engine import (_segment_starts, exact_segment_sums, exact_sum_to_float, format_report_sections,
+                           sequential_segment_sums)
+
+SHARD_KEYS = ["item", "city"]
+DEFAULT_SHARDS_PER_WORKER = 4
+
+
+def lpt_schedule(sizes: List[int], bins: int) -> List[List[int]]:
+    """Longest-processing-time-first assignment of jobs to bins
+
+    Jobs are placed largest first on the least loaded bin, which keeps the
+    largest bin within 4/3 of the optimum. Returns job indices per bin,
+    dropping empty bins.
+    """
+    heap = [(0, index) for index in range(max(bins, 1))]
+    assignment: List[List[int]] = [[] for _ in heap]
+    for job in sorted(range(len(sizes)), key=lambda job: -sizes[job]):
+        load, index = heapq.heappop(heap)
+        assignment[index].append(job)
+        heapq.heappush(heap, (load + sizes[job], index))
+    return [jobs for jobs in assignment if jobs]
+
+
+def _share(arrays: Dict[str, np.ndarray]) -> Tuple[List[shared_memory.SharedMemory], Dict[str, tuple]]:
+    """Copy arrays into shared memory blocks; returns the blocks and their specs"""
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.dtype.str, array.shape)
+    return blocks, specs
+
+
+# Per-process state set by _init_worker
+_worker_context: Dict[str, Any] = {}
+
+
+def _init_worker(context: Dict[str, Any], specs: Optional[Dict[str, tuple]] = None,
+                 arrays: Optional[Dict[str, np.ndarray]] = None):
+    """Attach the shared columns (or take in-process arrays) once per worker"""
+    _worker_context.clear()
+    _worker_context.update(context)
+    if arrays is not None:
+        _worker_context["arrays"] = arrays
+        return
+    blocks, views = [], {}
+    for name, (block_name, dtype, shape) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    _worker_context["blocks"] = blocks
+    _worker_context["arrays"] = views
+
+
+def _shard_aggregates(start: int, stop: int) -> Dict[str, Any]:
+    """Per-cell and per-item partial aggregates of one shard's rows"""
+    started = time.perf_counter()
+    ctx = _worker_context
+    arrays = ctx["arrays"]
+    n_items, n_ranks = ctx["n_items"], ctx["n_ranks"]
+    rows = arrays["order"][start:stop]
+    city = arrays["city"][rows].astype(np.int64)
+    item = arrays["item"][rows].astype(np.int64)
+    price = arrays["price_inr"][rows]
+    high = arrays["high"][rows]
+
+    # Cells: cheapest price and any high-risk quote per city/item
+    cell_keys = city * n_items + item
+    order = np.argsort(cell_keys, kind="stable")
+    sorted_cells = cell_keys[order]
+    starts = _segment_starts(sorted_cells)
+    cell_min = np.minimum.reduceat(price[order], starts) if len(starts) else price[:0]
+    cell_high = np.logical_or.reduceat(high[order], starts) if len(starts) else high[:0]
+
+    # Items: rows of listed cities; exact sums add up across shards in any order
+    listed = ctx["city_rank"][city] < n_ranks
+    order = np.argsort(item, kind="stable")
+    order = order[listed[order]]
+    sorted_items = item[order]
+    sorted_prices = price[order]
+    item_starts = _segment_starts(sorted_items)
+    if len(item_starts):
+        item_min = np.minimum.reduceat(sorted_prices, item_starts)
+        item_max = np.maximum.reduceat(sorted_prices, item_starts)
+        item_count = np.diff(np.r_[item_starts, len(sorted_prices)])
+    else:
+        item_min = item_max = item_count = sorted_prices[:0]
+
+    return {
+        "pid": os.getpid(),
+        "rows": stop - start,
+        "cell_keys": sorted_cells[starts], "cell_min": cell_min, "cell_high": cell_high,
+        "items": sorted_items[item_starts], "item_min": item_min, "item_max": item_max,
+        "item_sum": exact_segment_sums(sorted_prices, item_starts), "item_count": item_count,
+        "seconds": time.perf_counter() - started
+    }
+
+
+class ShardedAnalysis:
+    """city_analysis / item_comparison computed by a pool of worker processes
+
+    The merged report is identical to build_report_sections. With
+    shard_by="item" every item lives in one shard; with shard_by="city" an
+    item spans shards and each returns its (min, max, sum, count) partial.
+    Item sums are exact integers (see exact_segment_sums), so merging them
+    is order-independent and matches the single-process engine.
+    """
+
+    def __init__(self, store: QuoteStore, workers: Optional[int] = None, shard_by: str = "item",
+                 shards_per_worker: int = DEFAULT_SHARDS_PER_WORKER):
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(f"Unknown shard key: {shard_by}")
+        self.store = store
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_by = shard_by
+        self.shards_per_worker = shards_per_worker
+        self.stats: Dict[str, Any] = {}
+
+    def plan_shards(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows grouped by shard and each shard's offsets into them
+
+        Shard keys (items or cities) are packed into workers x
+        shards_per_worker shards with LPT so shards are of similar size.
+        """
+        store = self.store
+        keys = store.column(self.shard_by)
+        sizes = np.bincount(keys, minlength=len(store.dictionary(self.shard_by)))
+        shards = lpt_schedule(sizes.tolist(), self.workers * self.shards_per_worker)
+        shard_of_key = np.zeros(max(len(sizes), 1), dtype=np.int16 if len(shards) < 1 << 15 else np.int32)
+        for shard, members in enumerate(shards):
+            shard_of_key[members] = shard
+        # Small integer keys: a stable argsort is a linear-time radix sort
+        order = np.argsort(shard_of_key[keys], kind="stable")
+        offsets = np.r_[0, np.cumsum([int(sizes[members].sum()) for members in shards])].astype(np.int64)
+        return order, offsets
+
+    def run(self, cities: List[str], items: List[str]) -> Dict:
+        """Report sections for cities and items, merged from every shard"""
+        started = time.perf_counter()
+        store = self.store
+        order, offsets = self.plan_shards()
+        city_rank = np.full(max(len(store.cities), 1), len(cities), dtype=np.int64)
+        for rank, name in enumerate(cities):
+            code = store.cities.lookup(name)
+            if code >= 0:
+                city_rank[code] = rank
+        context = {"n_items": max(len(store.items), 1), "n_ranks": len(cities), "city_rank": city_rank,
+                   "shard_by": self.shard_by}
+        arrays = {
+            "order": order,
+            "city": store.column("city"),
+            "item": store.column("item"),
+            "price_inr": store.column("price_inr"),
+            "high": store.column("stockout") == store.stockout_levels.lookup("High"),
+        }
+        bounds = list(zip(offsets[:-1].tolist(), offsets[1:].tolist()))
+        # Largest shards first: the pool then schedules them longest-first
+        bounds.sort(key=lambda bound: bound[0] - bound[1])
+        planned = time.perf_counter()
+
+        if self.workers == 1 or len(bounds) <= 1:
+            _init_worker(context, arrays=arrays)
+            results = [_shard_aggregates(start, stop) for start, stop in bounds]
+        else:
+            blocks, specs = _share(arrays)
+            try:
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(context, specs)) as pool:
+                    futures = [pool.submit(_shard_aggregates, start, stop) for start, stop in bounds]
+                    results = [future.result() for future in futures]
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+        computed = time.perf_counter()
+
+        sections = format_report_sections(store, cities, items,
+                                          *self._merge(results, context["n_items"]))
+        per_worker: Dict[int, Dict[str, float]] = {}
+        for result in results:
+            stats = per_worker.setdefault(result["pid"], {"shards": 0, "rows": 0, "busy_seconds": 0.0})
+            stats["shards"] += 1
+            stats["rows"] += result["rows"]
+            stats["busy_seconds"] += result["seconds"]
+        busy = [stats["busy_seconds"] for stats in per_worker.values()]
+        self.stats = {
+            "shard_by": self.shard_by,
+            "workers": self.workers,
+            "shards": len(results),
+            "largest_shard_rows": max((result["rows"] for result in results), default=0),
+            "plan_seconds": round(planned - started, 4),
+            "compute_seconds": round(computed - planned, 4),
+            "merge_seconds": round(time.perf_counter() - computed, 4),
+            "imbalance": round(max(busy) / (sum(busy) / len(busy)), 3) if busy and sum(busy) else 1.0,
+            "per_worker": {str(pid): {key: round(value, 4) for key, value in stats.items()}
+                           for pid, stats in per_worker.items()}
+        }
+        return sections
+
+    @staticmethod
+    def _merge(results: List[Dict[str, Any]], n_items: int) -> Tuple[Dict, Dict]:
+        """Reduce shard partials to per-city and per-item aggregates"""
+        # Cells never span shards; city totals are summed in item order as in report_engine
+        cell_keys = np.concatenate([result["cell_keys"] for result in results] or [np.empty(0, np.int64)])
+        order = np.argsort(cell_keys, kind="stable")
+        cell_keys = cell_keys[order]
+        cell_min = np.concatenate([result["cell_min"] for result in results] or [np.empty(0)])[order]
+        cell_high = np.concatenate([result["cell_high"] for result in results] or [np.empty(0, bool)])[order]
+        cell_city = cell_keys // n_items
+        city_starts = _segment_starts(cell_city)
+        city_totals = sequential_segment_sums(cell_min, city_starts)
+        city_high = np.add.reduceat(cell_high.astype(np.int64), city_starts) if len(city_starts) else []
+        city_stats = {
+            int(code): (float(total), int(high_count))
+            for code, total, high_count in zip(cell_city[city_starts], city_totals, city_high)
+        }
+
+        # Items: min of mins, max of maxes, exact sum of sums and sum of counts
+        partials: Dict[int, Tuple[float, float, int, int]] = {}
+        for result in results:
+            for code, lo, hi, total, count in zip(result["items"].tolist(), result["item_min"].tolist(),
+                                                  result["item_max"].tolist(), result["item_sum"],
+                                                  result["item_count"].tolist()):
+                merged = partials.get(code)
+                if merged is not None:
+                    lo, hi = min(lo, merged[0]), max(hi, merged[1])
+                    total, count = merged[2] + total, merged[3] + count
+                partials[code] = (lo, hi, total, count)
+        item_stats = {code: (lo, hi, exact_sum_to_float(total), int(count))
+                      for code, (lo, hi, total, count) in partials.items()}
+        return city_stats, item_stats
+
+
+def sharded_report_sections(store: QuoteStore, cities: List[str], items: List[str],
+                            workers: Optional[int] = None, shard_by: str = "item") -> Dict:
+    """build_report_sections computed by a pool of worker processes"""
+    return ShardedAnalysis(store, workers, shard_by).run(cities, items)
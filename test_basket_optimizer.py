@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Basket optimizer against brute force, and its recommendation layout"""
+
+import itertools
+import random
+
+import pytest
+
+from basket_optimizer import _EPSILON, _allocate, BasketOptimizer, optimize_cell
+from quote_store import QuoteStore
+
+
+def brute_force_cell(prices, moqs, high, demand, max_high_risk_share, max_vendors):
+    """Cheapest allocation over every vendor subset of up to max_vendors vendors"""
+    order = sorted(range(len(prices)), key=prices.__getitem__)
+    best = None
+    for size in range(1, min(max_vendors, len(prices)) + 1):
+        for chosen in itertools.combinations(order, size):
+            result = _allocate(list(chosen), prices, moqs, high, demand, max_high_risk_share * demand)
+            if result is not None and (best is None or result[0] < best[0]):
+                best = result
+    return best
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_optimize_cell_matches_brute_force(seed):
+    rng = random.Random(seed)
+    vendors = rng.randint(1, 7)
+    prices = [round(rng.uniform(20, 120), 2) for _ in range(vendors)]
+    moqs = [float(rng.choice([0, 10, 25, 50, 100])) for _ in range(vendors)]
+    high = [rng.random() < 0.4 for _ in range(vendors)]
+    demand = float(rng.choice([5, 40, 100, 150, 300]))
+    share = rng.choice([0.0, 0.25, 0.5, 1.0])
+    max_vendors = rng.randint(1, 4)
+
+    expected = brute_force_cell(prices, moqs, high, demand, share, max_vendors)
+    result = optimize_cell(prices, moqs, high, demand, share, max_vendors)
+    if expected is None:
+        assert result is None
+        return
+    cost, allocation = result
+    assert cost == pytest.approx(expected[0], abs=1e-6)
+    assert len(allocation) <= max_vendors
+    assert sum(allocation.values()) >= demand - _EPSILON
+    assert all(kg >= moqs[vendor] - _EPSILON for vendor, kg in allocation.items())
+    assert sum(kg for vendor, kg in allocation.items() if high[vendor]) <= share * demand + _EPSILON
+
+
+def quote(vendor: str, price: float, moq: int, stockout: str = "Low") -> dict:
+    return {"vendor_name": vendor, "contact": "", "price_inr": price, "moq_kg": moq,
+            "stockout_frequency": stockout, "last_updated": "2024-01-01", "confidential_rating": "A"}
+
+
+@pytest.fixture
+def store() -> QuoteStore:
+    store = QuoteStore()
+    store.append("Pune", "Rice", quote("Cheap", 40.0, 10, "High"))
+    store.append("Pune", "Rice", quote("Steady", 45.0, 10))
+    store.append("Pune", "Rice", quote("Bulk", 35.0, 500))
+    store.append("Pune", "Salt", quote("Cheap", 12.0, 50))
+    return store
+
+
+def test_optimize_respects_risk_cap_and_moq(store):
+    plan = BasketOptimizer(store, max_high_risk_share=0.25).optimize({"Pune": {"Rice": 100}})
+    entry, = plan
+    assert entry["status"] == "ok"
+    kg = {allocation["vendor_name"]: allocation["kg"] for allocation in entry["allocations"]}
+    # Bulk's 500 kg MOQ costs more than the whole demand; Cheap is capped at 25 kg
+    assert kg == {"Steady": 75.0, "Cheap": 25.0}
+    assert entry["total_cost_inr"] == 25 * 40.0 + 75 * 45.0
+    assert entry["high_risk_share"] == 0.25
+
+
+def test_optimize_reports_cells_it_cannot_fill(store):
+    optimizer = BasketOptimizer(store, max_vendors_per_item=1)
+    plan = optimizer.optimize({"Pune": {"Rice": 0, "Salt": 20, "Sugar": 5}, "Goa": {"Rice": 5}})
+    statuses = {(entry["city"], entry["item"]): entry["status"] for entry in plan}
+    assert statuses == {("Pune", "Rice"): "no_demand", ("Pune", "Salt"): "ok",
+                        ("Pune", "Sugar"): "no_quotes", ("Goa", "Rice"): "no_quotes"}
+    # Below the MOQ the vendor's minimum is still bought
+    salt = next(entry for entry in plan if entry["item"] == "Salt")
+    assert salt["purchased_kg"] == 50.0
+    assert optimizer.stats["cells"] == 4 and optimizer.stats["fulfilled"] == 1
+
+
+@pytest.mark.parametrize("share,vendors", [(-0.1, 3), (1.5, 3), (0.25, 0)])
+def test_invalid_limits_are_rejected(store, share, vendors):
+    with pytest.raises(ValueError):
+        BasketOptimizer(store, share, vendors)
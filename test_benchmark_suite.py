@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Benchmark suite: synthetic datasets, stage timing and regression comparison"""
+
+import os
+
+import benchmark_suite
+from benchmark_suite import compare, parse_scale, run_scale, synthetic_store
+
+
+def test_synthetic_store_layout():
+    assert parse_scale("4X20x3") == (4, 20, 3)
+    store = synthetic_store(3, 5, 2, seed=1)
+    assert len(store) == 30
+    assert list(store.cities.values) == ["City_0000", "City_0001", "City_0002"]
+    nested = store.to_nested()
+    quotes = nested["City_0001"]["Item_00003"]
+    assert [quote["vendor_name"] for quote in quotes] == ["City_0001_Vendor_A", "City_0001_Vendor_B"]
+    assert synthetic_store(3, 5, 2, seed=1).to_nested() == nested
+
+
+def test_run_scale_times_every_stage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(benchmark_suite, "STAGE_LIMITS", dict(benchmark_suite.STAGE_LIMITS, optimize_basket=5))
+    result = run_scale("2x3x2", repeat=1)
+    assert os.getcwd() == str(tmp_path) and os.listdir(tmp_path) == []
+    assert result["quotes"] == 12 and result["skipped"] == ["optimize_basket"]
+    for stage in ("_generate_vendor_data", "generate_analysis_report[vectorized]", "export_to_csv",
+                  "save_confidential_data", "generate_vendor_portal_data", "VendorPortal.get_vendor_data[warm]"):
+        assert result["stages"][stage]["seconds"] >= 0
+        assert result["stages"][stage]["process_peak_rss_mb"] <= result["peak_rss_mb"]
+
+
+def test_compare_flags_regressions():
+    def run(**seconds):
+        return {"results": [{"scale": "4x20x3", "stages": {stage: {"seconds": value}
+                                                            for stage, value in seconds.items()}}]}
+    baseline = run(report=1.0, export=2.0, portal=0.0)
+    current = run(report=1.05, export=2.5, portal=0.5, dashboard=1.0)
+    rows = {row["stage"]: row for row in compare(baseline, current)}
+    assert set(rows) == {"report", "export"}
+    assert not rows["report"]["regression"] and rows["export"]["regression"]
+    assert rows["export"]["ratio"] == 1.25
+    assert compare(baseline, current, threshold=0.3)[1]["regression"] is False
+    assert compare(baseline, {"results": [dict(current["results"][0], scale="1x1x1")]}) == []
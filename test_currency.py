@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Currency conversion: versioned rate tables and re-pricing of stored quotes"""
+
+import random
+
+import numpy as np
+import pytest
+
+from currency import RateTable
+from procurement_analysis import ProcurementAnalyzer
+
+
+def test_rate_versions_stay_readable():
+    rates = RateTable(effective="2024-01-01T00:00:00")
+    assert rates.version == 0 and rates.rate("USD") == 83.25 and rates.rate("INR") == 1.0
+    assert rates.set_rate("USD", 84.0, effective="2024-02-01T00:00:00") == 1
+    assert rates.set_rates({"USD": 85.0, "EUR": 91.0}, effective="2024-03-01T00:00:00") == 2
+    assert rates.rate("USD") == 85.0 and rates.rate("USD", version=0) == 83.25
+    assert rates.rates(1) == {"USD": 84.0, "INR": 1.0}
+    assert rates.version_at("2024-02-15") == 1
+    assert rates.version_at("2023-12-31") == 0
+    assert [entry["version"] for entry in rates.history()] == [0, 1, 2]
+    with pytest.raises(KeyError, match="No exchange rate for EUR"):
+        rates.rate("EUR", version=1)
+    with pytest.raises(ValueError, match="must be positive"):
+        rates.set_rate("USD", 0)
+    assert rates.version == 2
+
+
+def test_column_conversion_rounds_like_single_values():
+    rng = random.Random(3)
+    amounts = [round(rng.uniform(0, 5000), 2) for _ in range(2000)] + [0.005 * 83.25, 1.125 * 83.25]
+    rates = RateTable()
+    column = rates.convert_column(np.array(amounts), "USD")
+    assert column.tolist() == rates.convert_values(amounts, "USD")
+    assert rates.convert(8325.0, "USD") == 100.0
+    assert rates.convert_column(np.array(amounts), "INR").tolist() == [round(a, 2) for a in amounts]
+
+
+def test_to_base_converts_per_row_currency():
+    rates = RateTable({"USD": 80.0, "EUR": 90.0})
+    assert rates.to_base([1.0, 2.0, 3.333], ["USD", "EUR", "INR"]).tolist() == [80.0, 180.0, 3.33]
+    with pytest.raises(KeyError):
+        rates.to_base([1.0], ["GBP"])
+
+
+def test_store_prices_follow_rate_changes(seeded_analyzer):
+    store = seeded_analyzer(4).quotes
+    inr = store.column("price_inr")
+    usd = store.column("price_usd")
+    assert store.column("price_usd") is usd
+    assert not usd.flags.writeable
+    assert usd.tolist() == store.rates.convert_values(inr.tolist(), "USD")
+
+    store.rates.set_rate("USD", 100.0)
+    assert store.column("price_usd").tolist() == np.round(inr / 100.0, 2).tolist()
+    store.rates.set_rate("EUR", 50.0)
+    assert store.price_column("EUR").tolist() == np.round(inr / 50.0, 2).tolist()
+
+    store.rates = RateTable({"USD": 40.0})
+    assert store.column("price_usd").tolist() == np.round(inr / 40.0, 2).tolist()
+
+
+def test_analyzer_usd_rate_reprices_outputs(seeded_analyzer):
+    analyzer = seeded_analyzer(6)
+    before = analyzer.generate_analysis_report()
+    analyzer.usd_to_inr = 50.0
+    assert analyzer.usd_to_inr == 50.0 and analyzer.quotes.rates is analyzer.rates
+    after = analyzer.generate_analysis_report()
+    fresh = ProcurementAnalyzer(quotes=analyzer.quotes, rates=RateTable({"USD": 50.0}))
+    assert after["city_analysis"] == fresh.generate_analysis_report()["city_analysis"]
+    assert after["city_analysis"] != before["city_analysis"]
+    for items in analyzer.vendor_data.values():
+        for quotes in items.values():
+            prices = fresh.rates.convert_values([quote["price_inr"] for quote in quotes], "USD")
+            assert [quote["price_usd"] for quote in quotes] == prices
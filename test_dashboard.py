@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Dashboard rendering: chart specs, content-addressed caching and the HTML index"""
+
+import copy
+import os
+
+import pytest
+
+from dashboard import CHART_DIR, MAX_CITY_BARS, chart_filename, dashboard_charts, render_dashboard
+
+
+def chart_files(output_dir) -> dict:
+    """Chart file name -> modification time"""
+    directory = os.path.join(output_dir, CHART_DIR)
+    return {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+
+
+def test_chart_specs_follow_the_report(seeded_analyzer):
+    report = seeded_analyzer(6).generate_analysis_report()
+    charts = dashboard_charts(report)
+    assert [chart["kind"] for chart in charts] == ["city_costs"] + ["price_spread"] * len(report["item_comparison"])
+    costs = charts[0]["data"]["cost_inr"]
+    assert costs == sorted(costs, reverse=True)
+    assert [chart["title"] for chart in charts[1:]] == list(report["item_comparison"])
+
+    many = {"city_analysis": {f"City{i}": {"total_procurement_cost_inr": float(i), "high_risk_items": 0}
+                              for i in range(MAX_CITY_BARS + 5)}}
+    [chart] = dashboard_charts(many)
+    assert len(chart["data"]["cities"]) == MAX_CITY_BARS
+    assert chart["data"]["cities"][0] == f"City{MAX_CITY_BARS + 4}"
+    assert chart["title"].endswith(f"(top {MAX_CITY_BARS} of {MAX_CITY_BARS + 5})")
+    assert chart_filename(chart, dpi=100) != chart_filename(chart, dpi=150)
+
+
+def test_unchanged_charts_are_not_redrawn(seeded_analyzer, tmp_path):
+    pytest.importorskip("matplotlib")
+    report = seeded_analyzer(3).generate_analysis_report()
+    output_dir = str(tmp_path / "dashboard")
+    first = render_dashboard(report, output_dir, workers=1, dpi=40)
+    charts = len(report["item_comparison"]) + 1
+    assert (first["charts"], first["rendered"], first["cached"]) == (charts, charts, 0)
+    assert first["bytes"] == sum(os.path.getsize(os.path.join(output_dir, CHART_DIR, name))
+                                 for name in chart_files(output_dir))
+    files = chart_files(output_dir)
+
+    second = render_dashboard(report, output_dir, workers=1, dpi=40)
+    assert (second["rendered"], second["cached"], second["removed"], second["bytes"]) == (0, charts, 0, 0)
+    assert chart_files(output_dir) == files
+
+    changed = copy.deepcopy(report)
+    item = next(iter(changed["item_comparison"]))
+    changed["item_comparison"][item]["avg_price_inr"] += 1.0
+    third = render_dashboard(changed, output_dir, workers=1, dpi=40)
+    assert (third["rendered"], third["cached"], third["removed"]) == (1, charts - 1, 1)
+    updated = chart_files(output_dir)
+    assert len(updated) == charts and len(set(updated) - set(files)) == 1
+
+
+def test_parallel_rendering_writes_the_same_charts(seeded_analyzer, tmp_path):
+    pytest.importorskip("matplotlib")
+    report = seeded_analyzer(6).generate_analysis_report()
+    serial = render_dashboard(report, str(tmp_path / "serial"), workers=1, dpi=40)
+    parallel = render_dashboard(report, str(tmp_path / "parallel"), workers=2, dpi=40, charts_per_task=3)
+    assert parallel["rendered"] == serial["rendered"] == serial["charts"]
+    assert sum(stats["charts"] for stats in parallel["per_worker"].values()) == parallel["rendered"]
+    assert set(chart_files(tmp_path / "parallel")) == set(chart_files(tmp_path / "serial"))
+
+
+def test_index_links_every_chart(seeded_analyzer, tmp_path):
+    pytest.importorskip("matplotlib")
+    analyzer = seeded_analyzer(2)
+    report = analyzer.generate_analysis_report()
+    report["city_analysis"]["<Port & Dock>"] = dict(next(iter(report["city_analysis"].values())))
+    result = analyzer.render_dashboard(report, str(tmp_path / "dashboard"), workers=1)
+    with open(result["index"], encoding="utf-8") as file:
+        page = file.read()
+    for chart in dashboard_charts(report):
+        assert f'src="{chart_filename(chart)}"' in page
+    assert "&lt;Port &amp; Dock&gt;" in page and "<Port & Dock>" not in page
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Incremental report against full rebuilds under quote updates and withdrawals"""
+
+import random
+
+import pytest
+
+from incremental_report import IncrementalReport
+from procurement_analysis import ProcurementAnalyzer
+
+SEEDS = range(8)
+
+
+def assert_sections_match(incremental: IncrementalReport, analyzer: ProcurementAnalyzer):
+    """Incremental sections equal a full rebuild; running sums may drift by a cent"""
+    full = analyzer.generate_analysis_report("python")
+    sections = incremental.sections()
+    assert sections["city_analysis"].keys() == full["city_analysis"].keys()
+    for city, expected in full["city_analysis"].items():
+        actual = sections["city_analysis"][city]
+        assert actual["high_risk_items"] == expected["high_risk_items"]
+        assert actual["vendor_count"] == expected["vendor_count"]
+        assert actual["total_procurement_cost_inr"] == pytest.approx(
+            expected["total_procurement_cost_inr"], abs=0.011)
+    assert sections["item_comparison"].keys() == full["item_comparison"].keys()
+    for item, expected in full["item_comparison"].items():
+        actual = sections["item_comparison"][item]
+        assert actual["min_price_inr"] == expected["min_price_inr"]
+        assert actual["max_price_inr"] == expected["max_price_inr"]
+        assert actual["price_variance"] == expected["price_variance"]
+        assert actual["avg_price_inr"] == pytest.approx(expected["avg_price_inr"], abs=0.011)
+
+
+def new_quote(rng: random.Random) -> dict:
+    return {"contact": "", "price_inr": round(rng.uniform(20, 600), 2),
+            "moq_kg": rng.choice([10, 25, 50]),
+            "stockout_frequency": rng.choice(["Low", "Medium", "High"]),
+            "last_updated": "2024-06-01", "confidential_rating": "B"}
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_incremental_report_matches_full_rebuild(seeded_analyzer, seed):
+    rng = random.Random(1000 + seed)
+    analyzer = seeded_analyzer(seed)
+    incremental = IncrementalReport(analyzer)
+    assert_sections_match(incremental, analyzer)
+
+    for step in range(200):
+        city = rng.choice(analyzer.cities)
+        item = rng.choice(analyzer.food_items)
+        vendors = [quote["vendor_name"] for quote in analyzer.vendor_data[city][item]]
+        roll = rng.random()
+        if roll < 0.1:
+            # A vendor quoting this cell for the first time
+            incremental.apply_quote_update(city, item, f"{city}_Vendor_N{step}", new_quote(rng))
+        elif roll < 0.2 and len(vendors) > 1:
+            incremental.withdraw_quote(city, item, rng.choice(vendors))
+        else:
+            fields = {"price_inr": round(rng.uniform(20, 600), 2)}
+            if rng.random() < 0.3:
+                fields["stockout_frequency"] = rng.choice(["Low", "Medium", "High"])
+            incremental.apply_quote_update(city, item, rng.choice(vendors), fields)
+        if step % 50 == 49:
+            assert_sections_match(incremental, analyzer)
+    assert_sections_match(incremental, analyzer)
+
+
+def test_withdrawing_the_cheapest_quote_raises_the_minimum(seeded_analyzer):
+    analyzer = seeded_analyzer(2)
+    incremental = IncrementalReport(analyzer)
+    city, item = analyzer.cities[0], analyzer.food_items[0]
+    quotes = sorted(analyzer.vendor_data[city][item], key=lambda quote: quote["price_inr"])
+    if len(quotes) < 2:
+        incremental.apply_quote_update(city, item, "Extra", dict(new_quote(random.Random(0)), price_inr=9999.0))
+        quotes = sorted(analyzer.vendor_data[city][item], key=lambda quote: quote["price_inr"])
+
+    rows = len(analyzer.quotes)
+    incremental.withdraw_quote(city, item, quotes[0]["vendor_name"])
+    assert len(analyzer.quotes) == rows - 1
+    remaining = [quote["vendor_name"] for quote in analyzer.vendor_data[city][item]]
+    assert quotes[0]["vendor_name"] not in remaining
+    assert_sections_match(incremental, analyzer)
+
+
+def test_withdraw_rejects_unknown_and_last_quotes(seeded_analyzer):
+    analyzer = seeded_analyzer(0)
+    incremental = IncrementalReport(analyzer)
+    city, item = analyzer.cities[0], analyzer.food_items[0]
+    with pytest.raises(KeyError):
+        incremental.withdraw_quote(city, item, "Nobody")
+    vendors = [quote["vendor_name"] for quote in analyzer.vendor_data[city][item]]
+    for vendor in vendors[1:]:
+        incremental.withdraw_quote(city, item, vendor)
+    with pytest.raises(ValueError):
+        incremental.withdraw_quote(city, item, vendors[0])
+    assert_sections_match(incremental, analyzer)
+
+
+def test_report_has_the_generate_analysis_report_layout(seeded_analyzer):
+    analyzer = seeded_analyzer(4)
+    report = IncrementalReport(analyzer).report()
+    assert set(report) == set(analyzer.generate_analysis_report("python"))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Quote ingestion: feed loaders, row validation and currency conversion"""
+
+import csv
+import json
+
+import pytest
+
+from currency import RateTable
+from ingestion import (CSVQuoteSource, JSONQuoteSource, MultiFileSource, QuoteValidationError,
+                       source_for_path)
+from procurement_analysis import CSV_HEADER, ProcurementAnalyzer
+
+QUOTE = {"vendor_name": "Port_Vendor_A", "contact": "+91-9000000000", "price_inr": 120.5,
+         "moq_kg": 25, "stockout_frequency": "Low", "last_updated": "2024-05-01",
+         "confidential_rating": "A"}
+
+
+def write_json(path, vendor_data) -> str:
+    path.write_text(json.dumps({"vendor_data": vendor_data}))
+    return str(path)
+
+
+def write_csv(path, rows) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def csv_row(**fields):
+    quote = dict(QUOTE, price_usd=1.45, **fields)
+    return ["Mumbai", "Rice", quote["vendor_name"], quote["contact"], quote["price_inr"],
+            quote["price_usd"], quote["moq_kg"], quote["stockout_frequency"],
+            quote["last_updated"], quote["confidential_rating"]]
+
+
+def test_csv_export_loads_back(seeded_analyzer, tmp_path):
+    analyzer = seeded_analyzer(6)
+    path = str(tmp_path / "quotes.csv.gz")
+    analyzer.export_to_csv(path, chunk_size=7, compression="gzip")
+    store = CSVQuoteSource(path, batch_size=5).load()
+    assert store.to_nested() == analyzer.quotes.to_nested()
+
+
+def test_json_feed_loads_back(seeded_analyzer, tmp_path):
+    analyzer = seeded_analyzer(8)
+    nested = analyzer.quotes.to_nested()
+    store = JSONQuoteSource(write_json(tmp_path / "quotes.json", nested), batch_size=3).load()
+    assert store.to_nested() == nested
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("price_inr", "nan", "row 1 has invalid price_inr 'nan'"),
+    ("price_inr", "inf", "row 1 has invalid price_inr 'inf'"),
+    ("price_inr", "-3", "row 1 has invalid price_inr '-3'"),
+    ("price_inr", "", "row 1 is missing required price_inr"),
+    ("moq_kg", "2.5", "row 1 has invalid moq_kg '2.5'"),
+    ("moq_kg", "4294967296", "row 1 has invalid moq_kg '4294967296'"),
+    ("stockout_frequency", "Never", "row 1 has invalid stockout_frequency 'Never'"),
+    ("vendor_name", "", "row 1 is missing required vendor_name"),
+])
+def test_invalid_csv_rows_name_the_feed_and_row(tmp_path, field, value, message):
+    path = write_csv(tmp_path / "quotes.csv", [csv_row(), csv_row(**{field: value})])
+    with pytest.raises(QuoteValidationError, match=message) as error:
+        CSVQuoteSource(path).load()
+    assert str(error.value).startswith(path)
+
+
+def test_rows_are_counted_across_batches(tmp_path):
+    path = write_csv(tmp_path / "quotes.csv", [csv_row()] * 4 + [csv_row(price_inr="nan")])
+    with pytest.raises(QuoteValidationError, match="row 4 has invalid price_inr"):
+        CSVQuoteSource(path, batch_size=2).load()
+
+
+def test_json_quotes_missing_required_fields_are_rejected(tmp_path):
+    quote = {key: value for key, value in QUOTE.items() if key != "moq_kg"}
+    path = write_json(tmp_path / "quotes.json", {"Mumbai": {"Rice": [QUOTE, quote]}})
+    with pytest.raises(QuoteValidationError, match=r"row 1 \(Mumbai / Rice\) is missing required \['moq_kg'\]"):
+        JSONQuoteSource(path).load()
+
+
+def test_reports_without_quotes_are_rejected(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_text(json.dumps({"cities": ["Mumbai"], "summary": {"quotes": 3}}))
+    with pytest.raises(QuoteValidationError, match="no city -> item -> \\[quote\\] data"):
+        JSONQuoteSource(str(path)).load()
+    with pytest.raises(ValueError, match="No quote source"):
+        source_for_path(str(tmp_path / "quotes.xlsx"))
+
+
+def test_foreign_currency_quotes_use_the_analyzer_rates(tmp_path):
+    local = {key: value for key, value in QUOTE.items() if key != "price_inr"}
+    euro = dict(local, vendor_name="Port_Vendor_B", price=2.0, currency="EUR")
+    dollar = dict(local, vendor_name="Port_Vendor_C", price=3.0, currency="USD")
+    path = write_json(tmp_path / "quotes.json", {"Mumbai": {"Rice": [QUOTE, euro, dollar]}})
+    rates = RateTable({"USD": 80.0, "EUR": 90.5})
+    analyzer = ProcurementAnalyzer.from_files([path], rates=rates)
+    assert analyzer.rates is rates
+    prices = [quote["price_inr"] for quote in analyzer.vendor_data["Mumbai"]["Rice"]]
+    assert prices == [120.5, 181.0, 240.0]
+    with pytest.raises(QuoteValidationError, match="No exchange rate for EUR"):
+        JSONQuoteSource(path).load()
+
+
+def test_multiple_files_merge_in_path_order(seeded_analyzer, tmp_path):
+    first, second = seeded_analyzer(2), seeded_analyzer(9)
+    paths = [str(tmp_path / "first.csv"), write_json(tmp_path / "second.json", second.quotes.to_nested())]
+    first.export_to_csv(paths[0])
+    expected = CSVQuoteSource(paths[0]).load()
+    expected.extend(JSONQuoteSource(paths[1]).load())
+    for workers in (1, 2):
+        store = MultiFileSource(paths, workers=workers).load()
+        assert store.to_nested() == expected.to_nested()
+        assert len(store) == len(first.quotes) + len(second.quotes)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Pipeline instrumentation: stage records, counters, profiling and metrics files"""
+
+import json
+import os
+import tracemalloc
+
+import pytest
+
+from instrumentation import PROFILE_ENV_VAR, PipelineMetrics, profile_mode_from_env
+
+
+def test_stages_accumulate_time_calls_and_counters(tmp_path):
+    metrics = PipelineMetrics(output_dir=str(tmp_path))
+    for _ in range(2):
+        with metrics.stage("generate") as record:
+            record["counters"]["rows_processed"] = record["counters"].get("rows_processed", 0) + 10
+    with metrics.stage("export"):
+        pass
+    path = tmp_path / "out.csv"
+    path.write_bytes(b"x" * 123)
+    metrics.add_file_bytes("export", str(path), str(tmp_path / "missing.csv"))
+    metrics.count("export", "rows_processed", 4)
+
+    report = metrics.to_dict()
+    assert list(report["stages"]) == ["generate", "export"]
+    assert report["stages"]["generate"]["calls"] == 2
+    assert report["stages"]["generate"]["counters"] == {"rows_processed": 20}
+    assert report["stages"]["export"]["counters"] == {"bytes_written": 123, "rows_processed": 4}
+    assert report["profile"] is None
+    assert "alloc_peak_bytes" not in report["stages"]["generate"]
+
+
+def test_stage_time_is_recorded_when_the_stage_raises():
+    metrics = PipelineMetrics()
+    with pytest.raises(RuntimeError):
+        with metrics.stage("analyze"):
+            raise RuntimeError("boom")
+    assert metrics.stages["analyze"]["calls"] == 1
+
+
+def test_prometheus_exposition():
+    metrics = PipelineMetrics()
+    with metrics.stage("generate"):
+        pass
+    metrics.count("generate", "rows_processed", 7)
+    metrics.count("export", "bytes_written", 512)
+    lines = metrics.to_prometheus().splitlines()
+    assert "# TYPE procurement_stage_seconds gauge" in lines
+    assert any(line.startswith('procurement_stage_seconds{stage="generate"} ') for line in lines)
+    assert 'procurement_rows_processed_total{stage="generate"} 7' in lines
+    assert 'procurement_bytes_written_total{stage="export"} 512' in lines
+    assert "# TYPE procurement_bytes_written_total counter" in lines
+    assert not any("alloc_peak_bytes" in line for line in lines)
+
+
+def test_tracemalloc_reports_stage_allocations(tmp_path):
+    metrics = PipelineMetrics(profile="tracemalloc", output_dir=str(tmp_path))
+    try:
+        with metrics.stage("allocate"):
+            block = bytearray(4 * 1024 * 1024)
+            del block
+    finally:
+        tracemalloc.stop()
+    record = metrics.stages["allocate"]
+    assert record["alloc_peak_bytes"] >= 4 * 1024 * 1024
+    assert record["alloc_retained_bytes"] < 1024 * 1024
+    assert 'procurement_stage_alloc_peak_bytes{stage="allocate"}' in metrics.to_prometheus()
+
+
+def test_cprofile_writes_one_file_per_stage(tmp_path):
+    metrics = PipelineMetrics(profile="cprofile", output_dir=str(tmp_path))
+    with metrics.stage("generate"):
+        sum(range(1000))
+    assert metrics.stages["generate"]["cprofile_file"] == os.path.join(str(tmp_path), "profile_generate.prof")
+    assert os.path.getsize(metrics.stages["generate"]["cprofile_file"]) > 0
+
+
+def test_metrics_files(tmp_path):
+    metrics = PipelineMetrics(output_dir=str(tmp_path))
+    metrics.count("export", "rows_processed", 3)
+    with open(metrics.write("json")) as file:
+        assert json.load(file) == json.loads(json.dumps(metrics.to_dict()))
+    prom = metrics.write("prometheus")
+    assert prom.endswith("pipeline_metrics.prom")
+    with open(prom) as file:
+        assert file.read() == metrics.to_prometheus()
+    with pytest.raises(ValueError, match="Unknown metrics format"):
+        metrics.write("xml")
+    with pytest.raises(ValueError, match="Unknown profile mode"):
+        PipelineMetrics(profile="perf")
+
+
+@pytest.mark.parametrize("value, mode", [
+    ("", None), ("0", None), ("off", None), ("1", "all"), ("TRUE", "all"),
+    ("cprofile", "cprofile"), (" tracemalloc ", "tracemalloc"),
+])
+def test_profile_mode_from_env(monkeypatch, value, mode):
+    monkeypatch.setenv(PROFILE_ENV_VAR, value)
+    assert profile_mode_from_env() == mode
+
+
+def test_unknown_profile_mode_in_env(monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, "perf")
+    with pytest.raises(ValueError, match=PROFILE_ENV_VAR):
+        profile_mode_from_env()
+    monkeypatch.delenv(PROFILE_ENV_VAR)
+    assert profile_mode_from_env() is None
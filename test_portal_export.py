@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Bulk vendor portal files against the single-vendor path"""
+
+import json
+import os
+
+import pytest
+
+from portal_export import vendor_portal_filename, write_all_vendor_portals
+from quote_store import QuoteStore
+
+
+@pytest.mark.parametrize("workers,batch_quotes", [(1, 50000), (1, 5), (2, 5)])
+def test_bulk_portals_match_single_vendor_files(seeded_analyzer, tmp_path, monkeypatch,
+                                                workers, batch_quotes):
+    analyzer = seeded_analyzer(3)
+    output_dir = tmp_path / "portals"
+    stats = write_all_vendor_portals(analyzer.quotes, analyzer.cities, str(output_dir), workers,
+                                     batch_quotes=batch_quotes)
+
+    vendors = analyzer.quotes.vendors.values
+    assert sorted(os.listdir(output_dir)) == sorted(vendor_portal_filename(name) for name in vendors)
+    assert stats["vendors"] == len(vendors) and stats["quotes"] == len(analyzer.quotes)
+    assert stats["bytes"] == sum(os.path.getsize(output_dir / name) for name in os.listdir(output_dir))
+
+    monkeypatch.chdir(tmp_path)
+    for vendor in vendors:
+        single = json.loads((tmp_path / analyzer.generate_vendor_portal_data(vendor)).read_text())
+        assert json.loads((output_dir / vendor_portal_filename(vendor)).read_text()) == single
+        assert "confidential_rating" not in (output_dir / vendor_portal_filename(vendor)).read_text()
+
+
+@pytest.mark.parametrize("backend", ["stdlib", "orjson"])
+def test_portal_files_are_utf8(tmp_path, backend):
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    store = QuoteStore()
+    store.append("Pune", "Rice", {"vendor_name": "Café Süd", "contact": "☎ 020-1234", "price_inr": 40.0,
+                                  "moq_kg": 10, "stockout_frequency": "Low", "last_updated": "2024-01-01",
+                                  "confidential_rating": "A"})
+    stats = write_all_vendor_portals(store, ["Pune"], str(tmp_path), workers=1, backend=backend)
+    path = tmp_path / vendor_portal_filename("Café Süd")
+    assert stats["bytes"] == path.stat().st_size
+    document = json.loads(path.read_bytes().decode("utf-8"))
+    assert document["your_quotations"]["Pune"]["Rice"][0]["contact"] == "☎ 020-1234"
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Portal HTTP service: routing, keep-alive request framing and backend reloads"""
+
+import asyncio
+import json
+
+import portal_server
+from portal_server import MAX_BODY_BYTES, InMemoryBackend, PortalService, SQLiteBackend
+
+
+async def read_response(reader: asyncio.StreamReader):
+    """(status, headers, JSON body) of one chunked response"""
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    headers = {}
+    for line in head[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    body = b""
+    while True:
+        size = int((await reader.readuntil(b"\r\n"))[:-2], 16)
+        chunk = await reader.readexactly(size + 2)
+        if not size:
+            break
+        body += chunk[:-2]
+    return status, headers, json.loads(body)
+
+
+def request(method: str, path: str, headers: dict = None, body: bytes = b"") -> bytes:
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    if body:
+        lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+def exchange(service: PortalService, *requests: bytes):
+    """Send requests over one connection and return every response the server wrote"""
+    async def run():
+        server = await service.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        try:
+            for raw in requests:
+                writer.write(raw)
+                await writer.drain()
+                responses.append(await read_response(reader))
+                if responses[-1][1]["connection"] == "close":
+                    break
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+        return responses
+    return asyncio.run(run())
+
+
+def test_routes_and_credentials(seeded_analyzer):
+    store = seeded_analyzer(3).quotes
+    vendor = store.vendors[0]
+    service = PortalService(InMemoryBackend(store))
+    responses = exchange(
+        service,
+        request("GET", "/health"),
+        request("GET", "/quotes", {"X-User-Id": vendor}),
+        request("GET", "/quotes", {"X-User-Id": "Mallory"}),
+        request("GET", "/stats", {"X-User-Id": vendor}),
+        request("GET", "/stats", {"X-User-Id": "BLU_MARITIME", "X-Access-Key": "BLU_ADMIN_2024"}),
+        request("GET", "/public"),
+        request("GET", "/missing"),
+    )
+    statuses = [status for status, _, _ in responses]
+    assert statuses == [200, 200, 403, 403, 200, 200, 404]
+    assert responses[0][2] == {"status": "ok", "quotes": len(store)}
+    view = responses[1][2]
+    assert view["vendor_id"] == vendor
+    assert view["data"] == service.portal.get_vendor_data(
+        service.portal.authenticate_user(vendor, ""), store)["data"]
+    assert responses[4][2]["requests_served"] == 4
+    assert all(headers["connection"] == "keep-alive" for _, headers, _ in responses)
+
+
+def test_request_body_is_not_read_as_the_next_request(seeded_analyzer):
+    service = PortalService(InMemoryBackend(seeded_analyzer(1).quotes))
+    responses = exchange(service,
+                         request("POST", "/health", body=b"GET /missing HTTP/1.1\r\n\r\n"),
+                         request("GET", "/health"))
+    assert [status for status, _, _ in responses] == [405, 200]
+
+
+def test_oversized_and_chunked_bodies_are_rejected(seeded_analyzer):
+    service = PortalService(InMemoryBackend(seeded_analyzer(1).quotes))
+    oversized = request("GET", "/health", {"Content-Length": MAX_BODY_BYTES + 1})
+    [(status, headers, _)] = exchange(service, oversized, request("GET", "/health"))
+    assert status == 413 and headers["connection"] == "close"
+    chunked = request("GET", "/health", {"Transfer-Encoding": "chunked"})
+    [(status, headers, _)] = exchange(service, chunked)
+    assert status == 400 and headers["connection"] == "close"
+    [(status, _, _)] = exchange(service, request("GET", "/health", {"Content-Length": "-1"}))
+    assert status == 400
+
+
+def test_connection_close_ends_the_connection(seeded_analyzer):
+    service = PortalService(InMemoryBackend(seeded_analyzer(1).quotes))
+    responses = exchange(service, request("GET", "/health", {"Connection": "close"}),
+                         request("GET", "/health"))
+    assert len(responses) == 1 and responses[0][1]["connection"] == "close"
+
+
+def test_sqlite_backend_writes_are_picked_up(seeded_analyzer, tmp_path, monkeypatch):
+    monkeypatch.setattr(portal_server, "VERSION_CHECK_INTERVAL", 0.0)
+    first, second = seeded_analyzer(2).quotes, seeded_analyzer(7).quotes
+    path = str(tmp_path / "quotes.db")
+    service = PortalService(SQLiteBackend.write(first, path))
+    assert len(service.store) == len(first)
+    SQLiteBackend.write(second, path)
+
+    async def poll():
+        server = await service.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            for _ in range(200):
+                writer.write(request("GET", "/health"))
+                await writer.drain()
+                await read_response(reader)
+                if service.reloads:
+                    return
+                await asyncio.sleep(0.01)
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(poll())
+    assert service.reloads == 1
+    assert len(service.store) == len(service.backend.database)
+    assert service.store.to_nested() == service.backend.load().to_nested()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Price history: daily snapshots, monthly compaction, range queries and rolling stats"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+
+from price_history import PriceHistory
+from quote_store import DICTIONARY_ATTRS, QuoteStore
+
+DAYS = ["2024-01-29", "2024-01-30", "2024-01-31", "2024-02-01", "2024-02-02"]
+
+
+def snapshot(store: QuoteStore, factor: float) -> QuoteStore:
+    """store with every price scaled by factor"""
+    columns = {name: store.column(name) for name in QuoteStore.COLUMN_DTYPES}
+    columns["price_inr"] = np.round(columns["price_inr"] * factor, 2)
+    return QuoteStore.from_columns(columns, {name: store.dictionary(name).values for name in DICTIONARY_ATTRS})
+
+
+def parquet_files(root) -> list:
+    return sorted(os.path.relpath(os.path.join(directory, name), root)
+                  for directory, _, names in os.walk(root) for name in names if name.endswith(".parquet"))
+
+
+@pytest.fixture
+def recorded(seeded_analyzer, tmp_path):
+    """(history, base store, factors) with one snapshot per day in DAYS"""
+    store = seeded_analyzer(5).quotes
+    history = PriceHistory(str(tmp_path / "history"))
+    factors = [1.0, 1.1, 0.9, 1.2, 1.05]
+    for day, factor in zip(DAYS, factors):
+        history.append_snapshot(snapshot(store, factor), day)
+    return history, store, factors
+
+
+def test_new_month_compacts_the_previous_one(recorded):
+    history, store, _ = recorded
+    files = parquet_files(history.root)
+    assert [path for path in files if path.startswith("month=2024-02")] == \
+        ["month=2024-02/2024-02-01.parquet", "month=2024-02/2024-02-02.parquet"]
+    january = [path for path in files if path.startswith("month=2024-01")]
+    assert len(january) == 1 and os.path.basename(january[0]).startswith("compacted-")
+    assert history.summary() == {"snapshots": 5, "first": DAYS[0], "last": DAYS[-1], "files": 3}
+    assert len(history.query()) == 5 * len(store)
+
+
+def test_range_and_series_queries(recorded):
+    history, store, factors = recorded
+    frame = history.query("2024-01-31", "2024-02-01")
+    assert sorted({day.strftime("%Y-%m-%d") for day in frame["date"]}) == ["2024-01-31", "2024-02-01"]
+    assert len(frame) == 2 * len(store)
+
+    city, item, vendor = store.decode("city", [0])[0], store.decode("item", [0])[0], store.decode("vendor", [0])[0]
+    series = history.query(city=city, item=item, vendor=vendor).sort_values("date")
+    base = store.column("price_inr")[0]
+    assert series["price_inr"].tolist() == [round(base * factor, 2) for factor in factors]
+    assert history.query("2025-01-01").empty
+    assert list(history.query("2025-01-01", columns=["date", "price_inr"]).columns) == ["date", "price_inr"]
+
+
+def test_rolling_stats_follow_each_series(recorded):
+    history, store, _ = recorded
+    frame = history.rolling_stats(window=3)
+    assert len(frame) == 5 * len(store)
+    for _, series in frame.groupby(["city", "item", "vendor_name"]):
+        assert series["date"].is_monotonic_increasing
+        prices = series["price_inr"].to_numpy()
+        means = [round(prices[max(0, i - 2):i + 1].mean(), 2) for i in range(len(prices))]
+        assert series["rolling_mean"].tolist() == pytest.approx(means, abs=0.006)
+        assert series["rolling_min"].tolist() == [prices[max(0, i - 2):i + 1].min() for i in range(len(prices))]
+        assert np.isnan(series["rolling_std"].iloc[0])
+    assert history.rolling_stats(start="2025-01-01").empty
+
+
+def test_dates_are_written_once_and_survive_reopening(recorded):
+    history, store, _ = recorded
+    with pytest.raises(ValueError, match="already has a snapshot for 2024-01-30"):
+        history.append_snapshot(store, "2024-01-30")
+    assert PriceHistory(history.root).dates() == DAYS
+
+
+def test_interrupted_compaction_does_not_duplicate_rows(seeded_analyzer, tmp_path):
+    store = seeded_analyzer(2).quotes
+    history = PriceHistory(str(tmp_path / "history"))
+    for day in DAYS[:3]:
+        history.append_snapshot(snapshot(store, 1.0), day)
+    month = os.path.join(history.root, "month=2024-01")
+    backup = tmp_path / "backup"
+    shutil.copytree(month, backup)
+    assert history.compact("2024-01") == 1
+    # A crash after the merged file was written leaves the daily files behind
+    for name in os.listdir(backup):
+        shutil.copy(backup / name, month)
+    assert len(history.query()) == 3 * len(store)
+    history.compact("2024-01")
+    assert len(parquet_files(history.root)) == 1
+    assert len(history.query()) == 3 * len(store)
+
+
+def test_analyzer_records_snapshots(seeded_analyzer, tmp_path):
+    analyzer = seeded_analyzer(3)
+    root = str(tmp_path / "history")
+    path = analyzer.record_price_history(root, "2024-03-05")
+    assert path == os.path.join(root, "month=2024-03", "2024-03-05.parquet")
+    frame = PriceHistory(root).query()
+    assert sorted(frame["price_inr"].tolist()) == sorted(analyzer.quotes.column("price_inr").tolist())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""ProcurementAnalyzer outputs (CSV export) and lazy startup"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark_suite import HEAVY_MODULES
+from currency import RateTable
+from ingestion import CSVQuoteSource
+from procurement_analysis import CSV_HEADER, ProcurementAnalyzer
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_csv(path, compression=None) -> list:
+    if compression == "gzip":
+        text = gzip.open(path, "rt", encoding="utf-8", newline="").read()
+    elif compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        with open(path, "rb") as file:
+            text = zstandard.ZstdDecompressor().stream_reader(file).read().decode("utf-8")
+    else:
+        text = open(path, encoding="utf-8", newline="").read()
+    return list(csv.reader(io.StringIO(text)))
+
+
+def test_csv_rows_follow_the_nested_data(seeded_analyzer, tmp_path):
+    analyzer = seeded_analyzer(6)
+    path = tmp_path / "vendors.csv"
+    assert analyzer.export_to_csv(str(path)) == len(analyzer.quotes)
+
+    rows = read_csv(path)
+    assert rows[0] == CSV_HEADER
+    expected = [[city, item, quote["vendor_name"], quote["contact"], repr(quote["price_inr"]),
+                 repr(quote["price_usd"]), str(quote["moq_kg"]), quote["stockout_frequency"],
+                 quote["last_updated"], quote["confidential_rating"]]
+                for city in analyzer.cities for item in analyzer.food_items
+                for quote in analyzer.vendor_data[city][item]]
+    assert rows[1:] == expected
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compressed_csv_matches_plain(seeded_analyzer, tmp_path, compression):
+    analyzer = seeded_analyzer(7)
+    analyzer.export_to_csv(str(tmp_path / "plain.csv"))
+    path = tmp_path / f"vendors.csv.{compression}"
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    analyzer.export_to_csv(str(path), chunk_size=7, compression=compression)
+    assert read_csv(path, compression) == read_csv(tmp_path / "plain.csv")
+
+
+def test_progress_is_reported_per_chunk(seeded_analyzer, tmp_path):
+    analyzer = seeded_analyzer(6)
+    calls = []
+    total = analyzer.export_to_csv(str(tmp_path / "vendors.csv"), chunk_size=5,
+                                   progress=lambda rows, rate: calls.append(rows))
+    assert calls == list(range(5, total, 5)) + [total]
+
+
+def test_unknown_compression_is_rejected(seeded_analyzer, tmp_path):
+    with pytest.raises(ValueError):
+        seeded_analyzer(0).export_to_csv(str(tmp_path / "vendors.csv"), compression="bz2")
+
+
+def heavy_imports(code: str, cwd) -> list:
+    """HEAVY_MODULES imported by running code in a fresh interpreter"""
+    probe = f"{code}\nimport json, sys\nprint(json.dumps(sorted(set({HEAVY_MODULES!r}) & set(sys.modules))))"
+    env = dict(os.environ, PYTHONPATH=PACKAGE_DIR)
+    result = subprocess.run([sys.executable, "-c", probe], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_single_purpose_runs_skip_heavy_modules(seeded_analyzer, tmp_path):
+    assert heavy_imports("import procurement_analysis", tmp_path) == []
+    analyzer = seeded_analyzer(3)
+    analyzer.save_to_database(str(tmp_path / "quotes.db"))
+    vendor = analyzer.quotes.vendors[0]
+    code = ("from procurement_analysis import ProcurementAnalyzer\n"
+            f"ProcurementAnalyzer.from_database('quotes.db').generate_vendor_portal_data({vendor!r})")
+    assert heavy_imports(code, tmp_path) == []
+
+
+class CountingSource(CSVQuoteSource):
+    loads = 0
+
+    def load(self, store=None):
+        self.loads += 1
+        return super().load(store)
+
+
+def test_sources_are_read_on_first_access(seeded_analyzer, tmp_path):
+    expected = seeded_analyzer(5)
+    path = str(tmp_path / "vendors.csv")
+    expected.export_to_csv(path)
+    source = CountingSource(path)
+    analyzer = ProcurementAnalyzer(source=source)
+    assert source.loads == 0
+    assert analyzer.food_items == expected.food_items and analyzer.cities == expected.cities
+    assert source.loads == 1
+    analyzer.generate_analysis_report()
+    assert source.loads == 1
+    eager = CountingSource(path)
+    ProcurementAnalyzer(source=eager, lazy=False)
+    assert eager.loads == 1
+
+
+def test_sample_data_is_generated_on_first_access(monkeypatch):
+    def generate(self):
+        raise AssertionError("sample data generated")
+    monkeypatch.setattr(ProcurementAnalyzer, "_generate_vendor_data", generate)
+    analyzer = ProcurementAnalyzer()
+    assert analyzer.cities == ["Mumbai", "Delhi", "Pune", "Kolkata"]
+    assert len(analyzer.food_items) == 20 and analyzer.usd_to_inr == 83.25
+
+
+def test_assigned_quotes_are_adopted(seeded_analyzer):
+    store = seeded_analyzer(8).quotes
+    store.rates = RateTable({"USD": 60.0})
+    analyzer = ProcurementAnalyzer(rates=RateTable({"USD": 90.0}))
+    analyzer.quotes = store
+    assert analyzer.cities == list(store.cities.values)
+    assert analyzer.food_items == list(store.items.values)
+    assert store.rates is analyzer.rates and analyzer.usd_to_inr == 90.0
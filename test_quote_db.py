@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Quote database: upserts, versioning, indexed queries and database-backed analyzers"""
+
+import pytest
+
+from procurement_analysis import ProcurementAnalyzer
+from quote_db import DatabaseQuoteView, QuoteDatabase
+
+
+@pytest.fixture
+def stored(seeded_analyzer, tmp_path):
+    """(database, store) with every quote of a generated store upserted"""
+    store = seeded_analyzer(4).quotes
+    database = QuoteDatabase(str(tmp_path / "quotes.db"))
+    assert database.is_empty()
+    assert database.upsert_store(store, batch_size=7) == len(store)
+    yield database, store
+    database.close()
+
+
+def test_store_round_trip(stored):
+    database, store = stored
+    assert len(database) == len(store) and not database.is_empty()
+    assert database.version() == 1
+    assert database.cities() == list(store.cities.values)
+    assert database.items() == list(store.items.values)
+    assert database.load(batch_size=5).to_nested() == store.to_nested()
+
+
+def test_upserts_update_existing_quotes_in_place(stored):
+    database, store = stored
+    loaded = database.store()
+    assert database.store() is loaded
+    quote = store.row_dict(0)
+    city, item = store.decode("city", [0])[0], store.decode("item", [0])[0]
+    changed = (city, item, quote["vendor_name"], quote["contact"], 1.5, 40, "High",
+               "2024-06-01", quote["confidential_rating"])
+    added = ("New City", item, "New City_Vendor_A", "", 9.0, 10, "Low", "2024-06-01", "B")
+    database.upsert_rows([changed, added])
+    assert database.version() == 2
+    assert len(database) == len(store) + 1
+    reloaded = database.store()
+    assert reloaded is not loaded
+    assert reloaded.row_dict(0)["price_inr"] == 1.5 and reloaded.row_dict(0)["moq_kg"] == 40
+    assert database.cities()[-1] == "New City"
+    # Rewriting the store restores every original quote and keeps the new one
+    database.upsert_store(store)
+    restored = database.load().to_nested()
+    assert list(restored.pop("New City")) == [item]
+    assert restored == store.to_nested()
+
+
+def test_indexed_queries_match_the_store(stored):
+    database, store = stored
+    nested = store.to_nested()
+    for city, items in nested.items():
+        assert database.city_quotations(city) == items
+        for item, quotes in items.items():
+            cheapest = sorted(quotes, key=lambda quote: quote["price_inr"])[:2]
+            assert [quote["price_inr"] for quote in database.cheapest_vendors(city, item, 2)] == \
+                [quote["price_inr"] for quote in cheapest]
+    for vendor in store.vendors.values:
+        assert database.vendor_quotations(vendor) == store.vendor_quotations(vendor)
+    view = DatabaseQuoteView(database)
+    assert dict(view) == nested and len(view) == len(nested)
+    with pytest.raises(KeyError):
+        view["Atlantis"]
+
+
+def test_analyzer_over_a_database(seeded_analyzer, tmp_path, monkeypatch):
+    analyzer = seeded_analyzer(7)
+    path = str(tmp_path / "quotes.db")
+    assert analyzer.save_to_database(path) == len(analyzer.quotes)
+    database_analyzer = ProcurementAnalyzer.from_database(path)
+    assert database_analyzer.cities == analyzer.cities
+    assert dict(database_analyzer.vendor_data) == analyzer.quotes.to_nested()
+    report = database_analyzer.generate_analysis_report()
+    expected = analyzer.generate_analysis_report()
+    assert report["city_analysis"] == expected["city_analysis"]
+    assert report["item_comparison"] == expected["item_comparison"]
+
+    monkeypatch.chdir(tmp_path)
+    vendor = analyzer.quotes.vendors[0]
+    with open(database_analyzer.generate_vendor_portal_data(vendor)) as database_file:
+        from_database = database_file.read()
+    with open(analyzer.generate_vendor_portal_data(vendor)) as store_file:
+        from_store = store_file.read()
+    assert from_database == from_store
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Columnar quote store and its legacy nested view"""
+
+import pytest
+
+from quote_store import NestedQuoteView, QuoteStore
+
+
+def quote(vendor: str, price: float, stockout: str = "Low", rating: str = "A") -> dict:
+    return {"vendor_name": vendor, "contact": f"+91-{vendor}", "price_inr": price, "moq_kg": 10,
+            "stockout_frequency": stockout, "last_updated": "2024-01-01", "confidential_rating": rating}
+
+
+@pytest.fixture
+def store() -> QuoteStore:
+    store = QuoteStore(capacity=2)
+    store.append("Pune", "Rice", quote("P1", 40.0))
+    store.append("Delhi", "Salt", quote("D1", 11.0, "High"))
+    store.append("Pune", "Salt", quote("P1", 12.0))
+    store.append("Pune", "Rice", quote("P2", 38.5, rating="C"))
+    return store
+
+
+def test_nested_round_trip(store):
+    nested = store.to_nested()
+    assert list(nested) == ["Pune", "Delhi"]
+    assert list(nested["Pune"]) == ["Rice", "Salt"]
+    assert [quote["vendor_name"] for quote in nested["Pune"]["Rice"]] == ["P1", "P2"]
+    assert nested["Pune"]["Rice"][1] == dict(quote("P2", 38.5, rating="C"),
+                                           price_usd=store.rates.convert(38.5, "USD"))
+    assert QuoteStore.from_nested(nested).to_nested() == nested
+
+
+def test_nested_view_is_a_read_only_mapping(store):
+    view = NestedQuoteView(store)
+    assert len(view) == 2 and len(view["Pune"]) == 2
+    assert dict(view["Delhi"]) == {"Salt": store.to_nested()["Delhi"]["Salt"]}
+    with pytest.raises(KeyError):
+        view["Goa"]
+    with pytest.raises(KeyError):
+        view["Delhi"]["Rice"]
+
+
+def test_city_items_follow_appends_and_removals(store):
+    assert store.city_items("Pune") == ["Rice", "Salt"]
+    assert store.city_items("Goa") == []
+    store.append("Delhi", "Rice", quote("D1", 41.0))
+    # Items are listed in dictionary order, not in order of first quote
+    assert store.city_items("Delhi") == ["Rice", "Salt"]
+    store.remove(store.find_row("Delhi", "Salt", "D1"))
+    assert store.city_items("Delhi") == ["Rice"]
+
+
+def test_find_row_and_update(store):
+    row = store.find_row("Pune", "Rice", "P2")
+    assert row == 3 and store.find_row("Pune", "Rice", "D1") == -1
+    assert store.find_row("Goa", "Rice", "P2") == -1
+    version = store.version
+    store.update(row, {"price_inr": 30.0, "stockout_frequency": "High"})
+    assert store.version > version
+    assert store.row_dict(row)["price_inr"] == 30.0
+    assert store.row_dict(row)["stockout_frequency"] == "High"
+    assert store.row_dict(row)["price_usd"] == store.rates.convert(30.0, "USD")
+    with pytest.raises(KeyError):
+        store.update(row, {"vendor_name": "P9"})
+    with pytest.raises(IndexError):
+        store.update(len(store), {"price_inr": 1.0})
+
+
+def test_remove_moves_the_last_quote(store):
+    assert store.remove(0) == 3
+    assert len(store) == 3
+    assert store.row_dict(0)["vendor_name"] == "P2"
+    assert [quote["vendor_name"] for quote in store.to_nested()["Pune"]["Rice"]] == ["P2"]
+    assert store.remove(len(store) - 1) == -1
+    with pytest.raises(IndexError):
+        store.remove(len(store))
+
+
+def test_append_columns_and_extend(store):
+    other = QuoteStore()
+    added = other.append_columns({
+        "city": ["Goa", "Pune"], "item": ["Fish", "Rice"], "vendor_name": ["G1", "P3"],
+        "contact": ["", ""], "price_inr": [90.0, 37.0], "moq_kg": [5, 5],
+        "stockout_frequency": ["Medium", "Low"], "last_updated": ["2024-02-01", "2024-02-01"],
+        "confidential_rating": ["B", "A"],
+    })
+    assert added == 2
+    assert store.extend(other) == 2
+    nested = store.to_nested()
+    assert [quote["vendor_name"] for quote in nested["Pune"]["Rice"]] == ["P1", "P2", "P3"]
+    assert nested["Goa"]["Fish"][0]["stockout_frequency"] == "Medium"
+    assert store.vendor_quotations("G1")["Goa"]["Fish"][0]["price_inr"] == 90.0
+
+
+def test_ordered_rows(store):
+    assert store.ordered_rows(["Pune", "Delhi"], ["Rice", "Salt"]).tolist() == [0, 3, 2, 1]
+    assert store.ordered_rows(["Delhi"], ["Salt", "Rice"]).tolist() == [1]
+
+
+def test_arrow_file_is_memory_mapped_and_stays_writable(store, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "quotes.arrow")
+    store.write_arrow(path)
+    loaded = QuoteStore.read_arrow(path)
+    assert loaded.to_nested() == store.to_nested()
+    # Numeric columns are views of the mapped file until a write copies them
+    assert not loaded.column("price_inr").flags.writeable
+    loaded.update(0, {"price_inr": 1.5})
+    loaded.append("Goa", "Fish", quote("G1", 90.0))
+    assert loaded.row_dict(0)["price_inr"] == 1.5
+    assert loaded.city_items("Goa") == ["Fish"]
+    assert QuoteStore.read_arrow(path).to_nested() == store.to_nested()
+
+
+@pytest.mark.parametrize("compression", ["zstd", "snappy", "none"])
+def test_parquet_round_trip(store, tmp_path, compression):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "quotes.parquet")
+    store.write_parquet(path, compression=compression)
+    assert QuoteStore.read_parquet(path).to_nested() == store.to_nested()
+
+
+def test_analyzer_reloads_its_exports(seeded_analyzer, tmp_path):
+    pytest.importorskip("pyarrow")
+    from procurement_analysis import ProcurementAnalyzer
+
+    analyzer = seeded_analyzer(3)
+    expected = analyzer.generate_analysis_report()
+    del expected["report_metadata"]
+    for loaded in (ProcurementAnalyzer.from_arrow(analyzer.export_to_arrow(str(tmp_path / "q.arrow"))),
+                   ProcurementAnalyzer.from_parquet(analyzer.export_to_parquet(str(tmp_path / "q.parquet")))):
+        report = loaded.generate_analysis_report()
+        del report["report_metadata"]
+        assert report == expected
+
+
+def test_vendor_rows_follow_appends_and_removals(store):
+    assert store.vendor_rows("P1").tolist() == [0, 2]
+    assert store.vendor_rows("Nobody").tolist() == []
+    # Appended rows join the built index in insertion order
+    store.append("Delhi", "Rice", quote("P1", 39.0))
+    store.append_columns({
+        "city": ["Goa"], "item": ["Rice"], "vendor_name": ["P1"], "contact": [""], "price_inr": [42.0],
+        "moq_kg": [5], "stockout_frequency": ["Low"], "last_updated": ["2024-02-01"],
+        "confidential_rating": ["A"],
+    })
+    assert store.vendor_rows("P1").tolist() == [0, 2, 4, 5]
+    # Removing row 0 moves the last quote (P1 in Goa) into it
+    store.remove(0)
+    assert store.vendor_rows("P1").tolist() == [0, 2, 4]
+    assert store.row_dict(0)["price_inr"] == 42.0
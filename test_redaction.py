@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Role-scoped materialized views and redaction rules"""
+
+import json
+
+import pytest
+
+from redaction import MASK, ROLE_FULL, ROLE_PUBLIC, ROLE_VENDOR, RedactionEngine, validate_rules
+from report_engine import build_report_sections
+from serialization import iter_json_chunks
+from vendor_portal import VendorPortal
+
+
+def vendor_view_fields(data) -> set:
+    return {field for items in data.values() for quotes in items.values()
+            for quote in quotes for field in quote}
+
+
+@pytest.mark.parametrize("rules", [
+    None,
+    {},
+    {ROLE_VENDOR: {}},
+    {ROLE_VENDOR: {"contact": "mask"}},
+    {ROLE_VENDOR: {"last_updated": "drop"}},
+])
+def test_vendor_view_never_has_confidential_rating(seeded_analyzer, rules):
+    analyzer = seeded_analyzer(0)
+    vendor = analyzer.vendor_data[analyzer.cities[0]][analyzer.food_items[0]][0]["vendor_name"]
+
+    view = RedactionEngine(analyzer.quotes, rules).vendor_view(vendor)
+    fields = vendor_view_fields(view.data)
+    assert fields and "confidential_rating" not in fields
+    for field, action in ((rules or {}).get(ROLE_VENDOR) or {}).items():
+        if action == "drop":
+            assert field not in fields
+
+    portal = VendorPortal(rules=rules)
+    auth_info = portal.authenticate_user(vendor, "")
+    response = json.loads(b"".join(iter_json_chunks(portal.get_vendor_response(auth_info, analyzer.quotes))))
+    assert response["vendor_id"] == vendor
+    assert json.dumps(response["data"]) == json.dumps(view.data)
+
+
+def test_public_role_rejects_field_rules():
+    with pytest.raises(ValueError):
+        validate_rules({ROLE_PUBLIC: {"price_inr": "drop"}})
+    with pytest.raises(ValueError):
+        validate_rules({"auditor": {"contact": "mask"}})
+    with pytest.raises(ValueError):
+        validate_rules({ROLE_VENDOR: {"contact": "hide"}})
+
+
+def test_views_match_the_store(seeded_analyzer):
+    analyzer = seeded_analyzer(1)
+    store = analyzer.quotes
+    engine = RedactionEngine(store, {ROLE_FULL: {"contact": "mask"}})
+
+    full = engine.full_view()
+    expected = store.to_nested()
+    for items in expected.values():
+        for quotes in items.values():
+            for quote in quotes:
+                quote["contact"] = MASK
+    assert full.data == expected
+    assert json.loads(full.json_bytes) == full.data
+    assert engine.public_view().data == build_report_sections(
+        store, list(store.cities.values), list(store.items.values))
+
+    vendor = store.vendors[0]
+    assert engine.vendor_view(vendor).data == store.vendor_quotations(vendor)
+
+
+def test_views_are_reused_until_quotes_or_rates_change(seeded_analyzer):
+    analyzer = seeded_analyzer(2)
+    store = analyzer.quotes
+    engine = RedactionEngine(store)
+    vendor = store.vendors[0]
+
+    full, vendor_view = engine.full_view(), engine.vendor_view(vendor)
+    assert engine.full_view() is full and engine.vendor_view(vendor) is vendor_view
+
+    store.update(0, {"price_inr": 1.0})
+    assert engine.full_view() is not full
+    full = engine.full_view()
+    store.rates.set_rate("USD", store.rates.rate("USD") + 1)
+    assert engine.full_view() is not full
+    assert engine.stats()["invalidations"] == 2
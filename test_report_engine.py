@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Vectorized report engine against the Python reference loops"""
+
+import json
+import math
+
+import pytest
+
+from procurement_analysis import ProcurementAnalyzer
+from quote_store import QuoteStore
+from report_engine import build_report_sections
+
+SEEDS = range(8)
+
+
+def report_json(analyzer: ProcurementAnalyzer, engine: str) -> str:
+    report = analyzer.generate_analysis_report(engine)
+    del report["report_metadata"]
+    return json.dumps(report)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_vectorized_report_matches_python(seeded_analyzer, seed):
+    analyzer = seeded_analyzer(seed)
+    assert report_json(analyzer, "vectorized") == report_json(analyzer, "python")
+
+
+def quote(vendor: str, price: float, stockout: str = "Low") -> dict:
+    return {"vendor_name": vendor, "contact": "", "price_inr": price, "moq_kg": 10,
+            "stockout_frequency": stockout, "last_updated": "2024-01-01", "confidential_rating": "A"}
+
+
+def test_report_sections_follow_listed_cities_and_items():
+    store = QuoteStore()
+    store.append("Pune", "Rice", quote("P1", 40.0))
+    store.append("Pune", "Rice", quote("P2", 30.0, "High"))
+    store.append("Pune", "Salt", quote("P1", 12.5))
+    store.append("Goa", "Rice", quote("G1", 50.0))
+
+    sections = build_report_sections(store, ["Pune"], ["Rice", "Salt"])
+    assert list(sections["city_analysis"]) == ["Pune"]
+    assert sections["city_analysis"]["Pune"]["total_procurement_cost_inr"] == 42.5
+    assert sections["city_analysis"]["Pune"]["high_risk_items"] == 1
+    # Goa is not listed, so its Rice quote stays out of the item statistics
+    assert sections["item_comparison"]["Rice"] == {
+        "min_price_inr": 30.0, "max_price_inr": 40.0, "avg_price_inr": 35.0, "price_variance": 10.0}
+
+
+def test_item_average_uses_the_exact_sum():
+    # Summed left to right these round to a different average than their exact sum
+    prices = [11.7, 72.25, 62.21, 63.42]
+    assert round(sum(prices) / 4, 2) != round(math.fsum(prices) / 4, 2)
+    store = QuoteStore()
+    for index, price in enumerate(prices):
+        store.append(f"City{index}", "Salt", quote(f"V{index}", price))
+    sections = build_report_sections(store, [f"City{index}" for index in range(4)], ["Salt"])
+    assert sections["item_comparison"]["Salt"]["avg_price_inr"] == round(math.fsum(prices) / 4, 2)
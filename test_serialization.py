@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""JSON serialization: pretty/compact output, streamed sections and backends"""
+
+import json
+import os
+
+import pytest
+
+import serialization
+from serialization import (JSONSerializer, RawJSON, StreamedObject, available_backends, dump_json,
+                           iter_json_chunks)
+
+RATINGS = {f"Mumbai_Item{i}_Vendor_{i % 3}": {"reliability_score": 70 + i, "discount_available": i % 2 == 0,
+                                             "payment_terms": ["30 days", "45 days"][i % 2], "price": i / 7}
+           for i in range(11)}
+DOCUMENT = {"access_level": "CONFIDENTIAL", "vendor_ratings": RATINGS, "empty": {},
+            "nested": {"a": [1, 2.5, None, {"b": "c"}], "d": []}, "count": 3}
+
+
+def streamed(document: dict) -> dict:
+    """document with its vendor_ratings and empty sections as StreamedObject"""
+    return dict(document, vendor_ratings=StreamedObject(iter(document["vendor_ratings"].items())),
+                empty=StreamedObject(iter(())))
+
+
+def encode(serializer: JSONSerializer, document) -> str:
+    return "".join(chunk.data.decode() if isinstance(chunk, RawJSON) else chunk
+                   for chunk in serializer.iter_chunks(document))
+
+
+@pytest.mark.parametrize("batch_size", [1, 4, 4096])
+def test_stdlib_pretty_output_matches_json_dumps(monkeypatch, batch_size):
+    monkeypatch.setattr(serialization, "ENCODE_BATCH_SIZE", batch_size)
+    serializer = JSONSerializer(backend="stdlib")
+    assert encode(serializer, streamed(DOCUMENT)) == json.dumps(DOCUMENT, indent=2)
+    assert serializer.dumps(DOCUMENT) == json.dumps(DOCUMENT, indent=2)
+
+
+@pytest.mark.parametrize("batch_size", [1, 4, 4096])
+def test_stdlib_compact_output_matches_json_dumps(monkeypatch, batch_size):
+    monkeypatch.setattr(serialization, "ENCODE_BATCH_SIZE", batch_size)
+    serializer = JSONSerializer(compact=True, backend="stdlib")
+    assert encode(serializer, streamed(DOCUMENT)) == json.dumps(DOCUMENT, separators=(",", ":"))
+
+
+@pytest.mark.parametrize("document", [{}, [1, 2], "text", 4.5])
+def test_non_object_documents(document):
+    assert encode(JSONSerializer(backend="stdlib"), document) == json.dumps(document, indent=2)
+
+
+@pytest.mark.parametrize("backend", ["orjson", "msgspec"])
+@pytest.mark.parametrize("compact", [False, True])
+def test_backends_match_the_stdlib_encoding(backend, compact):
+    pytest.importorskip(backend)
+    expected = JSONSerializer(compact=compact, backend="stdlib")
+    serializer = JSONSerializer(compact=compact, backend=backend)
+    assert encode(serializer, streamed(DOCUMENT)) == encode(expected, streamed(DOCUMENT))
+
+
+@pytest.mark.parametrize("backend", ["stdlib", "orjson", "msgspec"])
+def test_dump_returns_the_file_size(tmp_path, backend):
+    if backend != "stdlib":
+        pytest.importorskip(backend)
+    document = dict(streamed(DOCUMENT), city="Kochi – Ernakulam", raw=RawJSON('{"x":"₹"}'.encode()))
+    path = str(tmp_path / "out.json")
+    written = dump_json(document, path, backend=backend)
+    assert written == os.path.getsize(path)
+    with open(path, encoding="utf-8") as file:
+        loaded = json.load(file)
+    assert loaded == dict(DOCUMENT, city="Kochi – Ernakulam", raw={"x": "₹"})
+
+
+def test_raw_json_is_passed_through_uncopied():
+    raw = RawJSON(b'{"Mumbai":{"Rice":[]}}')
+    chunks = list(iter_json_chunks({"access_type": "PUBLIC", "data": raw}))
+    assert any(chunk is raw.data for chunk in chunks)
+    assert json.loads(b"".join(chunks)) == {"access_type": "PUBLIC", "data": {"Mumbai": {"Rice": []}}}
+
+
+def test_iter_json_chunks_streams_nested_entries():
+    payload = {"vendor_id": "Mumbai_Vendor_A", "data": {"Mumbai": {"Rice": [1]}, "Pune": {}}, "note": None}
+    chunks = list(iter_json_chunks(payload))
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert len(chunks) > len(payload)
+    assert json.loads(b"".join(chunks)) == payload
+
+
+def test_backend_selection():
+    assert available_backends()[-1] == "stdlib"
+    assert JSONSerializer().backend == available_backends()[0]
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        JSONSerializer(backend="simplejson")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Sharded multi-process report engine"""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from procurement_analysis import ProcurementAnalyzer
+from report_engine import exact_segment_sums, exact_sum_to_float
+from sharded_analysis import ShardedAnalysis, lpt_schedule
+
+SEEDS = range(8)
+
+
+def report_json(analyzer: ProcurementAnalyzer, engine: str) -> str:
+    report = analyzer.generate_analysis_report(engine)
+    del report["report_metadata"]
+    return json.dumps(report)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("shard_by,workers", [("item", 1), ("item", 2), ("city", 1), ("city", 2)])
+def test_sharded_report_matches_python(seeded_analyzer, seed, shard_by, workers):
+    analyzer = seeded_analyzer(seed)
+    expected = report_json(analyzer, "python")
+    analyzer.shard_by = shard_by
+    analyzer.analysis_workers = workers
+    assert report_json(analyzer, "sharded") == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_exact_segment_sums_are_fsum_in_any_split(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(0, 1000, 5000).round(2)
+    values[::7] *= 10.0 ** rng.integers(-12, 12, len(values[::7]))
+    starts = np.array([0, 10, 11, 2500, 4999])
+    bounds = list(zip(starts.tolist(), starts[1:].tolist() + [len(values)]))
+    totals = exact_segment_sums(values, starts)
+    assert [exact_sum_to_float(total) for total in totals] == [
+        math.fsum(values[start:stop].tolist()) for start, stop in bounds]
+    # Shard-style partials of a reordered split add up to the same exact total
+    shuffled = rng.permutation(values)
+    assert sum(exact_segment_sums(shuffled, np.array([0, 1234]))) == sum(totals)
+
+
+def test_exact_segment_sums_handle_extreme_exponents():
+    values = np.array([1e300, 5e-324, -1e300, 2.5e-310, 1.0, 3.0])
+    totals = exact_segment_sums(values, np.array([0, 4]))
+    assert [exact_sum_to_float(total) for total in totals] == [
+        math.fsum(values[:4].tolist()), 4.0]
+
+
+@pytest.mark.parametrize("sizes,bins", [([5, 3, 3, 2, 2, 1], 2), ([7], 3), ([], 2), ([1] * 10, 4)])
+def test_lpt_schedule_places_every_job_once(sizes, bins):
+    assignment = lpt_schedule(sizes, bins)
+    assert sorted(job for jobs in assignment for job in jobs) == list(range(len(sizes)))
+    assert len(assignment) <= bins and all(assignment)
+    loads = [sum(sizes[job] for job in jobs) for jobs in assignment]
+    if loads:
+        assert max(loads) <= 4 / 3 * max(max(sizes), math.ceil(sum(sizes) / bins))
+
+
+@pytest.mark.parametrize("shard_by", ["item", "city"])
+def test_plan_shards_covers_every_row_once(seeded_analyzer, shard_by):
+    store = seeded_analyzer(3).quotes
+    sharded = ShardedAnalysis(store, workers=2, shard_by=shard_by)
+    order, offsets = sharded.plan_shards()
+    assert sorted(order.tolist()) == list(range(len(store)))
+    assert offsets[0] == 0 and offsets[-1] == len(store)
+    keys = store.column(shard_by)[order]
+    shards = [set(keys[start:stop].tolist()) for start, stop in zip(offsets[:-1], offsets[1:])]
+    # A shard key (item or city) never straddles two shards
+    assert sum(len(keys) for keys in shards) == len(set().union(*shards))
+
+
+def test_unknown_shard_key_is_rejected(seeded_analyzer):
+    with pytest.raises(ValueError):
+        ShardedAnalysis(seeded_analyzer(0).quotes, shard_by="vendor")
+
+
+def test_stats_describe_the_run(seeded_analyzer):
+    analyzer = seeded_analyzer(5)
+    sharded = ShardedAnalysis(analyzer.quotes, workers=1, shard_by="city")
+    sharded.run(analyzer.cities, analyzer.food_items)
+    assert sharded.stats["shard_by"] == "city"
+    assert sum(stats["rows"] for stats in sharded.stats["per_worker"].values()) == len(analyzer.quotes)
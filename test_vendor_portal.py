@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Vendor portal access control over the quote store"""
+
+from quote_store import QuoteStore
+from redaction import vendor_projection
+from vendor_portal import VendorPortal
+
+
+def portal_data(portal: VendorPortal, user_id: str, vendor_data) -> dict:
+    return portal.get_vendor_data(portal.authenticate_user(user_id, ""), vendor_data)["data"]
+
+
+def test_indexed_vendor_views_match_a_full_scan(seeded_analyzer):
+    analyzer = seeded_analyzer(4)
+    store = analyzer.quotes
+    portal = VendorPortal()
+    nested = store.to_nested()
+    for vendor in store.vendors.values:
+        assert portal_data(portal, vendor, store) == vendor_projection(nested, vendor)
+        assert portal_data(portal, vendor, analyzer.vendor_data) == vendor_projection(nested, vendor)
+
+
+def test_vendor_views_follow_new_quotes(seeded_analyzer):
+    store = seeded_analyzer(5).quotes
+    portal = VendorPortal()
+    vendor = store.vendors[0]
+    portal_data(portal, vendor, store)
+    store.append(store.cities[-1], "New Item", {
+        "vendor_name": vendor, "contact": "", "price_inr": 12.0, "moq_kg": 10,
+        "stockout_frequency": "Low", "last_updated": "2024-06-01", "confidential_rating": "B"})
+    data = portal_data(portal, vendor, store)
+    assert data == vendor_projection(store.to_nested(), vendor)
+    assert data[store.cities[-1]]["New Item"][0]["price_inr"] == 12.0
+
+
+def test_unknown_users_are_denied():
+    portal = VendorPortal()
+    response = portal.get_vendor_data(portal.authenticate_user("Mallory", ""), QuoteStore())
+    assert response["error"] == "Access Denied"
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""LRU + TTL view cache and the portal's cached vendor views"""
+
+from view_cache import TTLCache
+from vendor_portal import VendorPortal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    calls = []
+
+    def compute() -> int:
+        calls.append(clock.now)
+        return len(calls)
+
+    assert cache.get_or_compute("view", compute) == 1
+    clock.now = 9.9
+    assert cache.get_or_compute("view", compute) == 1
+    clock.now = 10.0
+    assert cache.get_or_compute("view", compute) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 2, 1)
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = TTLCache(maxsize=0)
+    cache.put("a", 1)
+    assert len(cache) == 0 and cache.get("a") is None
+
+
+def test_portal_reuses_vendor_views_until_quotes_change(seeded_analyzer):
+    store = seeded_analyzer(1).quotes
+    portal = VendorPortal(cache_size=8, cache_ttl=60)
+    auth_info = portal.authenticate_user(store.vendors[0], "")
+    first = portal.get_vendor_data(auth_info, store)["data"]
+    assert portal.get_vendor_data(auth_info, store)["data"] is first
+    assert portal.cache_stats()["vendor_views"]["hits"] == 1
+
+    store.update(int(store.vendor_rows(store.vendors[0])[0]), {"price_inr": 1.0})
+    assert portal.get_vendor_data(auth_info, store)["data"] is not first
+    assert portal.cache_stats()["invalidations"] == 1
@@ -4,16 +4,30 @@ Vendor Portal - Restricted Access System
 Only shows vendor's own data, BLU Maritime has full access
 """
 
-import json
 import hashlib
 from datetime import datetime
+from typing import Dict, Optional
+from quote_store import QuoteStore, NestedQuoteView
+from quote_db import QuoteDatabase
+from redaction import (RedactionEngine, ROLE_FULL, ROLE_VENDOR, DEFAULT_MAX_VENDOR_VIEWS, DEFAULT_VIEW_TTL,
+                       redact_nested, validate_rules, vendor_projection)
+from serialization import RawJSON, dump_json
+
+VENDOR_NOTE = "You can only view your own quotations. Competitor data is confidential."
 
 class VendorPortal:
-    def __init__(self):
+    def __init__(self, rules: Optional[Dict[str, Dict[str, str]]] = None,
+                 cache_size: int = DEFAULT_MAX_VENDOR_VIEWS, cache_ttl: float = DEFAULT_VIEW_TTL):
         self.access_levels = {
             "BLU_MARITIME": "FULL_ACCESS",
             "VENDOR": "RESTRICTED_ACCESS"
         }
+        # Field-level redaction rules per role (see redaction.DEFAULT_RULES)
+        self.rules = validate_rules(rules or {})
+        # Vendor views: LRU of cache_size entries, each expiring cache_ttl seconds after it was built
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._engine: Optional[RedactionEngine] = None
         
     def authenticate_user(self, user_id: str, access_key: str) -> dict:
         """Authenticate user and determine access level"""
@@ -24,50 +38,98 @@ class VendorPortal:
         else:
             return {"access_level": "DENIED", "user_type": "UNKNOWN"}
     
+    def engine(self, store: QuoteStore) -> RedactionEngine:
+        """Redaction engine holding the materialized views of store"""
+        if self._engine is None or self._engine.store is not store:
+            self._engine = RedactionEngine(store, self.rules, self.cache_size, self.cache_ttl)
+        return self._engine
+
+    def prepare_engine(self, store: QuoteStore) -> RedactionEngine:
+        """New engine for store with its full and public views built, not yet in use
+
+        Safe to call from a worker thread; hand the result to use_engine.
+        """
+        engine = RedactionEngine(store, self.rules, self.cache_size, self.cache_ttl)
+        engine.refresh()
+        return engine
+
+    def use_engine(self, engine: RedactionEngine):
+        """Serve from an engine built by prepare_engine"""
+        self._engine = engine
+    
     def get_vendor_data(self, auth_info: dict, vendor_data: dict) -> dict:
-        """Return data based on access level"""
+        """Return data based on access level
+        
+        QuoteStore-backed data (a QuoteStore or NestedQuoteView) is served
+        from the shared materialized views, which must not be modified. A
+        QuoteDatabase answers vendor requests with an indexed query and
+        BLU Maritime ones from its cached QuoteStore.
+        """
+        if isinstance(vendor_data, NestedQuoteView):
+            vendor_data = vendor_data.store
+        if auth_info["access_level"] == "FULL_ACCESS":
+            if isinstance(vendor_data, QuoteDatabase):
+                vendor_data = vendor_data.store()
+            if isinstance(vendor_data, QuoteStore):
+                data = self.engine(vendor_data).full_view().data
+            else:
+                data = redact_nested(vendor_data, self.rules[ROLE_FULL])
+            return self._full_payload(data)
+        elif auth_info["access_level"] == "RESTRICTED_ACCESS":
+            vendor_id = auth_info["vendor_id"]
+            if isinstance(vendor_data, QuoteStore):
+                data = self.engine(vendor_data).vendor_view(vendor_id).data
+            elif isinstance(vendor_data, QuoteDatabase):
+                data = redact_nested(vendor_data.vendor_quotations(vendor_id, exclude=()),
+                                     self.rules[ROLE_VENDOR])
+            else:
+                data = vendor_projection(vendor_data, vendor_id, self.rules[ROLE_VENDOR])
+            return self._vendor_payload(vendor_id, data)
+        else:
+            return {"error": "Access Denied", "message": "Invalid credentials"}
+    
+    def get_vendor_response(self, auth_info: dict, store: QuoteStore) -> dict:
+        """Like get_vendor_data, with the view embedded as pre-encoded JSON bytes"""
         if auth_info["access_level"] == "FULL_ACCESS":
-            return self._get_full_data(vendor_data)
+            return self._full_payload(RawJSON(self.engine(store).full_view().json_bytes))
         elif auth_info["access_level"] == "RESTRICTED_ACCESS":
-            return self._get_vendor_specific_data(auth_info["vendor_id"], vendor_data)
+            view = self.engine(store).vendor_view(auth_info["vendor_id"])
+            return self._vendor_payload(auth_info["vendor_id"], RawJSON(view.json_bytes))
         else:
             return {"error": "Access Denied", "message": "Invalid credentials"}
     
-    def _get_full_data(self, vendor_data: dict) -> dict:
+    def get_public_report(self, store: QuoteStore) -> dict:
+        """Aggregate price figures without any vendor details"""
+        return {
+            "access_type": "PUBLIC",
+            "timestamp": datetime.now().isoformat(),
+            "data": RawJSON(self.engine(store).public_view().json_bytes)
+        }
+    
+    def cache_stats(self) -> dict:
+        """Build/hit/invalidation counters of the materialized views, with the vendor view
+        cache's hit/miss/eviction/expiration counters under vendor_views"""
+        return self._engine.stats() if self._engine is not None else {}
+    
+    def _full_payload(self, data) -> dict:
         """BLU Maritime - Full access to all vendor data"""
         return {
             "access_type": "BLU_MARITIME_FULL_ACCESS",
             "timestamp": datetime.now().isoformat(),
-            "data": vendor_data,
+            "data": data,
             "confidential_ratings": True,
             "competitor_analysis": True,
             "negotiated_prices": True
         }
     
-    def _get_vendor_specific_data(self, vendor_id: str, vendor_data: dict) -> dict:
+    def _vendor_payload(self, vendor_id: str, data) -> dict:
         """Vendor - Restricted to own data only"""
-        filtered_data = {}
-        
-        for city, items in vendor_data.items():
-            filtered_data[city] = {}
-            for item, vendors in items.items():
-                # Only show this vendor's data
-                vendor_own_data = [v for v in vendors if v["vendor_name"] == vendor_id]
-                if vendor_own_data:
-                    # Remove confidential fields
-                    clean_data = []
-                    for vendor in vendor_own_data:
-                        clean_vendor = {k: v for k, v in vendor.items() 
-                                     if k not in ["confidential_rating"]}
-                        clean_data.append(clean_vendor)
-                    filtered_data[city][item] = clean_data
-        
         return {
             "access_type": "VENDOR_RESTRICTED_ACCESS",
             "vendor_id": vendor_id,
             "timestamp": datetime.now().isoformat(),
-            "data": filtered_data,
-            "note": "You can only view your own quotations. Competitor data is confidential."
+            "data": data,
+            "note": VENDOR_NOTE
         }
 
 def generate_vendor_access_demo():
@@ -90,15 +152,13 @@ def generate_vendor_access_demo():
     blu_auth = portal.authenticate_user("BLU_MARITIME", "BLU_ADMIN_2024")
     blu_data = portal.get_vendor_data(blu_auth, sample_data)
     
-    with open("blu_maritime_full_access.json", 'w') as f:
-        json.dump(blu_data, f, indent=2)
+    dump_json(blu_data, "blu_maritime_full_access.json")
     
     # Vendor A Access
     vendor_auth = portal.authenticate_user("Mumbai_Vendor_A", "vendor_key")
     vendor_data = portal.get_vendor_data(vendor_auth, sample_data)
     
-    with open("vendor_restricted_access.json", 'w') as f:
-        json.dump(vendor_data, f, indent=2)
+    dump_json(vendor_data, "vendor_restricted_access.json")
     
     print("🔐 Access Control Demo Generated:")
     print("  - blu_maritime_full_access.json (All vendor data + confidential)")